@@ -0,0 +1,133 @@
+"""
+Streaming ZIP archives.
+
+``iter_zip`` produces a ZIP file as a sequence of byte chunks while the
+entries are being read, so a download can start immediately and nothing is
+staged on disk. ``zipfile`` writes to a non-seekable sink here, which makes it
+emit a data descriptor after each entry instead of seeking back to patch the
+local header.
+
+Built archives can be cached: ``archive_key`` fingerprints the entries (name,
+size, modification time; ``archive_key_for`` takes the versions from
+elsewhere, such as content hashes) and ``iter_zip_cached`` writes the
+streamed bytes to disk as a side effect, so repeat downloads are plain file
+reads.
+"""
+
+import contextlib
+import hashlib
+import os
+import uuid
+import zipfile
+from typing import Iterable, Iterator, List, Tuple
+
+# Formats that are already compressed; deflating them again only costs CPU
+STORED_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.zip', '.gz', '.parquet')
+
+ZIP_CHUNK_SIZE = 64 * 1024
+
+
+class _StreamSink:
+    """Write-only file object collecting the bytes ``zipfile`` produces"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data) -> int:
+        if data:
+            self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def compression_for(filename: str) -> int:
+    return zipfile.ZIP_STORED if filename.lower().endswith(STORED_EXTENSIONS) else zipfile.ZIP_DEFLATED
+
+
+def iter_zip(files: Iterable[Tuple[str, str]], chunk_size: int = ZIP_CHUNK_SIZE) -> Iterator[bytes]:
+    """Yield a ZIP archive of ``(path, arcname)`` pairs chunk by chunk"""
+    sink = _StreamSink()
+    with zipfile.ZipFile(sink, 'w') as archive:
+        for path, arcname in files:
+            info = zipfile.ZipInfo.from_file(path, arcname)
+            info.compress_type = compression_for(arcname)
+            with open(path, 'rb') as source, archive.open(info, 'w', force_zip64=info.file_size > zipfile.ZIP64_LIMIT) as entry:
+                while True:
+                    data = source.read(chunk_size)
+                    if not data:
+                        break
+                    entry.write(data)
+                    chunk = sink.drain()
+                    if chunk:
+                        yield chunk
+            chunk = sink.drain()
+            if chunk:
+                yield chunk
+    # Central directory, written when the archive is closed
+    chunk = sink.drain()
+    if chunk:
+        yield chunk
+
+
+
+def archive_key_for(entries: Iterable[Tuple[str, int, object]]) -> str:
+    """Fingerprint of ``(arcname, size, version)`` entries, e.g. a content hash from a session manifest"""
+    digest = hashlib.sha1()
+    for arcname, size, version in entries:
+        digest.update(f"{arcname}\0{size}\0{version}\n".encode())
+    return digest.hexdigest()[:24]
+
+
+def archive_key(files: List[Tuple[str, str]]) -> str:
+    """Fingerprint of the archive contents; changes whenever an entry is added, removed or modified"""
+    entries = []
+    for path, arcname in files:
+        stat = os.stat(path)
+        entries.append((arcname, stat.st_size, stat.st_mtime_ns))
+    return archive_key_for(entries)
+
+
+def iter_zip_cached(files: List[Tuple[str, str]], cache_path: str,
+                    chunk_size: int = ZIP_CHUNK_SIZE) -> Iterator[bytes]:
+    """Like ``iter_zip``, also saving the archive to ``cache_path``.
+
+    The cache file only appears once the archive is complete; an interrupted
+    download leaves nothing behind.
+    """
+    temp_path = f"{cache_path}.{uuid.uuid4().hex}.part"
+    try:
+        with open(temp_path, 'wb') as cache:
+            for chunk in iter_zip(files, chunk_size):
+                cache.write(chunk)
+                yield chunk
+        os.replace(temp_path, cache_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def prune_archive_cache(cache_dir: str, keep: str):
+    """Create ``cache_dir`` and remove cached archives other than ``keep`` (blocking).
+
+    A concurrent download may be pruning the same folder, so archives that are
+    already gone are skipped.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    for cached in os.listdir(cache_dir):
+        if cached.endswith('.zip') and cached != keep:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(os.path.join(cache_dir, cached))
+
+
+def build_zip(files: List[Tuple[str, str]], cache_path: str) -> str:
+    """Write the complete archive to ``cache_path`` (blocking)"""
+    for _ in iter_zip_cached(files, cache_path):
+        pass
+    return cache_path
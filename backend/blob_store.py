@@ -0,0 +1,168 @@
+"""
+Content-addressed image store.
+
+Downloaded images are kept once per distinct content under
+``objects/<sha256[:2]>/<sha256>`` and hardlinked into each session folder, so
+recurring scrapes of the same site do not store identical files again. The
+link count of a blob is its reference count (session files and HTTP cache
+entries both link to it); ``refs/<session_id>`` lists the blobs a session
+links to so that cleaning up a session can drop blobs nobody references
+anymore. Blob count, total size and session references are kept as running
+totals, so reading them does not walk the store.
+
+If the filesystem does not support hardlinks, files are simply moved into the
+session folder without deduplication.
+"""
+
+import hashlib
+import os
+import shutil
+import stat
+import threading
+import uuid
+
+
+class BlobStore:
+    """Deduplicating store for session files"""
+
+    def __init__(self, root: str, enabled: bool = True):
+        self.root = root
+        self.enabled = enabled
+        self.objects_dir = os.path.join(root, 'objects')
+        self.refs_dir = os.path.join(root, 'refs')
+        self.tmp_dir = os.path.join(root, 'tmp')
+        self._lock = threading.Lock()
+        self._blobs = 0
+        self._size = 0
+        self._refs = 0
+
+    def ensure(self):
+        """Create the store folders, drop temp files left by an interrupted run and count what is stored"""
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
+        for path in (self.objects_dir, self.refs_dir, self.tmp_dir):
+            os.makedirs(path, exist_ok=True)
+
+        blobs = size = refs = 0
+        for dirpath, _, filenames in os.walk(self.objects_dir):
+            for filename in filenames:
+                blobs += 1
+                size += os.stat(os.path.join(dirpath, filename)).st_size
+        for filename in os.listdir(self.refs_dir):
+            with open(os.path.join(self.refs_dir, filename)) as refs_file:
+                refs += sum(1 for line in refs_file if line.strip())
+        with self._lock:
+            self._blobs, self._size, self._refs = blobs, size, refs
+
+    def temp_path(self) -> str:
+        """A fresh path on the store's filesystem to write a file before ``commit``"""
+        os.makedirs(self.tmp_dir, exist_ok=True)
+        return os.path.join(self.tmp_dir, uuid.uuid4().hex)
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def commit(self, temp_path: str, digest: str, dest_path: str, session_id: str) -> bool:
+        """Move a fully written temp file to ``dest_path`` through the store.
+
+        Returns True when identical content was already stored, i.e. the temp
+        file was discarded and ``dest_path`` links to the existing blob.
+        """
+        if not self.enabled:
+            os.replace(temp_path, dest_path)
+            return False
+
+        blob = self.blob_path(digest)
+        for _ in range(3):
+            if os.path.exists(blob):
+                try:
+                    os.link(blob, dest_path)
+                except FileNotFoundError:
+                    continue  # Released by a concurrent cleanup, store it again
+                except OSError:
+                    break
+                os.remove(temp_path)
+                self._add_ref(session_id, digest)
+                return True
+
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            try:
+                # Linking (not renaming) fails if another writer stored the blob first
+                os.link(temp_path, blob)
+            except FileExistsError:
+                continue
+            except OSError:
+                break
+            os.chmod(blob, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+            size = os.stat(blob).st_size
+            with self._lock:
+                self._blobs += 1
+                self._size += size
+            os.replace(temp_path, dest_path)
+            self._add_ref(session_id, digest)
+            return False
+
+        # No hardlink support (or persistent races): keep an unshared copy
+        os.replace(temp_path, dest_path)
+        return False
+
+    def put_bytes(self, data: bytes, dest_path: str, session_id: str) -> bool:
+        """Store in-memory content at ``dest_path``; see ``commit``"""
+        temp_path = self.temp_path()
+        with open(temp_path, 'wb') as temp_file:
+            temp_file.write(data)
+        return self.commit(temp_path, hashlib.sha256(data).hexdigest(), dest_path, session_id)
+
+    def link_file(self, source_path: str, digest: str, dest_path: str, session_id: str) -> bool:
+        """Store a copy of an existing file (e.g. a cached body) at ``dest_path``; see ``commit``"""
+        temp_path = self.temp_path()
+        try:
+            os.link(source_path, temp_path)
+        except OSError:
+            shutil.copyfile(source_path, temp_path)
+        return self.commit(temp_path, digest, dest_path, session_id)
+
+    def _add_ref(self, session_id: str, digest: str):
+        with open(os.path.join(self.refs_dir, session_id), 'a') as refs:
+            refs.write(digest + '\n')
+        with self._lock:
+            self._refs += 1
+
+    def release_session(self, session_id: str) -> int:
+        """Forget a removed session's references; returns bytes freed by deleting unreferenced blobs"""
+        refs_path = os.path.join(self.refs_dir, session_id)
+        try:
+            with open(refs_path) as refs:
+                lines = [line.strip() for line in refs if line.strip()]
+            os.remove(refs_path)
+        except FileNotFoundError:
+            return 0
+        with self._lock:
+            self._refs -= len(lines)
+        digests = set(lines)
+
+        return sum(self.collect(digest) for digest in digests)
+
+    def collect(self, digest: str) -> int:
+        """Delete a blob that no session or cache entry links to anymore; returns bytes freed"""
+        blob = self.blob_path(digest)
+        try:
+            blob_stat = os.stat(blob)
+            if blob_stat.st_nlink <= 1:
+                os.remove(blob)
+                with self._lock:
+                    self._blobs -= 1
+                    self._size -= blob_stat.st_size
+                return blob_stat.st_size
+        except FileNotFoundError:
+            pass
+        return 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            blobs, size, refs = self._blobs, self._size, self._refs
+        return {
+            "enabled": self.enabled,
+            "blobs": blobs,
+            "size_mb": round(size / (1024 * 1024), 2),
+            "session_references": refs,
+        }
@@ -0,0 +1,149 @@
+"""
+Multi-page crawl frontier.
+
+Keeps the set of URLs already scheduled, applies depth/page limits, domain
+scoping and include/exclude patterns, and runs a page handler over the
+frontier with bounded concurrency.
+
+Discovered links arrive canonicalized by the page handler; start URLs are
+passed through ``canonicalize`` so they deduplicate against them.
+"""
+
+import asyncio
+import re
+from typing import Awaitable, Callable, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+SCOPE_HOST = "host"      # Only the exact host of the start URL
+SCOPE_DOMAIN = "domain"  # The start host and its subdomains (www. is ignored)
+SCOPE_ANY = "any"        # Follow links to any host
+CRAWL_SCOPES = (SCOPE_HOST, SCOPE_DOMAIN, SCOPE_ANY)
+
+# Links to these resources are never queued as pages
+NON_HTML_EXTENSIONS = (
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp', '.avif',
+    '.pdf', '.zip', '.gz', '.tar', '.rar', '.7z', '.exe', '.dmg', '.apk',
+    '.mp3', '.mp4', '.avi', '.mov', '.webm', '.wav',
+    '.css', '.js', '.json', '.xml', '.rss', '.woff', '.woff2', '.ttf',
+    '.doc', '.docx', '.xls', '.xlsx', '.ppt', '.pptx', '.csv',
+)
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or '').lower()
+
+
+class CrawlFrontier:
+    """Deduplicating, scope-aware URL frontier with depth and page budgets"""
+
+    def __init__(self, start_url: str, max_depth: int = 0, max_pages: int = 1,
+                 scope: str = SCOPE_DOMAIN, include_patterns: Optional[Iterable[str]] = None,
+                 exclude_patterns: Optional[Iterable[str]] = None,
+                 canonicalize: Optional[Callable[[str], Optional[str]]] = None):
+        if scope not in CRAWL_SCOPES:
+            raise ValueError(f"Invalid crawl scope: {scope}")
+        self.canonicalize = canonicalize
+        self.start_url = self._canonical(start_url)
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.scope = scope
+        self.include_patterns = [re.compile(p) for p in (include_patterns or [])]
+        self.exclude_patterns = [re.compile(p) for p in (exclude_patterns or [])]
+
+        self.start_host = _host(start_url)
+        self.root_domain = self.start_host[4:] if self.start_host.startswith('www.') else self.start_host
+
+        self.seen = set()
+        self.scheduled: List[Tuple[str, int]] = []
+        self.pages_fetched = 0
+        self.errors: List[Tuple[str, Exception]] = []
+        self._queue: Optional[asyncio.Queue] = None
+
+    def _canonical(self, url: str) -> str:
+        return (self.canonicalize(url) if self.canonicalize else None) or url
+
+    def in_scope(self, url: str) -> bool:
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https'):
+            return False
+        if parsed.path.lower().endswith(NON_HTML_EXTENSIONS):
+            return False
+
+        host = (parsed.hostname or '').lower()
+        if self.scope == SCOPE_HOST and host != self.start_host:
+            return False
+        if self.scope == SCOPE_DOMAIN and host != self.root_domain and not host.endswith('.' + self.root_domain):
+            return False
+
+        if self.include_patterns and not any(p.search(url) for p in self.include_patterns):
+            return False
+        if any(p.search(url) for p in self.exclude_patterns):
+            return False
+        return True
+
+    def add(self, url: str, depth: int) -> bool:
+        """Schedule a URL unless it was seen, is out of scope or over budget"""
+        if depth > self.max_depth or len(self.scheduled) >= self.max_pages:
+            return False
+        if url in self.seen:
+            return False
+        # The start URL is always crawled; the filters only apply to discovered links
+        if self.scheduled and not self.in_scope(url):
+            return False
+
+        self.seen.add(url)
+        self.scheduled.append((url, depth))
+        if self._queue is not None:
+            self._queue.put_nowait((url, depth))
+        return True
+
+    def seed(self, urls: Iterable[str]) -> int:
+        """Schedule several start URLs at depth 0 (a batch); like the start URL they skip the scope filters"""
+        added = 0
+        for url in urls:
+            if len(self.scheduled) >= self.max_pages:
+                break
+            url = self._canonical(url)
+            if url in self.seen:
+                continue
+            self.seen.add(url)
+            self.scheduled.append((url, 0))
+            added += 1
+        return added
+
+    async def run(self, handler: Callable[[str, int], Awaitable[Iterable[str]]], concurrency: int):
+        """Crawl until the frontier is exhausted.
+
+        ``handler(url, depth)`` fetches and processes one page and returns the
+        URLs it links to; they are scheduled one level deeper. Handler errors
+        are recorded in ``self.errors`` and do not stop the crawl.
+        """
+        self._queue = asyncio.Queue()
+        if not self.scheduled:
+            self.add(self.start_url, 0)
+        else:
+            for item in self.scheduled:
+                self._queue.put_nowait(item)
+
+        async def worker():
+            while True:
+                url, depth = await self._queue.get()
+                try:
+                    discovered = await handler(url, depth)
+                    self.pages_fetched += 1
+                    if depth < self.max_depth:
+                        for link in discovered:
+                            self.add(link, depth + 1)
+                except Exception as e:
+                    self.errors.append((url, e))
+                finally:
+                    self._queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(max(1, concurrency))]
+        try:
+            await self._queue.join()
+        finally:
+            for w in workers:
+                w.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            self._queue = None
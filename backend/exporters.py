@@ -0,0 +1,322 @@
+"""
+Streaming export of extracted links.
+
+Rows are written as soon as a page's links are known, so memory use does not
+grow with the number of links and no intermediate DataFrame is built.
+
+Supported formats:
+
+- ``csv``:     UTF-8 with BOM, every field quoted (the original export)
+- ``csv.gz``:  the same CSV, gzip-compressed
+- ``jsonl``:   one JSON object per link
+- ``parquet``: columnar, zstd-compressed, with a dictionary-encoded ``domain``
+               column (optional dependency: pyarrow)
+
+Batch scrapes also write a per-page JSON Lines report (``PageReportWriter``),
+incremental scrapes one of the links added and removed per page
+(``ChangeReportWriter``).
+"""
+
+import csv
+import gzip
+import json
+import os
+import threading
+import uuid
+from urllib.parse import urlsplit
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PARQUET_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    pa = pq = None
+    PARQUET_AVAILABLE = False
+
+LINK_COLUMNS = ['url', 'text', 'title', 'target', 'rel']
+PAGE_REPORT_COLUMNS = ['url', 'status', 'change', 'links', 'images', 'error']
+CHANGE_REPORT_COLUMNS = ['page', 'change', 'url', 'text', 'title']
+
+EXPORT_FORMATS = ('csv', 'csv.gz', 'jsonl', 'parquet')
+EXPORT_MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'csv.gz': 'application/gzip',
+    'jsonl': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH_ROWS = 10000
+
+
+class ExportUnavailableError(Exception):
+    """Raised when a format needs an optional dependency that is not installed"""
+
+
+def links_filename(session_id: str, fmt: str = 'csv') -> str:
+    return f"links_{session_id}.{fmt}"
+
+
+def detect_format(filename: str):
+    """Export format of a file name, or None if it is not a links export"""
+    if not filename.startswith('links_'):
+        return None
+    for fmt in sorted(EXPORT_FORMATS, key=len, reverse=True):
+        if filename.endswith('.' + fmt):
+            return fmt
+    return None
+
+
+def find_links_export(session_path: str, filenames=None):
+    """(filename, format) of a links export in a session folder, preferring plain CSV.
+
+    ``filenames`` (e.g. from the session manifest) saves listing the folder.
+    """
+    found = None
+    for filename in sorted(os.listdir(session_path) if filenames is None else filenames):
+        fmt = detect_format(filename)
+        if fmt == 'csv':
+            return filename, fmt
+        if fmt and found is None:
+            found = (filename, fmt)
+    return found
+
+
+class LinkWriter:
+    """Base class; appends are locked because crawled pages are written from several worker threads"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows_written = 0
+        self._lock = threading.Lock()
+
+    def write_rows(self, links) -> int:
+        """Write link dicts and return how many rows were written"""
+        rows = [[link.get(column, '') for column in LINK_COLUMNS] for link in links]
+        with self._lock:
+            self._write(rows)
+            self.rows_written += len(rows)
+        return len(rows)
+
+    def _write(self, rows):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+    def close(self):
+        with self._lock:
+            self._close()
+
+    @property
+    def size(self) -> int:
+        """Bytes on disk; final once the writer is closed"""
+        return os.path.getsize(self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class LinkCSVWriter(LinkWriter):
+    """Appends link records to a CSV file, optionally gzip-compressed.
+
+    The output matches what the previous pandas export produced:
+    UTF-8 with BOM, every field quoted, ``os.linesep`` line endings and the
+    ``url, text, title, target, rel`` header.
+    """
+
+    def __init__(self, path: str, compress: bool = False):
+        super().__init__(path)
+        if compress:
+            self._file = gzip.open(path, 'wt', encoding='utf-8-sig', newline='')
+        else:
+            self._file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self._writer = csv.writer(self._file, quoting=csv.QUOTE_ALL, lineterminator=os.linesep)
+        self._writer.writerow(LINK_COLUMNS)
+
+    def _write(self, rows):
+        self._writer.writerows(rows)
+
+    def _close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class LinkJSONLWriter(LinkWriter):
+    """Appends link records as JSON Lines"""
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(path, 'w', encoding='utf-8', newline='\n')
+
+    def _write(self, rows):
+        self._file.writelines(
+            json.dumps(dict(zip(LINK_COLUMNS, row)), ensure_ascii=False) + '\n' for row in rows
+        )
+
+    def _close(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class LinkParquetWriter(LinkWriter):
+    """Buffers link records into Parquet row groups.
+
+    Besides the link columns each row carries the URL's ``domain``; it and the
+    low-cardinality ``target``/``rel`` columns are dictionary-encoded.
+    """
+
+    def __init__(self, path: str, batch_rows: int = PARQUET_BATCH_ROWS):
+        if not PARQUET_AVAILABLE:
+            raise ExportUnavailableError("Parquet export requires pyarrow")
+        super().__init__(path)
+        self.batch_rows = batch_rows
+        self._schema = pa.schema([(column, pa.string()) for column in LINK_COLUMNS + ['domain']])
+        self._columns = {column: [] for column in self._schema.names}
+        self._writer = pq.ParquetWriter(
+            path, self._schema, compression='zstd', use_dictionary=['domain', 'target', 'rel']
+        )
+
+    def _write(self, rows):
+        for row in rows:
+            for column, value in zip(LINK_COLUMNS, row):
+                self._columns[column].append(value)
+            self._columns['domain'].append(urlsplit(row[0]).hostname or '')
+        if len(self._columns['url']) >= self.batch_rows:
+            self._flush()
+
+    def _flush(self):
+        if self._columns['url']:
+            self._writer.write_table(pa.table(self._columns, schema=self._schema))
+            self._columns = {column: [] for column in self._schema.names}
+
+    def _close(self):
+        if self._writer is not None:
+            self._flush()
+            self._writer.close()
+            self._writer = None
+
+
+class ReportWriter:
+    """Appends records with fixed ``columns`` as JSON Lines.
+
+    Each write is flushed, so a report can be downloaded while its scrape is
+    still running.
+    """
+
+    columns = []
+
+    def __init__(self, path: str):
+        self.path = path
+        self.rows_written = 0
+        self._lock = threading.Lock()
+        self._file = open(path, 'w', encoding='utf-8', newline='\n')
+
+    def write(self, record: dict):
+        self.write_many([record])
+
+    def write_many(self, records):
+        lines = [
+            json.dumps({column: record.get(column) for column in self.columns}, ensure_ascii=False) + '\n'
+            for record in records
+        ]
+        if not lines:
+            return
+        with self._lock:
+            self._file.writelines(lines)
+            self._file.flush()
+            self.rows_written += len(lines)
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    @property
+    def size(self) -> int:
+        return os.path.getsize(self.path)
+
+
+class PageReportWriter(ReportWriter):
+    """One line per page of a batch scrape: url, status, change, counts or error"""
+
+    columns = PAGE_REPORT_COLUMNS
+
+
+class ChangeReportWriter(ReportWriter):
+    """One line per link added to or removed from a page since its last scrape"""
+
+    columns = CHANGE_REPORT_COLUMNS
+
+
+def page_report_filename(session_id: str) -> str:
+    return f"pages_{session_id}.jsonl"
+
+
+def changes_filename(session_id: str) -> str:
+    return f"changes_{session_id}.jsonl"
+
+
+def create_link_writer(path: str, fmt: str = 'csv') -> LinkWriter:
+    """Open a streaming writer for ``fmt``"""
+    if fmt == 'csv':
+        return LinkCSVWriter(path)
+    if fmt == 'csv.gz':
+        return LinkCSVWriter(path, compress=True)
+    if fmt == 'jsonl':
+        return LinkJSONLWriter(path)
+    if fmt == 'parquet':
+        return LinkParquetWriter(path)
+    raise ValueError(f"Unknown export format: {fmt}")
+
+
+def iter_link_batches(path: str, fmt: str, batch_rows: int = PARQUET_BATCH_ROWS):
+    """Read a links export back as lists of link dicts, one batch at a time"""
+    if fmt == 'parquet':
+        if not PARQUET_AVAILABLE:
+            raise ExportUnavailableError("Parquet export requires pyarrow")
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_rows, columns=LINK_COLUMNS):
+            yield batch.to_pylist()
+        return
+
+    if fmt == 'csv.gz':
+        handle = gzip.open(path, 'rt', encoding='utf-8-sig', newline='')
+    elif fmt == 'csv':
+        handle = open(path, 'r', encoding='utf-8-sig', newline='')
+    elif fmt == 'jsonl':
+        handle = open(path, 'r', encoding='utf-8')
+    else:
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    with handle:
+        rows = (json.loads(line) for line in handle if line.strip()) if fmt == 'jsonl' else csv.DictReader(handle)
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) >= batch_rows:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+
+def convert_links(source_path: str, source_format: str, target_path: str, target_format: str) -> int:
+    """Convert a links export to another format, streaming; returns the row count.
+
+    The target is written under a unique temporary name and renamed into
+    place, so concurrent conversions of one export never share a file and a
+    download never sees a partial one.
+    """
+    temp_path = f"{target_path}.{uuid.uuid4().hex}.part"
+    try:
+        with create_link_writer(temp_path, target_format) as writer:
+            for batch in iter_link_batches(source_path, source_format):
+                writer.write_rows(batch)
+        os.replace(temp_path, target_path)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+    return writer.rows_written
@@ -0,0 +1,376 @@
+"""
+Streaming HTML extraction of anchors and images.
+
+The scraper only needs the page title plus the attributes and text of <a> and
+<img> tags, so building a full DOM is wasted work on large pages. Extractors
+here are fed the document in chunks and collect just that data:
+
+- ``lxml``:   lxml's incremental pull parser (fastest, optional dependency)
+- ``stream``: the stdlib tokenizer ``html.parser.HTMLParser``, no DOM at all
+- ``bs4``:    BeautifulSoup, kept as the fallback for pages the fast parsers
+              reject
+
+``extract_page_file`` reads the document from disk a slice at a time, so a
+fetched page is never held in memory whole (the BeautifulSoup fallback is the
+exception: it needs the complete document).
+
+All extractors return the same ``dict``::
+
+    {
+        "title": str or None,
+        "anchor_count": int,           # every <a>, with or without href
+        "image_count": int,            # every <img>
+        "anchors": [{"href", "text", "title", "target", "rel", "alt"}, ...],
+        "images": [{attr: value, ...}, ...],  # one per <img>, in document order
+        "picture_sources": {img_position: [{attr: value, ...}, ...]},  # <source>s of a <picture>
+        "backgrounds": [url, ...],     # url()s of inline background styles, in document order
+    }
+"""
+
+import re
+from html.parser import HTMLParser
+
+try:
+    from lxml import etree
+    LXML_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    etree = None
+    LXML_AVAILABLE = False
+
+PARSER_BACKENDS = ('auto', 'lxml', 'stream', 'bs4')
+
+# Documents are fed in slices so the lxml tree never holds the whole page
+FEED_CHUNK_SIZE = 64 * 1024
+
+# Text inside these tags is not part of the visible anchor text
+_SKIP_TEXT_TAGS = ('script', 'style', 'template')
+
+# url(...) inside a background / background-image declaration of a style attribute
+_BACKGROUND_URL = re.compile(r'background(?:-image)?\s*:[^;]*?url\(\s*([\'"]?)(.*?)\1\s*\)', re.IGNORECASE)
+
+
+def background_urls(style):
+    """Image URLs referenced by ``background``/``background-image`` in an inline style"""
+    if not style or 'url(' not in style.lower():
+        return []
+    return [match.group(2) for match in _BACKGROUND_URL.finditer(style) if match.group(2)]
+
+
+def _anchor_from_attrs(attrs, text):
+    rel = attrs.get('rel') or ''
+    return {
+        'href': attrs.get('href'),
+        'text': text,
+        'title': attrs.get('title') or '',
+        'target': attrs.get('target') or '',
+        # BeautifulSoup treats rel as multi-valued; normalise whitespace the same way
+        'rel': ' '.join(rel.split()),
+        'alt': attrs.get('alt') or '',
+    }
+
+
+def _clean_attrs(attrs):
+    """Attribute pairs to a dict; valueless attributes become ''"""
+    return {name: (value if value is not None else '') for name, value in attrs}
+
+
+class StreamExtractor(HTMLParser):
+    """Tokenizer-based extractor; keeps no tree, only the collected tags"""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = None
+        self.anchor_count = 0
+        self.anchors = []
+        self.images = []
+        self.picture_sources = {}
+        self.backgrounds = []
+        self._pictures = []  # <source> attrs of each open <picture>
+        self._in_title = False
+        self._title_parts = []
+        self._anchor_stack = []  # [(attrs, text parts)] for open <a> tags
+        self._skip_depth = 0
+        self._text_node = []  # Data of the current text node, which may arrive split across feeds
+
+    def handle_starttag(self, tag, attrs):
+        self._flush_text()
+        for name, value in attrs:
+            if name == 'style':
+                self.backgrounds.extend(background_urls(value))
+        if tag == 'a':
+            self.anchor_count += 1
+            self._anchor_stack.append((_clean_attrs(attrs), []))
+        elif tag == 'img':
+            if self._pictures and self._pictures[-1]:
+                self.picture_sources[len(self.images)] = list(self._pictures[-1])
+            self.images.append(_clean_attrs(attrs))
+        elif tag == 'picture':
+            self._pictures.append([])
+        elif tag == 'source' and self._pictures:
+            self._pictures[-1].append(_clean_attrs(attrs))
+        elif tag == 'title' and self.title is None:
+            self._in_title = True
+        elif tag in _SKIP_TEXT_TAGS:
+            self._skip_depth += 1
+
+    def handle_startendtag(self, tag, attrs):
+        if tag == 'a':
+            self.handle_starttag(tag, attrs)
+            self.handle_endtag(tag)
+        else:
+            self.handle_starttag(tag, attrs)
+            if tag in _SKIP_TEXT_TAGS:
+                self._skip_depth -= 1
+
+    def handle_endtag(self, tag):
+        self._flush_text()
+        if tag == 'a' and self._anchor_stack:
+            self._close_anchor()
+        elif tag == 'picture' and self._pictures:
+            self._pictures.pop()
+        elif tag == 'title' and self._in_title:
+            self._in_title = False
+            self.title = ''.join(self._title_parts)
+        elif tag in _SKIP_TEXT_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+
+    def handle_data(self, data):
+        if self._in_title:
+            self._title_parts.append(data)
+        elif self._anchor_stack and not self._skip_depth:
+            self._text_node.append(data)
+
+    def _flush_text(self):
+        if self._text_node:
+            stripped = ''.join(self._text_node).strip()
+            self._text_node = []
+            if stripped:
+                self._anchor_stack[-1][1].append(stripped)
+
+    def _close_anchor(self):
+        attrs, parts = self._anchor_stack.pop()
+        text = ''.join(parts)
+        if self._anchor_stack:
+            # Browsers never nest anchors, but keep the text visible to the outer one
+            self._anchor_stack[-1][1].append(text)
+        if attrs.get('href') is not None:
+            self.anchors.append(_anchor_from_attrs(attrs, text))
+
+    def result(self):
+        super().close()
+        self._flush_text()
+        while self._anchor_stack:
+            self._close_anchor()
+        if self._in_title:
+            self.title = ''.join(self._title_parts)
+        return {
+            'title': self.title,
+            'anchor_count': self.anchor_count,
+            'image_count': len(self.images),
+            'anchors': self.anchors,
+            'images': self.images,
+            'picture_sources': self.picture_sources,
+            'backgrounds': self.backgrounds,
+        }
+
+
+class LxmlExtractor:
+    """lxml pull-parser extractor; elements are released once processed"""
+
+    def __init__(self):
+        self._parser = etree.HTMLPullParser(events=('start', 'end'))
+        self.title = None
+        self.anchor_count = 0
+        self.anchors = []
+        self.images = []
+        self.picture_sources = {}
+        self.backgrounds = []
+        self._pictures = []
+        self._anchor_depth = 0
+
+    def feed(self, data):
+        self._parser.feed(data)
+        self._drain()
+
+    def _drain(self):
+        for event, element in self._parser.read_events():
+            tag = element.tag
+            if not isinstance(tag, str):
+                continue  # comments and processing instructions
+            if event == 'start':
+                style = element.get('style')
+                if style:
+                    self.backgrounds.extend(background_urls(style))
+                if tag == 'a':
+                    self.anchor_count += 1
+                    self._anchor_depth += 1
+                elif tag == 'img':
+                    if self._pictures and self._pictures[-1]:
+                        self.picture_sources[len(self.images)] = list(self._pictures[-1])
+                    self.images.append(dict(element.attrib))
+                elif tag == 'picture':
+                    self._pictures.append([])
+                elif tag == 'source' and self._pictures:
+                    self._pictures[-1].append(dict(element.attrib))
+                continue
+
+            if tag == 'picture' and self._pictures:
+                self._pictures.pop()
+            if tag == 'a':
+                self._anchor_depth -= 1
+                attrs = dict(element.attrib)
+                if attrs.get('href') is not None:
+                    self.anchors.append(_anchor_from_attrs(attrs, self._element_text(element)))
+            elif tag == 'title' and self.title is None:
+                self.title = element.text or ''
+
+            # Free processed subtrees unless an enclosing anchor still needs their text
+            if not self._anchor_depth and tag not in ('html', 'body'):
+                element.clear(keep_tail=True)
+                parent = element.getparent()
+                if parent is not None:
+                    while element.getprevious() is not None:
+                        del parent[0]
+
+    def _element_text(self, element):
+        """Equivalent of BeautifulSoup's ``get_text(strip=True)``"""
+        parts = []
+
+        def walk(node):
+            if node is element or (isinstance(node.tag, str) and node.tag not in _SKIP_TEXT_TAGS):
+                if node.text and node.text.strip():
+                    parts.append(node.text.strip())
+                for child in node:
+                    walk(child)
+            if node is not element and node.tail and node.tail.strip():
+                parts.append(node.tail.strip())
+
+        walk(element)
+        return ''.join(parts)
+
+    def result(self):
+        self._parser.close()
+        self._drain()
+        return {
+            'title': self.title,
+            'anchor_count': self.anchor_count,
+            'image_count': len(self.images),
+            'anchors': self.anchors,
+            'images': self.images,
+            'picture_sources': self.picture_sources,
+            'backgrounds': self.backgrounds,
+        }
+
+
+class SoupExtractor:
+    """BeautifulSoup fallback; buffers the document and builds the full tree"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def feed(self, data):
+        self._chunks.append(data)
+
+    def result(self):
+        from bs4 import BeautifulSoup
+
+        soup = BeautifulSoup(''.join(self._chunks), 'html.parser')
+        self._chunks = []
+        title = soup.find('title')
+        links = soup.find_all('a')
+        anchors = []
+        for link in links:
+            if link.get('href') is None:
+                continue
+            rel = link.get('rel', '')
+            anchors.append({
+                'href': link.get('href'),
+                'text': link.get_text(strip=True),
+                'title': link.get('title', ''),
+                'target': link.get('target', ''),
+                'rel': ' '.join(rel) if isinstance(rel, list) else rel,
+                'alt': link.get('alt', ''),
+            })
+        images = []
+        picture_sources = {}
+        for img in soup.find_all('img'):
+            picture = img.find_parent('picture')
+            sources = [self._attrs(source) for source in picture.find_all('source')] if picture else []
+            if sources:
+                picture_sources[len(images)] = sources
+            images.append(self._attrs(img))
+        backgrounds = []
+        for element in soup.find_all(style=True):
+            backgrounds.extend(background_urls(element['style']))
+        return {
+            'title': title.get_text() if title else None,
+            'anchor_count': len(links),
+            'image_count': len(images),
+            'anchors': anchors,
+            'images': images,
+            'picture_sources': picture_sources,
+            'backgrounds': backgrounds,
+        }
+
+    @staticmethod
+    def _attrs(element):
+        return {name: ' '.join(value) if isinstance(value, list) else value for name, value in element.attrs.items()}
+
+
+def resolve_backend(backend='auto'):
+    if backend not in PARSER_BACKENDS:
+        raise ValueError(f"Unknown parser backend: {backend}")
+    if backend == 'auto':
+        return 'lxml' if LXML_AVAILABLE else 'stream'
+    if backend == 'lxml' and not LXML_AVAILABLE:
+        return 'stream'
+    return backend
+
+
+def create_extractor(backend='auto'):
+    """Create an incremental extractor: call ``feed(chunk)`` then ``result()``"""
+    backend = resolve_backend(backend)
+    if backend == 'lxml':
+        return LxmlExtractor()
+    if backend == 'stream':
+        return StreamExtractor()
+    return SoupExtractor()
+
+
+def _extract(chunks, backend):
+    """Feed the chunks of ``chunks()`` to an extractor, again to BeautifulSoup if it fails"""
+    extractor = create_extractor(backend)
+    try:
+        for chunk in chunks():
+            extractor.feed(chunk)
+        return extractor.result()
+    except Exception:
+        if isinstance(extractor, SoupExtractor):
+            raise
+        fallback = SoupExtractor()
+        for chunk in chunks():
+            fallback.feed(chunk)
+        return fallback.result()
+
+
+def extract_page(html, backend='auto'):
+    """Extract title, anchors and images from a complete document.
+
+    Falls back to BeautifulSoup if the fast backend fails on the document.
+    """
+    return _extract(lambda: (html[start:start + FEED_CHUNK_SIZE] for start in range(0, len(html), FEED_CHUNK_SIZE)), backend)
+
+
+def iter_file_text(path, chunk_size=FEED_CHUNK_SIZE):
+    """Text of a UTF-8 file in slices of ``chunk_size`` characters"""
+    with open(path, 'r', encoding='utf-8', errors='replace', newline='') as handle:
+        while True:
+            chunk = handle.read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+
+
+def extract_page_file(path, backend='auto'):
+    """``extract_page`` for a UTF-8 document on disk, read a slice at a time"""
+    return _extract(lambda: iter_file_text(path, FEED_CHUNK_SIZE), backend)
@@ -0,0 +1,216 @@
+"""
+Persistent HTTP conditional-request cache.
+
+Responses that carry a validator (``ETag`` or ``Last-Modified``) are kept on
+disk keyed by URL. The next fetch of that URL sends ``If-None-Match`` /
+``If-Modified-Since``; on ``304 Not Modified`` the cached body is reused
+instead of downloading it again.
+
+Each entry is two files under ``<root>/<key[:2]>/``: ``<key>.json`` with the
+validators and response metadata, and ``<key>`` with the body. Image bodies
+are hardlinks to the blob store, so they cost no extra space. The cache is
+bounded by total body size and evicts the least recently used entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Optional
+
+
+class HTTPCache:
+    """Size-bounded LRU cache of validated HTTP responses"""
+
+    def __init__(self, root: str, max_bytes: int, enabled: bool = True,
+                 on_evict: Optional[Callable[[dict], None]] = None):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.on_evict = on_evict
+        self.total_bytes = 0
+        self.revalidated = 0  # 304 responses answered from the cache
+        self.stored = 0
+        self._index: "OrderedDict[str, int]" = OrderedDict()  # key -> body size, oldest first
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key_for(url: str) -> str:
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _paths(self, key: str):
+        folder = os.path.join(self.root, key[:2])
+        return os.path.join(folder, f"{key}.json"), os.path.join(folder, key)
+
+    def load(self):
+        """Rebuild the LRU index from disk (blocking, call at startup)"""
+        if not self.enabled:
+            return
+        os.makedirs(self.root, exist_ok=True)
+        entries = []
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if filename.endswith('.part'):
+                    os.remove(path)
+                elif filename.endswith('.json'):
+                    key = filename[:-len('.json')]
+                    body_path = self._paths(key)[1]
+                    try:
+                        entries.append((os.path.getmtime(path), key, os.path.getsize(body_path)))
+                    except FileNotFoundError:
+                        os.remove(path)
+        with self._lock:
+            self._index.clear()
+            self.total_bytes = 0
+            for _, key, size in sorted(entries):
+                self._index[key] = size
+                self.total_bytes += size
+        self._evict_over_budget()
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Cached metadata for ``url`` (with ``body_path``), or None (blocking)"""
+        if not self.enabled:
+            return None
+        key = self.key_for(url)
+        with self._lock:
+            if key not in self._index:
+                return None
+            self._index.move_to_end(key)
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path) as meta_file:
+                meta = json.load(meta_file)
+            os.utime(meta_path)  # Keeps the LRU order across restarts
+        except (OSError, ValueError):
+            self.evict(url)
+            return None
+        meta['body_path'] = body_path
+        return meta
+
+    @staticmethod
+    def validators(entry: Optional[dict]) -> dict:
+        """Conditional request headers for a cached entry"""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    @staticmethod
+    def is_cacheable(headers) -> bool:
+        if 'no-store' in headers.get('Cache-Control', '').lower():
+            return False
+        return bool(headers.get('ETag') or headers.get('Last-Modified'))
+
+    def store(self, url: str, headers, source_path: str, digest: Optional[str] = None):
+        """Cache a 200 response whose body is the file ``source_path``, linked when possible (blocking)"""
+        if not self.enabled or not self.is_cacheable(headers):
+            return
+        key = self.key_for(url)
+        meta_path, body_path = self._paths(key)
+        os.makedirs(os.path.dirname(body_path), exist_ok=True)
+
+        temp_body = f"{body_path}.{uuid.uuid4().hex}.part"
+        try:
+            os.link(source_path, temp_body)
+        except OSError:
+            shutil.copyfile(source_path, temp_body)
+        size = os.path.getsize(temp_body)
+        if size > self.max_bytes:
+            os.remove(temp_body)
+            return
+
+        old_meta = self._read_meta(meta_path)
+        meta = {
+            'url': url,
+            'etag': headers.get('ETag'),
+            'last_modified': headers.get('Last-Modified'),
+            'content_type': headers.get('Content-Type'),
+            'digest': digest,
+            'size': size,
+            'stored_at': time.time(),
+        }
+        os.replace(temp_body, body_path)
+        self._write_meta(meta_path, meta)
+        if old_meta and old_meta.get('digest') and old_meta.get('digest') != digest and self.on_evict:
+            self.on_evict(old_meta)
+
+        with self._lock:
+            self.total_bytes += size - self._index.pop(key, 0)
+            self._index[key] = size
+            self.stored += 1
+        self._evict_over_budget()
+
+    def refresh(self, url: str, headers):
+        """Count a 304 answered from the cache and record any new validators it sent (blocking)"""
+        with self._lock:
+            self.revalidated += 1
+        entry = self.lookup(url)
+        if not entry:
+            return
+        changed = False
+        for field, header in (('etag', 'ETag'), ('last_modified', 'Last-Modified')):
+            if headers.get(header) and headers.get(header) != entry.get(field):
+                entry[field] = headers.get(header)
+                changed = True
+        if changed:
+            entry.pop('body_path', None)
+            self._write_meta(self._paths(self.key_for(url))[0], entry)
+
+    def evict(self, url: str):
+        """Drop the entry of ``url`` (blocking)"""
+        self._evict_key(self.key_for(url))
+
+    def _evict_key(self, key: str):
+        meta_path, body_path = self._paths(key)
+        meta = self._read_meta(meta_path)
+        for path in (meta_path, body_path):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        with self._lock:
+            self.total_bytes -= self._index.pop(key, 0)
+        if meta and self.on_evict:
+            self.on_evict(meta)
+
+    def _evict_over_budget(self):
+        while True:
+            with self._lock:
+                if self.total_bytes <= self.max_bytes or not self._index:
+                    return
+                key = next(iter(self._index))
+            self._evict_key(key)
+
+    @staticmethod
+    def _read_meta(meta_path: str) -> Optional[dict]:
+        try:
+            with open(meta_path) as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _write_meta(meta_path: str, meta: dict):
+        temp_meta = f"{meta_path}.{uuid.uuid4().hex}.part"
+        with open(temp_meta, 'w') as meta_file:
+            json.dump(meta, meta_file)
+        os.replace(temp_meta, meta_path)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._index),
+                "size_mb": round(self.total_bytes / (1024 * 1024), 2),
+                "max_size_mb": round(self.max_bytes / (1024 * 1024), 2),
+                "revalidated": self.revalidated,
+                "stored": self.stored,
+            }
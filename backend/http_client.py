@@ -0,0 +1,88 @@
+"""
+Process-wide pooled HTTP client.
+
+One aiohttp session is created in the FastAPI lifespan handler and shared by
+every fetch path, so keep-alive connections, the DNS cache and the connection
+limits apply across scraping sessions instead of per request.
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+from typing import Optional
+
+import aiohttp
+
+
+class SharedHTTPClient:
+    """Owns the shared aiohttp session and its pooled connector"""
+
+    def __init__(self, limit: int, limit_per_host: int, dns_cache_ttl: int,
+                 keepalive_timeout: float, headers: Optional[dict] = None):
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+        self.keepalive_timeout = keepalive_timeout
+        self.headers = headers or {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _create_session(self) -> aiohttp.ClientSession:
+        connector = aiohttp.TCPConnector(
+            limit=self.limit,
+            limit_per_host=self.limit_per_host,
+            use_dns_cache=True,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=self.keepalive_timeout,
+        )
+        return aiohttp.ClientSession(connector=connector, headers=self.headers)
+
+    async def start(self):
+        """Create the shared session on the running event loop"""
+        if self._session is None or self._session.closed:
+            self._session = self._create_session()
+            self._loop = asyncio.get_running_loop()
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._loop = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None and not self._session.closed
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if not self.started:
+            raise RuntimeError("Shared HTTP client is not started")
+        return self._session
+
+    def stats(self) -> dict:
+        """Connection pool settings for monitoring endpoints"""
+        if not self.started:
+            return {"started": False}
+        return {
+            "started": True,
+            "limit": self.limit,
+            "limit_per_host": self.limit_per_host,
+            "dns_cache_ttl": self.dns_cache_ttl,
+            "keepalive_timeout": self.keepalive_timeout,
+        }
+
+    @asynccontextmanager
+    async def acquire(self):
+        """Yield the shared session, or a short-lived one when called outside
+        the loop that owns it (e.g. before the lifespan handler has run)"""
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self.started and loop is self._loop:
+            yield self._session
+        else:
+            session = self._create_session()
+            try:
+                yield session
+            finally:
+                await session.close()
@@ -0,0 +1,159 @@
+"""
+Image source discovery.
+
+An ``<img src>`` is often only a placeholder: the real asset is in
+``srcset``, in the ``<source>`` elements of an enclosing ``<picture>``, in a
+lazy-loading attribute (``data-src``, ``data-lazy``, ...) or in an inline
+``background-image`` style. ``discover_images`` collects all of these from
+the extractor output, picks one candidate per image under a width/DPR policy
+and skips images that are only another resolution of one already chosen.
+
+Policy (``target_width`` in CSS pixels, ``dpr`` device pixel ratio):
+
+- ``w`` descriptors: the smallest candidate at least ``target_width * dpr``
+  wide, else the widest; the widest if ``target_width`` is None
+- ``x`` descriptors (``src`` counts as ``1x``): the smallest density of at
+  least ``dpr``, else the highest; the highest if ``target_width`` is None
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+LAZY_SRC_ATTRIBUTES = ('data-src', 'data-lazy-src', 'data-lazy', 'data-original')
+LAZY_SRCSET_ATTRIBUTES = ('data-srcset', 'data-lazy-srcset')
+
+# <source type="..."> values worth downloading (no type means any)
+ACCEPTED_SOURCE_TYPES = ('image/jpeg', 'image/png', 'image/gif', 'image/webp', 'image/svg+xml')
+
+# (url, amount, 'w' or 'x')
+Candidate = Tuple[str, float, str]
+
+
+def parse_srcset(value: Optional[str]) -> List[Candidate]:
+    """Parse a srcset attribute; URLs may contain commas (e.g. CDN transform parameters)"""
+    candidates = []
+    if not value:
+        return candidates
+    position, length = 0, len(value)
+    while position < length:
+        while position < length and (value[position].isspace() or value[position] == ','):
+            position += 1
+        start = position
+        while position < length and not value[position].isspace():
+            position += 1
+        url = value[start:position]
+        descriptor = ''
+        if url.endswith(','):
+            url = url.rstrip(',')
+        else:
+            start = position
+            while position < length and value[position] != ',':
+                position += 1
+            descriptor = value[start:position].strip()
+        if not url:
+            continue
+        candidate = _parse_descriptor(url, descriptor)
+        if candidate:
+            candidates.append(candidate)
+    return candidates
+
+
+def _parse_descriptor(url: str, descriptor: str) -> Optional[Candidate]:
+    if not descriptor:
+        return url, 1.0, 'x'
+    # Only the first descriptor matters for selection ("100w", "2x"); height descriptors are ignored
+    token = descriptor.split()[0].lower()
+    try:
+        if token.endswith('w'):
+            return url, float(int(token[:-1])), 'w'
+        if token.endswith('x'):
+            return url, float(token[:-1]), 'x'
+    except ValueError:
+        return None
+    return None
+
+
+def choose_candidate(candidates: List[Candidate], target_width: Optional[int] = None,
+                     dpr: float = 1.0) -> Optional[str]:
+    """Pick one URL from a candidate set under the width/DPR policy"""
+    widths = [candidate for candidate in candidates if candidate[2] == 'w']
+    pool = widths or candidates
+    if not pool:
+        return None
+    if target_width is None:
+        return max(pool, key=lambda candidate: candidate[1])[0]
+    needed = target_width * dpr if widths else dpr
+    large_enough = [candidate for candidate in pool if candidate[1] >= needed]
+    if large_enough:
+        return min(large_enough, key=lambda candidate: candidate[1])[0]
+    return max(pool, key=lambda candidate: candidate[1])[0]
+
+
+def _first_attribute(attrs: Dict[str, str], names) -> Optional[str]:
+    for name in names:
+        value = (attrs.get(name) or '').strip()
+        if value:
+            return value
+    return None
+
+
+def image_candidates(img: Dict[str, str], sources: List[Dict[str, str]]) -> Tuple[List[Candidate], Optional[str]]:
+    """All real sources of one ``<img>``: ``(srcset candidates, plain src)``.
+
+    The plain src is None when it is only a placeholder, i.e. a lazy-loading
+    attribute names the real image, or a srcset exists and src is a data URI.
+    """
+    candidates = []
+    for source in sources:
+        source_type = (source.get('type') or '').split(';')[0].strip().lower()
+        if source_type and source_type not in ACCEPTED_SOURCE_TYPES:
+            continue
+        candidates.extend(parse_srcset(_first_attribute(source, LAZY_SRCSET_ATTRIBUTES + ('srcset',))))
+    candidates.extend(parse_srcset(_first_attribute(img, LAZY_SRCSET_ATTRIBUTES + ('srcset',))))
+
+    src = _first_attribute(img, LAZY_SRC_ATTRIBUTES)
+    if src is None:
+        src = img.get('src') or None
+        if src and candidates and src.startswith('data:'):
+            src = None
+    return candidates, src
+
+
+def discover_images(extracted: dict, resolve_url: Callable[[str], Optional[str]],
+                    target_width: Optional[int] = None, dpr: float = 1.0) -> List[Tuple[int, str]]:
+    """Chosen ``(index, url)`` per image of an extracted page.
+
+    ``resolve_url`` makes a page-relative URL absolute (None to drop it).
+    ``<img>`` elements keep their document index; background images are
+    numbered after them. Data URIs are returned unresolved.
+    """
+    picture_sources = extracted.get('picture_sources') or {}
+    chosen = []
+    seen_urls = set()
+
+    def resolve(url):
+        return url if url.startswith('data:') else resolve_url(url)
+
+    for img_index, img in enumerate(extracted['images']):
+        candidates, src = image_candidates(img, picture_sources.get(img_index, []))
+        if src and not any(candidate[2] == 'w' for candidate in candidates):
+            candidates.append((src, 1.0, 'x'))
+        url = choose_candidate(candidates, target_width, dpr) if candidates else src
+        url = resolve(url) if url else None
+        if not url:
+            continue
+
+        # Another resolution of an image already chosen is the same image
+        variants = {resolve(candidate[0]) for candidate in candidates} - {None}
+        variants.add(url)
+        if variants & seen_urls:
+            continue
+        seen_urls.update(variants)
+        chosen.append((img_index, url))
+
+    offset = len(extracted['images'])
+    for background_index, background in enumerate(extracted.get('backgrounds') or []):
+        url = resolve(background)
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            chosen.append((offset + background_index, url))
+    return chosen
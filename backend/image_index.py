@@ -0,0 +1,129 @@
+"""
+Persistent index of downloaded images.
+
+Maps an image URL to the content hash (blob store digest), size and MIME type
+of its last download, plus a "fresh until" timestamp. While an entry is fresh
+and its blob still exists, the image is linked from the blob store without
+any network request.
+
+Freshness policy, evaluated when an image is downloaded:
+
+- ``Cache-Control: immutable`` is fresh for ``max_ttl``
+- ``Cache-Control: max-age=N`` is fresh for N seconds (capped at ``max_ttl``)
+- fingerprinted URLs (a hex hash in the path, or a version query parameter)
+  are fresh for ``fingerprint_ttl``
+- anything else for ``default_ttl`` (0: always ask the server)
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlsplit
+
+# A content hash: 16+ hex digits with at least one letter, so numeric IDs and dates are not hashes
+CONTENT_HASH = r'(?=[0-9]*[a-f])[0-9a-f]{16,}'
+# e.g. /static/app.3f9a2c1d8e7b6a50.png, /img/5d41402abc4b2a76b9719d911017c592/logo.jpg
+FINGERPRINT_PATH = re.compile(rf'(?:^|[./_-]){CONTENT_HASH}(?=[./_-]|$)')
+FINGERPRINT_QUERY = re.compile(rf'(?:^|&)(?:v|ver|version|hash|rev)={CONTENT_HASH}(?:&|$)')
+MAX_AGE = re.compile(r'max-age=(\d+)')
+
+
+def is_fingerprinted(url: str) -> bool:
+    parts = urlsplit(url)
+    return bool(FINGERPRINT_PATH.search(parts.path) or FINGERPRINT_QUERY.search(parts.query))
+
+
+class ImageIndex:
+    """SQLite-backed URL -> blob index with a freshness policy"""
+
+    def __init__(self, path: str, enabled: bool = True, default_ttl: float = 0,
+                 fingerprint_ttl: float = 30 * 86400, max_ttl: float = 365 * 86400):
+        self.path = path
+        self.enabled = enabled
+        self.default_ttl = default_ttl
+        self.fingerprint_ttl = fingerprint_ttl
+        self.max_ttl = max_ttl
+        self.skipped = 0  # downloads satisfied from the index
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        if not self.enabled or self._conn is not None:
+            return
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS images ("
+            " url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER NOT NULL,"
+            " content_type TEXT, fetched_at REAL NOT NULL, fresh_until REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def ttl_for(self, url: str, headers) -> float:
+        """Seconds a download of ``url`` with response ``headers`` may be reused without asking"""
+        cache_control = (headers.get('Cache-Control') or '').lower()
+        if 'no-store' in cache_control or 'no-cache' in cache_control:
+            return 0
+        if 'immutable' in cache_control:
+            return self.max_ttl
+        max_age = MAX_AGE.search(cache_control)
+        if max_age:
+            return min(float(max_age.group(1)), self.max_ttl)
+        if is_fingerprinted(url):
+            return self.fingerprint_ttl
+        return self.default_ttl
+
+    def lookup_fresh(self, url: str) -> Optional[dict]:
+        """The index entry for ``url`` if it may be used without a request"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest, size, content_type FROM images WHERE url = ? AND fresh_until > ?",
+                (url, time.time())
+            ).fetchone()
+        if row is None:
+            return None
+        return {'digest': row[0], 'size': row[1], 'content_type': row[2]}
+
+    def record(self, url: str, digest: str, size: int, content_type: Optional[str], headers):
+        """Remember a successful download (or a 304 revalidation)"""
+        if self._conn is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO images (url, digest, size, content_type, fetched_at, fresh_until)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, digest, size, content_type, now, now + self.ttl_for(url, headers))
+            )
+            self._conn.commit()
+
+    def forget(self, url: str):
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM images WHERE url = ?", (url,))
+            self._conn.commit()
+
+    def mark_skipped(self):
+        with self._lock:
+            self.skipped += 1
+
+    def stats(self) -> dict:
+        if self._conn is None:
+            return {"enabled": self.enabled, "entries": 0, "fresh": 0, "skipped_downloads": self.skipped}
+        with self._lock:
+            entries, fresh = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(fresh_until > ?), 0) FROM images", (time.time(),)
+            ).fetchone()
+        return {"enabled": self.enabled, "entries": entries, "fresh": fresh, "skipped_downloads": self.skipped}
@@ -0,0 +1,315 @@
+"""
+Post-download image processing.
+
+``probe_image`` reads the format and pixel dimensions from the file header
+(PNG, GIF, JPEG, WebP, BMP and SVG are parsed directly; nothing is decoded).
+``process_image`` additionally writes a small thumbnail and, optionally, a
+WebP/AVIF transcode of the image; both need Pillow, which is optional.
+
+``ImageProcessor`` runs ``process_image`` for all images of a session in a
+bounded pool of worker processes, so decoding and resizing never compete with
+the event loop or the GIL of the server process.
+"""
+
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+import re
+import struct
+import threading
+import uuid
+from typing import Callable, Dict, List, Optional
+
+try:
+    from PIL import Image, features
+    PILLOW_AVAILABLE = True
+except ImportError:  # pragma: no cover - depends on the environment
+    Image = None
+    features = None
+    PILLOW_AVAILABLE = False
+
+THUMBNAIL_DIR = '.thumbs'
+PROBE_BYTES = 64 * 1024
+
+# Formats Pillow can thumbnail / transcode (SVG is vector, animated GIFs are left alone)
+RASTER_FORMATS = ('jpeg', 'png', 'gif', 'webp', 'bmp')
+TRANSCODABLE_FORMATS = ('jpeg', 'png', 'bmp')
+TRANSCODE_FORMATS = ('webp', 'avif')
+
+_SVG_TAG = re.compile(rb'<svg\b[^>]*>', re.IGNORECASE | re.DOTALL)
+_SVG_ATTR = re.compile(rb'\b(width|height|viewBox)\s*=\s*["\']([^"\']*)["\']', re.IGNORECASE)
+_SVG_LENGTH = re.compile(rb'^\s*([0-9.]+)\s*(px)?\s*$')
+
+
+def _jpeg_size(image_file):
+    """Scan JPEG segments up to the first SOF marker"""
+    image_file.seek(2)
+    while True:
+        marker = image_file.read(2)
+        while marker and marker[0] != 0xFF:
+            marker = marker[1:] + image_file.read(1)
+        if len(marker) < 2:
+            return None
+        code = marker[1]
+        if code == 0xFF:
+            image_file.seek(-1, os.SEEK_CUR)  # Fill byte
+            continue
+        if code in (0x01, 0xD8) or 0xD0 <= code <= 0xD7:
+            continue  # Markers without a length
+        length_bytes = image_file.read(2)
+        if len(length_bytes) < 2:
+            return None
+        length = struct.unpack('>H', length_bytes)[0]
+        if 0xC0 <= code <= 0xCF and code not in (0xC4, 0xC8, 0xCC):
+            header = image_file.read(5)
+            if len(header) < 5:
+                return None
+            height, width = struct.unpack('>HH', header[1:5])
+            return width, height
+        image_file.seek(length - 2, os.SEEK_CUR)
+
+
+def _svg_size(head: bytes):
+    tag = _SVG_TAG.search(head)
+    if not tag:
+        return None
+    attrs = {name.decode().lower(): value for name, value in _SVG_ATTR.findall(tag.group(0))}
+    width, height = (_SVG_LENGTH.match(attrs.get(name, b'')) for name in ('width', 'height'))
+    if width and height:
+        return round(float(width.group(1))), round(float(height.group(1)))
+    view_box = attrs.get('viewbox', b'').replace(b',', b' ').split()
+    if len(view_box) == 4:
+        try:
+            return round(float(view_box[2])), round(float(view_box[3]))
+        except ValueError:
+            return None
+    return None
+
+
+def probe_image(path: str) -> Dict[str, Optional[object]]:
+    """Format and dimensions from the file header: ``{"format", "width", "height"}``"""
+    info = {'format': None, 'width': None, 'height': None}
+    with open(path, 'rb') as image_file:
+        head = image_file.read(PROBE_BYTES)
+        size = None
+        if head.startswith(b'\x89PNG\r\n\x1a\n') and len(head) >= 24:
+            info['format'] = 'png'
+            size = struct.unpack('>II', head[16:24])
+        elif head[:6] in (b'GIF87a', b'GIF89a') and len(head) >= 10:
+            info['format'] = 'gif'
+            size = struct.unpack('<HH', head[6:10])
+        elif head.startswith(b'\xff\xd8'):
+            info['format'] = 'jpeg'
+            size = _jpeg_size(image_file)
+        elif head[:4] == b'RIFF' and head[8:12] == b'WEBP' and len(head) >= 30:
+            info['format'] = 'webp'
+            chunk = head[12:16]
+            if chunk == b'VP8 ':
+                width, height = struct.unpack('<HH', head[26:30])
+                size = width & 0x3FFF, height & 0x3FFF
+            elif chunk == b'VP8L':
+                bits = struct.unpack('<I', head[21:25])[0]
+                size = (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+            elif chunk == b'VP8X':
+                size = int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+        elif head.startswith(b'BM') and len(head) >= 26:
+            info['format'] = 'bmp'
+            width, height = struct.unpack('<ii', head[18:26])
+            size = width, abs(height)
+        elif b'<svg' in head[:4096].lower():
+            info['format'] = 'svg'
+            size = _svg_size(head)
+        elif PILLOW_AVAILABLE:
+            # Other formats (AVIF, TIFF, ...): Image.open only parses the header
+            try:
+                with Image.open(path) as image:
+                    info['format'] = (image.format or '').lower() or None
+                    size = image.size
+            except Exception:
+                pass
+    if size:
+        info['width'], info['height'] = int(size[0]), int(size[1])
+    return info
+
+
+def transcode_supported(fmt: str) -> bool:
+    return PILLOW_AVAILABLE and fmt in TRANSCODE_FORMATS and bool(features.check(fmt))
+
+
+def _save_atomic(image, path: str, fmt: str, **params):
+    temp_path = f"{path}.part"
+    image.save(temp_path, format=fmt, **params)
+    os.replace(temp_path, path)
+
+
+def process_image(path: str, thumbnail_path: Optional[str], thumbnail_size: int,
+                  transcode_format: Optional[str], transcode_path: Optional[str], quality: int) -> dict:
+    """Probe one image and write its thumbnail / transcode (runs in a worker process).
+
+    The transcode is only kept when it is smaller than the original; its path
+    and sha256 are returned so the caller can store it.
+    """
+    result = probe_image(path)
+    result['size'] = os.path.getsize(path)
+    fmt = result['format']
+    if not PILLOW_AVAILABLE or fmt not in RASTER_FORMATS:
+        return result
+
+    with Image.open(path) as image:
+        if thumbnail_path and thumbnail_size:
+            # JPEG decodes at a reduced scale directly (DCT scaling), the others are resized
+            image.draft('RGB', (thumbnail_size, thumbnail_size))
+            thumbnail = image if image.mode in ('RGB', 'RGBA') else image.convert('RGBA')
+            thumbnail.thumbnail((thumbnail_size, thumbnail_size))
+            thumbnail_format = 'WEBP' if features.check('webp') else 'PNG'
+            _save_atomic(thumbnail, thumbnail_path, thumbnail_format, **({'quality': 75} if thumbnail_format == 'WEBP' else {}))
+            result['thumbnail'] = os.path.basename(thumbnail_path)
+
+    if transcode_format and transcode_path and fmt in TRANSCODABLE_FORMATS and transcode_supported(transcode_format):
+        with Image.open(path) as image:
+            if image.mode not in ('RGB', 'RGBA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+            _save_atomic(image, transcode_path, transcode_format.upper(), quality=quality)
+        transcoded_size = os.path.getsize(transcode_path)
+        if transcoded_size < result['size']:
+            digest = hashlib.sha256()
+            with open(transcode_path, 'rb') as transcoded:
+                for chunk in iter(lambda: transcoded.read(1024 * 1024), b''):
+                    digest.update(chunk)
+            result['transcoded'] = {'path': transcode_path, 'size': transcoded_size, 'digest': digest.hexdigest()}
+        else:
+            os.remove(transcode_path)
+    return result
+
+
+def _lost(future: concurrent.futures.Future) -> bool:
+    """Whether a future died with its recycled pool instead of finishing"""
+    if not future.done() or future.cancelled():
+        return True
+    return isinstance(future.exception(), concurrent.futures.BrokenExecutor)
+
+
+def thumbnail_name(image_name: str) -> str:
+    extension = 'webp' if PILLOW_AVAILABLE and features.check('webp') else 'png'
+    return f"{os.path.splitext(image_name)[0]}.{extension}"
+
+
+class ImageProcessor:
+    """Pool of worker processes post-processing downloaded images"""
+
+    def __init__(self, workers: int = 2, timeout: float = 30.0, thumbnail_size: int = 256,
+                 transcode_format: Optional[str] = None, quality: int = 80,
+                 process: Optional[Callable[..., dict]] = None):
+        self.workers = workers
+        self.timeout = timeout
+        self.process = process or process_image  # Module-level, so worker processes can import it
+        self.thumbnail_size = thumbnail_size
+        self.transcode_format = transcode_format
+        self.quality = quality
+        self.processed = 0
+        self.failures = 0
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._pool
+
+    def _recycle(self, pool: concurrent.futures.ProcessPoolExecutor):
+        """Kill a pool with a stuck worker; the next image starts a fresh one"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, jobs: Dict[str, tuple]):
+        """``(pool, futures)`` for the jobs; no futures if worker processes could not be started"""
+        pool = self._get_pool()
+        try:
+            return pool, {name: pool.submit(self.process, *args) for name, args in jobs.items()}
+        except Exception:
+            self._recycle(pool)
+            return pool, {}
+
+    def process_session(self, session_dir: str, image_names: List[str], temp_dir: Optional[str] = None) -> Dict[str, dict]:
+        """Process the named images of a session folder (blocking).
+
+        Transcodes are written to ``temp_dir`` (default: the session folder)
+        and reported in the result; the caller decides what to do with them.
+        """
+        thumbnail_dir = os.path.join(session_dir, THUMBNAIL_DIR)
+        if self.thumbnail_size:
+            os.makedirs(thumbnail_dir, exist_ok=True)
+        jobs = {}
+        for name in image_names:
+            jobs[name] = (
+                os.path.join(session_dir, name),
+                os.path.join(thumbnail_dir, thumbnail_name(name)) if self.thumbnail_size else None,
+                self.thumbnail_size,
+                self.transcode_format,
+                os.path.join(temp_dir or session_dir, f".{uuid.uuid4().hex}.{self.transcode_format}")
+                if self.transcode_format else None,
+                self.quality,
+            )
+
+        results = {}
+        failures = 0
+        if self.workers > 0:
+            # Without futures (no worker processes) only the header probe below runs
+            pool, futures = self._submit(jobs)
+            names = list(futures)
+            for position, name in enumerate(names):
+                try:
+                    results[name] = futures[name].result(timeout=self.timeout)
+                except concurrent.futures.TimeoutError:
+                    # Only the stuck image fails; the images the recycled pool lost go to a fresh one
+                    failures += 1
+                    self._recycle(pool)
+                    lost = {later: jobs[later] for later in names[position + 1:] if _lost(futures[later])}
+                    if lost:
+                        pool, resubmitted = self._submit(lost)
+                        futures.update(resubmitted)
+                except Exception:
+                    failures += 1
+        else:
+            for name, args in jobs.items():
+                try:
+                    results[name] = self.process(*args)
+                except Exception:
+                    failures += 1
+
+        # Images the workers could not handle still get their header information
+        for name, args in jobs.items():
+            if name not in results:
+                try:
+                    results[name] = dict(probe_image(args[0]), size=os.path.getsize(args[0]))
+                except OSError:
+                    pass
+        with self._lock:
+            self.processed += len(results)
+            self.failures += failures
+        return results
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "pillow": PILLOW_AVAILABLE,
+            "thumbnail_size": self.thumbnail_size,
+            "transcode_format": self.transcode_format,
+            "processed": self.processed,
+            "failures": self.failures,
+        }
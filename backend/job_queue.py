@@ -0,0 +1,237 @@
+"""
+Background job queue for scraping sessions.
+
+Scrape requests are registered as jobs keyed by session ID and executed by a
+bounded pool of asyncio worker tasks, so the HTTP request that submitted them
+can return immediately and clients poll for progress instead.
+
+Each job also keeps a bounded buffer of numbered events (status changes,
+pages, images) that clients can follow as they happen; ``emit`` may be called
+from worker threads. Finished jobs are dropped once older than a TTL or past a
+cap on their number; their sessions' manifests keep the final state.
+"""
+
+import asyncio
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_FINISHED = (JOB_DONE, JOB_FAILED)
+
+EVENT_BUFFER_SIZE = 1000  # Events kept per job for late or reconnecting subscribers
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more jobs"""
+
+
+class QueueNotRunningError(Exception):
+    """Raised when a job is submitted before the workers are started"""
+
+
+class ScrapeJob:
+    """State and live progress counters of a single scraping job"""
+
+    def __init__(self, session_id: str, url: str, options: Optional[dict] = None, export_format: str = "csv",
+                 urls: Optional[List[str]] = None, incremental: bool = False):
+        self.session_id = session_id
+        self.url = url
+        self.options = options or {}
+        self.export_format = export_format
+        self.urls = urls or []  # Batch scrape: every URL is a start page, ``url`` is the first one
+        self.incremental = incremental  # Export only what changed since each page's last scrape
+        self.status = JOB_QUEUED
+        self.created_at = datetime.now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.pages_crawled = 0
+        self.links_found = 0
+        self.images_downloaded = 0
+        self.bytes_written = 0
+        self.error: Optional[str] = None
+        self.result: Optional[dict] = None
+        self.events: "deque[Tuple[int, str, dict]]" = deque(maxlen=EVENT_BUFFER_SIZE)
+        self.last_event_id = 0
+        self._event_lock = threading.Lock()
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event_signal: Optional[asyncio.Event] = None
+
+    def add_bytes(self, count: int):
+        """Record bytes written to the session directory"""
+        self.bytes_written += count
+
+    def progress(self) -> dict:
+        return {
+            "pages_crawled": self.pages_crawled,
+            "links_found": self.links_found,
+            "images_downloaded": self.images_downloaded,
+            "bytes_written": self.bytes_written,
+        }
+
+    def emit(self, event: str, **data):
+        """Record an event and wake the subscribers (safe to call from any thread)"""
+        with self._event_lock:
+            self.last_event_id += 1
+            self.events.append((self.last_event_id, event, data))
+        loop = self._event_loop
+        if loop is not None:
+            try:
+                loop.call_soon_threadsafe(self._wake_subscribers)
+            except RuntimeError:
+                pass  # Event loop already closed
+
+    def _wake_subscribers(self):
+        if self._event_signal is not None:
+            self._event_signal.set()
+            self._event_signal = None
+
+    def events_after(self, event_id: int) -> List[Tuple[int, str, dict]]:
+        """Buffered events newer than ``event_id``; older ones may have been dropped"""
+        with self._event_lock:
+            return [item for item in self.events if item[0] > event_id]
+
+    async def wait_for_events(self, event_id: int, timeout: float) -> List[Tuple[int, str, dict]]:
+        """Events newer than ``event_id``, waiting up to ``timeout`` seconds for one (empty on timeout)"""
+        self._event_loop = asyncio.get_running_loop()
+        events = self.events_after(event_id)
+        if events:
+            return events
+        if self._event_signal is None:
+            self._event_signal = asyncio.Event()
+        try:
+            await asyncio.wait_for(self._event_signal.wait(), timeout)
+        except asyncio.TimeoutError:
+            return []
+        return self.events_after(event_id)
+
+    def status_event(self):
+        """Emit the current status with its progress, result or error"""
+        self.emit("status", status=self.status, error=self.error, result=self.result, progress=self.progress())
+
+    def to_dict(self) -> dict:
+        return {
+            "session_id": self.session_id,
+            "url": self.url,
+            "status": self.status,
+            "format": self.export_format,
+            "batch_size": len(self.urls) or None,
+            "incremental": self.incremental,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+            "progress": self.progress(),
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """Bounded asyncio worker pool executing scrape jobs in FIFO order"""
+
+    def __init__(self, worker_count: int, max_queue_size: int = 0, finished_ttl: float = 0, max_finished: int = 0):
+        self.worker_count = worker_count
+        self.max_queue_size = max_queue_size
+        self.finished_ttl = finished_ttl  # Seconds a finished job is kept (0 = no limit)
+        self.max_finished = max_finished  # Finished jobs kept at most (0 = no limit)
+        self.jobs: Dict[str, ScrapeJob] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._handler: Optional[Callable[[ScrapeJob], Awaitable[None]]] = None
+        self._logger = None
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self, handler: Callable[[ScrapeJob], Awaitable[None]], logger=None):
+        """Spawn the worker tasks on the running event loop"""
+        if self._workers:
+            return
+        self._handler = handler
+        self._logger = logger
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(i), name=f"scrape-worker-{i}")
+            for i in range(self.worker_count)
+        ]
+
+    async def stop(self):
+        """Cancel the workers; queued jobs that never started are marked failed"""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        for job in self.jobs.values():
+            if job.status in (JOB_QUEUED, JOB_RUNNING):
+                job.status = JOB_FAILED
+                job.error = "Server shut down before the job finished"
+                job.finished_at = datetime.now()
+                job.status_event()
+
+    def submit(self, job: ScrapeJob) -> ScrapeJob:
+        """Register and enqueue a job without waiting for it to run"""
+        if not self.running:
+            raise QueueNotRunningError("Scrape workers are not running")
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError(f"Job queue is full ({self.max_queue_size} jobs pending)")
+        self.prune()
+        self.jobs[job.session_id] = job
+        job.status_event()
+        return job
+
+    def get(self, session_id: str) -> Optional[ScrapeJob]:
+        return self.jobs.get(session_id)
+
+    def forget(self, session_id: str):
+        """Drop the job record, e.g. after its session folder was cleaned up"""
+        self.jobs.pop(session_id, None)
+
+    def prune(self) -> int:
+        """Drop finished jobs past ``finished_ttl`` and the oldest beyond ``max_finished``; returns how many"""
+        finished = sorted(
+            (job for job in self.jobs.values() if job.status in JOB_FINISHED and job.finished_at),
+            key=lambda job: job.finished_at
+        )
+        expired = max(len(finished) - self.max_finished, 0) if self.max_finished else 0
+        if self.finished_ttl:
+            cutoff = datetime.now() - timedelta(seconds=self.finished_ttl)
+            expired = max(expired, sum(1 for job in finished if job.finished_at < cutoff))
+        for job in finished[:expired]:
+            del self.jobs[job.session_id]
+        return expired
+
+    def counts(self) -> dict:
+        counts = {JOB_QUEUED: 0, JOB_RUNNING: 0, JOB_DONE: 0, JOB_FAILED: 0}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return counts
+
+    async def _worker(self, worker_id: int):
+        while True:
+            job = await self._queue.get()
+            job.status = JOB_RUNNING
+            job.started_at = datetime.now()
+            job.status_event()
+            try:
+                await self._handler(job)
+                job.status = JOB_DONE
+            except asyncio.CancelledError:
+                job.status = JOB_FAILED
+                job.error = "Job cancelled"
+                raise
+            except Exception as e:
+                job.status = JOB_FAILED
+                job.error = str(e)
+                if self._logger:
+                    self._logger.error(f"Scrape job {job.session_id} failed in worker {worker_id}: {str(e)}")
+            finally:
+                job.finished_at = datetime.now()
+                job.status_event()
+                self._queue.task_done()
+                self.prune()
@@ -0,0 +1,113 @@
+"""
+Batch link normalization.
+
+All hrefs of a page are resolved against one pre-parsed base URL and
+canonicalized (lowercase scheme and host, default port stripped, fragment
+dropped, query parameters sorted) so that equivalent links deduplicate.
+Each distinct href is processed once per page.
+"""
+
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+# hrefs with these prefixes never point to a fetchable page
+SKIPPED_PREFIXES = ('javascript:', 'mailto:', 'tel:', '#', 'data:')
+ALLOWED_SCHEMES = ('http', 'https')
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+class LinkNormalizer:
+    """Resolves and canonicalizes hrefs found on one page"""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url
+        self._base = urlsplit(base_url)
+        self._cache: Dict[str, Optional[str]] = {}
+
+    def _join(self, href: str) -> str:
+        # Absolute and scheme-relative hrefs don't need the RFC 3986 merge
+        if href.startswith(('http://', 'https://', 'HTTP://', 'HTTPS://')):
+            return href
+        if href.startswith('//'):
+            return f"{self._base.scheme}:{href}"
+        return urljoin(self.base_url, href)
+
+    def _canonicalize(self, url: str, sort_query: bool) -> Optional[str]:
+        try:
+            parts = urlsplit(url)
+            port = parts.port
+        except ValueError:
+            return None
+        scheme = parts.scheme.lower()
+        if scheme not in ALLOWED_SCHEMES or not parts.hostname:
+            return None
+
+        netloc = parts.hostname.lower()
+        if ':' in netloc:
+            netloc = f"[{netloc}]"  # IPv6 literal
+        if port is not None and port != DEFAULT_PORTS[scheme]:
+            netloc = f"{netloc}:{port}"
+        if parts.username is not None:
+            userinfo = parts.username if parts.password is None else f"{parts.username}:{parts.password}"
+            netloc = f"{userinfo}@{netloc}"
+
+        query = parts.query
+        if sort_query and query:
+            # Sort the raw pairs so percent-encoding is preserved exactly
+            query = '&'.join(sorted(pair for pair in query.split('&') if pair))
+        return urlunsplit((scheme, netloc, parts.path or '/', query, ''))
+
+    def normalize(self, href: Optional[str]) -> Optional[str]:
+        """Canonical absolute URL for a link href, or None if it should be skipped"""
+        if href is None:
+            return None
+        cached = self._cache.get(href)
+        if cached is not None or href in self._cache:
+            return cached
+        cleaned = href.strip()
+        result = None
+        if cleaned and not cleaned.lower().startswith(SKIPPED_PREFIXES):
+            result = self._canonicalize(self._join(cleaned), sort_query=True)
+        self._cache[href] = result
+        return result
+
+    def resolve(self, src: Optional[str]) -> Optional[str]:
+        """Absolute URL for a resource (e.g. an image) without reordering its query"""
+        if not src:
+            return None
+        cleaned = src.strip()
+        if not cleaned or cleaned.lower().startswith(SKIPPED_PREFIXES):
+            return None
+        return self._canonicalize(self._join(cleaned), sort_query=False)
+
+
+def canonical_url(url: str) -> Optional[str]:
+    """Canonical form of an absolute URL, as links found on pages get it; None if not http(s)"""
+    return LinkNormalizer(url).normalize(url)
+
+
+def normalize_links(anchors: Iterable[dict], base_url: str, text_limit: int = 200,
+                    title_limit: int = 100) -> List[dict]:
+    """Turn extracted anchors into unique link records in document order.
+
+    ``anchors`` are dicts as produced by ``html_parsing``; the records have
+    the CSV columns ``url, text, title, target, rel``.
+    """
+    normalizer = LinkNormalizer(base_url)
+    links = []
+    seen_urls = set()
+    for anchor in anchors:
+        url = normalizer.normalize(anchor['href'])
+        if url is None or url in seen_urls:
+            continue
+        seen_urls.add(url)
+
+        link_text = anchor['text'] or anchor['title'] or anchor['alt']
+        links.append({
+            'url': url,
+            'text': link_text[:text_limit],
+            'title': anchor['title'][:title_limit],
+            'target': anchor['target'],
+            'rel': anchor['rel'],
+        })
+    return links
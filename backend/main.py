@@ -1,29 +1,25 @@
-from fastapi import FastAPI, HTTPException, UploadFile, File, Form
+from fastapi import FastAPI, HTTPException, UploadFile, File, Form, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
+from starlette.background import BackgroundTask
 from contextlib import asynccontextmanager
 import os
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
-import base64
-import cairosvg
+import io
 import uuid
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timedelta
+from typing import List, Optional
 import aiofiles
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 import time
-import random
 import gc
+import shutil
+import re
+import hashlib
 from urllib.parse import urlparse
 import mimetypes
-import zipfile
-import tempfile
 import asyncio
 import aiohttp
-from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Import custom logging
 import sys
@@ -32,6 +28,31 @@ import os
 # Add current directory to Python path to ensure imports work
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from job_queue import JobQueue, ScrapeJob, QueueFullError, QueueNotRunningError, JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED, JOB_FINISHED
+from http_client import SharedHTTPClient
+from crawler import CrawlFrontier, SCOPE_DOMAIN, SCOPE_ANY
+from html_parsing import extract_page, extract_page_file
+from link_normalizer import LinkNormalizer, canonical_url, normalize_links
+from exporters import (
+    EXPORT_MEDIA_TYPES, PARQUET_AVAILABLE, ChangeReportWriter, ExportUnavailableError, PageReportWriter,
+    changes_filename, create_link_writer, convert_links, detect_format, find_links_export, links_filename,
+    page_report_filename
+)
+from blob_store import BlobStore
+from http_cache import HTTPCache
+from image_index import ImageIndex
+from svg_rasterizer import SVGRasterizer
+from image_discovery import discover_images
+from image_processing import ImageProcessor, THUMBNAIL_DIR
+from session_manifest import ManifestStore
+from session_index import SessionIndex
+from page_fingerprints import PAGE_CHANGED, PAGE_NEW, PAGE_UNCHANGED, PageFingerprints, diff_page, file_hash
+from page_stream import ACCEPT_ENCODING, ContentEncodingError, PageDecoder, PageTooLargeError
+from data_uri import decode_to_file, decoded_size, parse_data_uri
+from archives import archive_key, archive_key_for, build_zip, iter_zip_cached, prune_archive_cache
+from responses import RangedFileResponse, RangeNotSatisfiable, etag_matches, format_sse, parse_range
+from politeness import PolitenessScheduler, ThrottledError, THROTTLE_STATUSES
+
 try:
     from logger_config import setup_logger, get_logger, log_scraping_activity, log_request_details, log_scraping_session, log_error_with_context
     
@@ -70,13 +91,36 @@ except ImportError as e:
 # Configuration constants (defined before lifespan to avoid reference errors)
 MAX_RETRIES = 2  # Reduced retries
 RETRY_DELAY = 1  # seconds - reduced delay
-RATE_LIMIT_DELAY = (0.1, 0.5)  # random delay between 0.1-0.5 seconds - much faster
 MAX_IMAGE_SIZE = 10 * 1024 * 1024  # 10MB
 VALID_IMAGE_TYPES = ['jpeg', 'jpg', 'png', 'gif', 'webp', 'svg']
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.avif')  # Session files counted as images
 # Performance optimization settings
 MAX_CONCURRENT_DOWNLOADS = 10  # Limit concurrent image downloads
 CHUNK_SIZE = 32768  # Increased chunk size for faster downloads
 TIMEOUT = 10  # Reduced timeout for faster failure detection
+PARSER_BACKEND = 'auto'  # 'lxml' if installed, else 'stream'; 'bs4' forces BeautifulSoup
+PAGE_TIMEOUT = 30  # Timeout for the main page fetch
+MAX_PAGE_SIZE = 20 * 1024 * 1024  # Decoded bytes of a page; larger pages fail instead of being read
+MAX_DECOMPRESSION_RATIO = 100  # Decoded / received bytes above which a compressed page is rejected
+IMAGE_TARGET_WIDTH = None  # CSS pixels wanted from srcset/<picture>; None = largest candidate
+IMAGE_TARGET_DPR = 1.0  # Device pixel ratio applied to IMAGE_TARGET_WIDTH
+DEFAULT_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+}
+
+# Per-host politeness (token bucket shared by page and image fetches)
+POLITENESS_RATE = 5.0  # Sustained requests per second per host
+POLITENESS_BURST = 10  # Requests a host may receive back-to-back
+POLITENESS_HOST_OVERRIDES = {}  # e.g. {"cdn.example.com": (50.0, 100)}
+POLITENESS_MIN_RATE = 0.2  # Floor when a host keeps answering 429/503
+POLITENESS_DEFAULT_BACKOFF = 2.0  # seconds to pause a throttling host without Retry-After
+POLITENESS_MAX_BACKOFF = 120.0  # Cap for Retry-After pauses
+
+# Shared HTTP connection pool settings
+HTTP_POOL_LIMIT = 100  # Total open connections across all hosts
+HTTP_POOL_LIMIT_PER_HOST = 10  # Open connections per origin
+HTTP_DNS_CACHE_TTL = 300  # seconds
+HTTP_KEEPALIVE_TIMEOUT = 30  # seconds an idle connection is kept for reuse
 
 # Cleanup configuration
 AUTO_CLEANUP_ENABLED = True  # Enable auto-cleanup for old sessions
@@ -84,9 +128,79 @@ CLEANUP_AFTER_DOWNLOAD = False  # Don't delete session folder after file downloa
 DEFAULT_CLEANUP_HOURS = 24  # Default hours for cleanup (24 hours = more user-friendly)
 AUTO_CLEANUP_INTERVAL = 3600  # Auto-cleanup interval in seconds (1 hour)
 
+# Background job queue configuration
+SCRAPE_WORKERS = 4  # Number of scrape jobs processed concurrently
+SCRAPE_QUEUE_MAX_SIZE = 100  # Pending jobs accepted before /api/scrape returns 503
+JOB_HISTORY_TTL = 3600  # seconds a finished job's live state is kept (then read from its manifest)
+JOB_HISTORY_MAX_SIZE = 200  # Finished jobs kept in memory at most
+EVENT_KEEPALIVE_INTERVAL = 15  # seconds between keep-alive comments on idle event streams
+EVENT_MAX_LINKS = 50  # Link URLs included in each page event (the export has all of them)
+
+# Crawl mode limits
+CRAWL_CONCURRENCY = 5  # Pages fetched in parallel within one crawl
+CRAWL_MAX_DEPTH_LIMIT = 5  # Upper bound accepted for max_depth
+CRAWL_MAX_PAGES_LIMIT = 500  # Upper bound accepted for max_pages
+
+# Batch scrapes: many start URLs scraped as one job into one session
+BATCH_MAX_URLS = 10000  # URLs accepted per batch
+BATCH_MAX_UPLOAD_BYTES = 4 * 1024 * 1024  # Size limit of an uploaded URL list
+BATCH_CONCURRENCY = 10  # Pages fetched in parallel within one batch
+
+# Link export
+DEFAULT_EXPORT_FORMAT = "csv"  # csv, csv.gz, jsonl or parquet (parquet needs pyarrow)
+EXPORT_FORMAT_PATTERN = r"^(csv|csv\.gz|jsonl|parquet)$"
+
+# Built images ZIPs are cached in this sub-folder of each session
+ARCHIVE_CACHE_DIR = ".cache"
+
+# SVG -> PNG conversion in worker processes (results cached by SVG content hash)
+SVG_WORKERS = 2  # Rendering processes; 0 renders in a thread of the server process
+SVG_TIMEOUT = 10  # seconds per SVG before its worker is killed
+SVG_WORKER_MEMORY_LIMIT = 1024 * 1024 * 1024  # Address space limit per rendering process
+SVG_CACHE_MAX_BYTES = 16 * 1024 * 1024  # Rendered PNGs kept in memory
+SVG_RASTERIZE_REMOTE = False  # Also convert downloaded .svg images to PNG
+
+# Post-download processing: dimensions, thumbnails, optional transcoding (Pillow for the last two)
+IMAGE_POSTPROCESS_ENABLED = True
+IMAGE_WORKERS = 2  # Processes used for thumbnails and transcoding
+IMAGE_PROCESS_TIMEOUT = 30  # seconds per image before its worker is killed
+IMAGE_THUMBNAIL_SIZE = 256  # Longest thumbnail side in pixels; 0 disables thumbnails
+IMAGE_TRANSCODE_FORMAT = None  # "webp" or "avif" replaces JPEG/PNG images when the result is smaller
+
+# Session manifests (file list, sizes, hashes, status) answer the read endpoints without directory scans
+MANIFEST_FLUSH_INTERVAL = 1.0  # seconds between manifest writes while a scrape runs
+MANIFEST_CACHE_SIZE = 256  # Finished session manifests kept in memory
+
 # Create output directory with proper permission handling
 OUTPUT_DIR = "output"
 
+# Content-addressed image store shared by all sessions (hardlinked into session folders)
+BLOB_STORE_ENABLED = True
+BLOB_STORE_DIR = os.path.join(OUTPUT_DIR, ".blobs")
+
+# Conditional-request cache for pages and images (ETag / Last-Modified revalidation)
+HTTP_CACHE_ENABLED = True
+HTTP_CACHE_DIR = os.path.join(OUTPUT_DIR, ".http_cache")
+HTTP_CACHE_MAX_BYTES = 512 * 1024 * 1024  # LRU eviction above this total body size
+
+# Known images (URL -> blob index) reused without any request while fresh
+IMAGE_INDEX_ENABLED = True
+IMAGE_INDEX_PATH = os.path.join(OUTPUT_DIR, ".image_index.sqlite3")
+IMAGE_INDEX_DEFAULT_TTL = 0  # seconds; 0 = URLs without caching hints are always revalidated
+IMAGE_INDEX_FINGERPRINT_TTL = 30 * 86400  # URLs with a content hash / version in them
+IMAGE_INDEX_MAX_TTL = 365 * 86400  # Cap for max-age and Cache-Control: immutable
+
+# Session summaries (size, file count, status, creation time) for maintenance and cleanup
+SESSION_INDEX_PATH = os.path.join(OUTPUT_DIR, ".sessions.sqlite3")
+
+# Fetched pages are streamed to disk here, then hashed and parsed a slice at a time
+PAGE_SPOOL_DIR = os.path.join(OUTPUT_DIR, ".page_spool")
+
+# Last scrape of each page (content hash, link and image URLs) for incremental re-scrapes
+PAGE_FINGERPRINTS_ENABLED = True
+PAGE_FINGERPRINTS_PATH = os.path.join(OUTPUT_DIR, ".page_fingerprints.sqlite3")
+PAGE_FINGERPRINTS_MAX_AGE = 90 * 86400  # seconds; pages not scraped for this long are forgotten
+
 def ensure_output_directory():
     """Ensure output directory exists with proper permissions"""
     try:
@@ -109,27 +223,49 @@ def ensure_output_directory():
 if not ensure_output_directory():
     logger.error("Failed to initialize output directory. Application may not work properly.")
 
+def list_session_ids():
+    """Session folder names in the output directory (hidden folders such as the blob store are skipped)"""
+    if not os.path.exists(OUTPUT_DIR):
+        return []
+    return [
+        name for name in os.listdir(OUTPUT_DIR)
+        if not name.startswith('.') and os.path.isdir(os.path.join(OUTPUT_DIR, name))
+    ]
+
 def cleanup_session_folder(session_id: str, reason: str = "manual"):
-    """Clean up a specific session folder"""
+    """Clean up a specific session folder and release its blob store references"""
     try:
         import shutil
         session_path = os.path.join(OUTPUT_DIR, session_id)
         
-        if os.path.exists(session_path) and os.path.isdir(session_path):
-            # Calculate size before deletion
-            dir_size = sum(
-                os.path.getsize(os.path.join(dirpath, filename))
-                for dirpath, dirnames, filenames in os.walk(session_path)
-                for filename in filenames
-            )
+        if session_id and not session_id.startswith('.') and os.path.isdir(session_path):
+            # Bytes actually freed: files not shared with the blob store, plus blobs nobody references anymore
+            indexed = session_index.get(session_id)
+            if indexed is not None:
+                # Derived files (archive cache, thumbnails) are not in the index
+                dir_size = indexed['own_size'] + sum(
+                    folder_size(os.path.join(session_path, cache_dir)) for cache_dir in (ARCHIVE_CACHE_DIR, THUMBNAIL_DIR)
+                )
+            else:
+                dir_size = 0
+                for dirpath, dirnames, filenames in os.walk(session_path):
+                    for filename in filenames:
+                        file_stat = os.stat(os.path.join(dirpath, filename))
+                        if file_stat.st_nlink <= 1:
+                            dir_size += file_stat.st_size
             
             # Remove directory
             shutil.rmtree(session_path)
+            dir_size += blob_store.release_session(session_id)
+            job_queue.forget(session_id)
+            manifests.forget(session_path)
+            session_index.remove(session_id)
             
             logger.info(f"Cleaned up session folder: {session_id} | Reason: {reason} | Size: {dir_size} bytes")
             return True, dir_size
         else:
             logger.warning(f"Session folder not found for cleanup: {session_id}")
+            session_index.remove(session_id)
             return False, 0
     except Exception as e:
         logger.error(f"Error cleaning up session {session_id}: {str(e)}")
@@ -151,16 +287,12 @@ def auto_cleanup_old_sessions(hours: int = DEFAULT_CLEANUP_HOURS):
         if not os.path.exists(OUTPUT_DIR):
             return 0, 0
         
-        for session_dir in os.listdir(OUTPUT_DIR):
-            session_path = os.path.join(OUTPUT_DIR, session_dir)
-            if os.path.isdir(session_path):
-                # Check if directory is older than cutoff time
-                dir_creation_time = datetime.fromtimestamp(os.path.getctime(session_path))
-                if dir_creation_time < cutoff_time:
-                    success, size = cleanup_session_folder(session_dir, "auto-cleanup")
-                    if success:
-                        cleaned_sessions.append(session_dir)
-                        total_size_freed += size
+        # Oldest sessions first, straight from the session index
+        for session in session_index.created_before(cutoff_time.timestamp()):
+            success, size = cleanup_session_folder(session['session_id'], "auto-cleanup")
+            if success:
+                cleaned_sessions.append(session['session_id'])
+                total_size_freed += size
         
         if cleaned_sessions:
             logger.info(f"Auto-cleanup completed: {len(cleaned_sessions)} sessions removed, {total_size_freed} bytes freed")
@@ -170,12 +302,167 @@ def auto_cleanup_old_sessions(hours: int = DEFAULT_CLEANUP_HOURS):
         logger.error(f"Error in auto-cleanup: {str(e)}")
         return 0, 0
 
+# Deduplicating image store (folders created in lifespan)
+blob_store = BlobStore(BLOB_STORE_DIR, enabled=BLOB_STORE_ENABLED)
+
+# Validated responses reused on 304; evicted image bodies release their blob
+http_cache = HTTPCache(
+    HTTP_CACHE_DIR,
+    HTTP_CACHE_MAX_BYTES,
+    enabled=HTTP_CACHE_ENABLED,
+    on_evict=lambda meta: blob_store.collect(meta['digest']) if meta.get('digest') else None
+)
+
+# URL -> blob index for skipping downloads of known images (opened in lifespan)
+image_index = ImageIndex(
+    IMAGE_INDEX_PATH,
+    enabled=IMAGE_INDEX_ENABLED and BLOB_STORE_ENABLED,
+    default_ttl=IMAGE_INDEX_DEFAULT_TTL,
+    fingerprint_ttl=IMAGE_INDEX_FINGERPRINT_TTL,
+    max_ttl=IMAGE_INDEX_MAX_TTL
+)
+
+# Process pool for SVG rendering (workers spawned on first use)
+svg_rasterizer = SVGRasterizer(
+    workers=SVG_WORKERS,
+    timeout=SVG_TIMEOUT,
+    memory_limit=SVG_WORKER_MEMORY_LIMIT,
+    cache_max_bytes=SVG_CACHE_MAX_BYTES
+)
+
+# Process pool for image post-processing (workers spawned on first use)
+image_processor = ImageProcessor(
+    workers=IMAGE_WORKERS,
+    timeout=IMAGE_PROCESS_TIMEOUT,
+    thumbnail_size=IMAGE_THUMBNAIL_SIZE,
+    transcode_format=IMAGE_TRANSCODE_FORMAT
+)
+
+# Per-session summaries for maintenance endpoints (opened in lifespan)
+session_index = SessionIndex(SESSION_INDEX_PATH, ttl=DEFAULT_CLEANUP_HOURS * 3600)
+
+# Page fingerprints diffed by incremental scrapes (opened in lifespan)
+page_fingerprints = PageFingerprints(PAGE_FINGERPRINTS_PATH, enabled=PAGE_FINGERPRINTS_ENABLED)
+
+def manifest_summary(manifest):
+    """Session index fields of a session manifest"""
+    return {
+        'url': manifest.get('url'),
+        'status': manifest.get('status'),
+        'created_at': manifest['created_at'],
+        'file_count': len(manifest['files']),
+        'size': manifest['total_size'],
+        # Images are hardlinks into the blob store; removing the folder frees only the other files
+        'own_size': sum(
+            info['size'] for info in manifest['files'].values()
+            if not (BLOB_STORE_ENABLED and info['kind'] == 'image')
+        ),
+    }
+
+def index_session_manifest(session_dir, manifest):
+    """Keep the session index in step with every manifest write"""
+    try:
+        session_index.upsert(os.path.basename(session_dir), **manifest_summary(manifest))
+    except Exception as e:
+        logger.error(f"Error indexing session {os.path.basename(session_dir)}: {str(e)}")
+
+# Live manifests of running scrapes and a cache of finished ones
+manifests = ManifestStore(MANIFEST_FLUSH_INTERVAL, MANIFEST_CACHE_SIZE, on_write=index_session_manifest)
+
+def folder_size(path):
+    """Total size of the files directly inside ``path`` (0 if it does not exist)"""
+    try:
+        with os.scandir(path) as entries:
+            return sum(entry.stat().st_size for entry in entries if entry.is_file())
+    except FileNotFoundError:
+        return 0
+
+def reconcile_session_index():
+    """Index session folders the index does not know (e.g. from older versions) and drop vanished ones"""
+    on_disk = set(list_session_ids())
+    indexed = session_index.session_ids()
+    for session_id in indexed - on_disk:
+        session_index.remove(session_id)
+    for session_id in on_disk - indexed:
+        session_path = os.path.join(OUTPUT_DIR, session_id)
+        manifest = manifests.get(session_path)
+        if manifest is not None:
+            session_index.upsert(session_id, **manifest_summary(manifest))
+            continue
+        file_count = size = own_size = 0
+        with os.scandir(session_path) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                file_stat = entry.stat()
+                file_count += 1
+                size += file_stat.st_size
+                if file_stat.st_nlink <= 1:
+                    own_size += file_stat.st_size
+        session_index.upsert(
+            session_id, status="available", created_at=os.path.getctime(session_path),
+            file_count=file_count, size=size, own_size=own_size
+        )
+    return len(on_disk - indexed), len(indexed - on_disk)
+
+def session_files(session_path):
+    """``(files, manifest)`` of a session: ``files`` maps names to ``{"size", "kind", ...}``.
+
+    Read from the session manifest; sessions without one are scanned (``manifest`` is then None).
+    """
+    manifest = manifests.get(session_path)
+    if manifest is not None:
+        return manifest['files'], manifest
+    
+    files = {}
+    for filename in os.listdir(session_path):
+        file_path = os.path.join(session_path, filename)
+        # Hidden entries (manifest, archive cache, thumbnails) are bookkeeping, not results
+        if filename.startswith('.') or not os.path.isfile(file_path):
+            continue
+        if detect_format(filename):
+            kind = 'links'
+        elif filename.lower().endswith(IMAGE_EXTENSIONS):
+            kind = 'image'
+        else:
+            kind = 'other'
+        files[filename] = {'size': os.path.getsize(file_path), 'kind': kind}
+    return files, None
+
+# Background workers for scrape jobs (started in lifespan)
+job_queue = JobQueue(SCRAPE_WORKERS, SCRAPE_QUEUE_MAX_SIZE, JOB_HISTORY_TTL, JOB_HISTORY_MAX_SIZE)
+
+# Process-wide pooled HTTP client (started in lifespan)
+http_client = SharedHTTPClient(
+    limit=HTTP_POOL_LIMIT,
+    limit_per_host=HTTP_POOL_LIMIT_PER_HOST,
+    dns_cache_ttl=HTTP_DNS_CACHE_TTL,
+    keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT,
+    headers=DEFAULT_HEADERS
+)
+
+# Per-host rate limiting for every outgoing request
+politeness = PolitenessScheduler(
+    rate=POLITENESS_RATE,
+    burst=POLITENESS_BURST,
+    host_overrides=POLITENESS_HOST_OVERRIDES,
+    min_rate=POLITENESS_MIN_RATE,
+    default_backoff=POLITENESS_DEFAULT_BACKOFF,
+    max_backoff=POLITENESS_MAX_BACKOFF
+)
+
 # Lifespan context manager for startup and shutdown events
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Web Scraper API...")
     
+    # Open the session index and pick up session folders it does not know yet
+    session_index.open()
+    added, removed = await asyncio.to_thread(reconcile_session_index)
+    if added or removed:
+        logger.info(f"Session index reconciled: {added} sessions added, {removed} removed")
+    
     # Run initial cleanup of old sessions
     if AUTO_CLEANUP_ENABLED:
         cleaned_count, freed_size = auto_cleanup_old_sessions(DEFAULT_CLEANUP_HOURS)
@@ -184,12 +471,36 @@ async def lifespan(app: FastAPI):
         else:
             logger.info("Startup cleanup: No old sessions found")
     
+    # Prepare the content-addressed image store and the HTTP cache index
+    await asyncio.to_thread(blob_store.ensure)
+    shutil.rmtree(PAGE_SPOOL_DIR, ignore_errors=True)
+    await asyncio.to_thread(http_cache.load)
+    await asyncio.to_thread(image_index.open)
+    await asyncio.to_thread(page_fingerprints.open)
+    pruned = await asyncio.to_thread(page_fingerprints.prune, time.time() - PAGE_FINGERPRINTS_MAX_AGE)
+    if pruned:
+        logger.info(f"Forgot {pruned} page fingerprints older than {PAGE_FINGERPRINTS_MAX_AGE // 86400} days")
+    
+    # Open the shared HTTP connection pool before any job can use it
+    await http_client.start()
+    
+    # Start background scrape workers
+    job_queue.start(run_scrape_job, logger)
+    logger.info(f"Started {SCRAPE_WORKERS} scrape workers")
+    
     logger.info("Web Scraper API started successfully!")
     
     yield
     
     # Shutdown
     logger.info("Shutting down Web Scraper API...")
+    await job_queue.stop()
+    await http_client.close()
+    image_index.close()
+    page_fingerprints.close()
+    session_index.close()
+    svg_rasterizer.close()
+    image_processor.close()
 
 app = FastAPI(title="Web Scraper API", version="1.0.0", lifespan=lifespan)
 
@@ -219,6 +530,17 @@ app.mount("/output", StaticFiles(directory="output"), name="output")
 
 class ScrapingRequest(BaseModel):
     url: str
+    # Crawl mode: follow links found on each page into one aggregated session
+    crawl: bool = False
+    max_depth: int = Field(default=1, ge=0, le=CRAWL_MAX_DEPTH_LIMIT)
+    max_pages: int = Field(default=50, ge=1, le=CRAWL_MAX_PAGES_LIMIT)
+    scope: str = Field(default=SCOPE_DOMAIN, pattern="^(host|domain|any)$")
+    include_patterns: List[str] = []
+    exclude_patterns: List[str] = []
+    # Links export format: csv, csv.gz, jsonl or parquet
+    format: str = Field(default=DEFAULT_EXPORT_FORMAT, pattern=EXPORT_FORMAT_PATTERN)
+    # Only export links and images that changed since each page's last scrape
+    incremental: bool = False
 
 class ScrapingResponse(BaseModel):
     success: bool
@@ -229,18 +551,40 @@ class ScrapingResponse(BaseModel):
     images_folder: Optional[str] = None
     session_id: Optional[str] = None
     expires_at: Optional[str] = None
-
-def rate_limit_delay():
-    """Add random delay for rate limiting"""
-    delay = random.uniform(*RATE_LIMIT_DELAY)
-    time.sleep(delay)
+    status: Optional[str] = None
+    status_url: Optional[str] = None
+    events_url: Optional[str] = None
+    urls_count: Optional[int] = None
+    report_file: Optional[str] = None
+    changes_file: Optional[str] = None
 
 def validate_image_data(data, max_size=MAX_IMAGE_SIZE):
-    """Validate image data size and format"""
-    if len(data) > max_size:
-        return False, f"Image too large: {len(data)} bytes (max: {max_size})"
+    """Validate image data (or its size in bytes) against the size limit"""
+    size = data if isinstance(data, int) else len(data)
+    if size > max_size:
+        return False, f"Image too large: {size} bytes (max: {max_size})"
     return True, "OK"
 
+def parse_batch_urls(lines):
+    """Start URLs of a batch: one per line, blank lines and ``#`` comments skipped.
+    
+    URLs are canonicalized like links found on pages, so spellings of the same
+    URL (host case, default port, trailing slash, query order) are fetched once.
+    """
+    urls = []
+    seen = set()
+    for line in lines:
+        url = line.strip()
+        if not url or url.startswith('#'):
+            continue
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        url = canonical_url(url) or url
+        if url not in seen:
+            seen.add(url)
+            urls.append(url)
+    return urls
+
 def get_file_extension_from_url(url):
     """Extract file extension from URL"""
     parsed = urlparse(url)
@@ -255,360 +599,643 @@ def get_file_extension_from_mime_type(mime_type):
     """Extract file extension from MIME type"""
     if '/' in mime_type:
         ext = mime_type.split('/')[-1].split(';')[0].lower()
+        if ext == 'svg+xml':
+            return 'svg'
         if ext in VALID_IMAGE_TYPES:
             return ext
     return 'jpg'  # default
 
-def retry_request(func, max_retries=MAX_RETRIES, delay=RETRY_DELAY):
-    """Retry function with exponential backoff"""
+async def retry_request(func, max_retries=MAX_RETRIES, delay=RETRY_DELAY):
+    """Retry coroutine function with exponential backoff"""
     for attempt in range(max_retries):
         try:
-            return func()
+            return await func()
+        except (PageTooLargeError, ContentEncodingError):
+            raise  # The same body would fail again
         except Exception as e:
             if attempt == max_retries - 1:
                 raise e
             logger.warning(f"Attempt {attempt + 1} failed: {str(e)}. Retrying in {delay} seconds...")
-            time.sleep(delay)
+            await asyncio.sleep(delay)
             delay *= 2  # exponential backoff
 
 def cleanup_memory():
     """Clean up memory and run garbage collection"""
     gc.collect()
 
-@app.get("/")
-async def root():
-    return {"message": "Web Scraper API is running!"}
+def parse_page(html, base_url):
+    """Parse HTML and extract page title, links and image sources.
 
-@app.post("/api/scrape", response_model=ScrapingResponse)
-async def scrape_website(request: ScrapingRequest):
-    start_time = time.time()
-    session_id = str(uuid.uuid4())
+    CPU-bound, so it is run in a worker thread via ``asyncio.to_thread``.
+    Uses the streaming extractor so no DOM is built for large pages.
+    """
+    return build_page(extract_page(html, PARSER_BACKEND), base_url)
+
+def parse_page_file(path, base_url):
+    """``parse_page`` for a page spooled to disk, fed to the extractor a slice at a time"""
+    return build_page(extract_page_file(path, PARSER_BACKEND), base_url)
+
+def build_page(extracted, base_url):
+    """Page title, resolved links and image sources from extracted tags"""
+    # Resolve, canonicalize and deduplicate all links of the page in one batch
+    links_data = normalize_links(extracted['anchors'], base_url)
+    
+    # Pick the real source of each image (srcset, <picture>, lazy-load attributes, backgrounds)
+    image_sources = discover_images(
+        extracted, LinkNormalizer(base_url).resolve, IMAGE_TARGET_WIDTH, IMAGE_TARGET_DPR
+    )
+    
+    return {
+        'title': extracted['title'],
+        'anchor_count': extracted['anchor_count'],
+        # Index slots used for file names: every <img>, then every background image
+        'image_count': extracted['image_count'] + len(extracted['backgrounds']),
+        'links': links_data,
+        'images': image_sources,
+    }
+
+def save_base64_images(base64_images, session_output_dir, job=None):
+    """Decode and save data-URI images (blocking, run in a worker thread)"""
+    session_id = os.path.basename(session_output_dir)
+    saved_images = []
+    svg_images = []
+    for img_index, img_url in base64_images:
+        temp_path = None
+        try:
+            img_type, payload_offset = parse_data_uri(img_url)
+            
+            # Reject oversize images from the encoded length, before decoding anything
+            is_valid, validation_msg = validate_image_data(decoded_size(img_url, payload_offset))
+            if not is_valid:
+                logger.warning(f"Base64 image {img_index} validation failed: {validation_msg}")
+                continue
+            
+            img_name = f'image_{img_index}'
+            ext = get_file_extension_from_mime_type(img_type)
+            
+            if ext.lower() in ['svg', 'plain']:
+                # Converted to PNG below, all SVGs of the page in parallel
+                svg_data = io.BytesIO()
+                decode_to_file(img_url, payload_offset, svg_data, MAX_IMAGE_SIZE)
+                svg_images.append((img_index, svg_data.getvalue()))
+            else:
+                # Decode straight into a blob store temp file and save as original format
+                output_path = os.path.join(session_output_dir, f'{img_name}.{ext}')
+                temp_path = blob_store.temp_path()
+                with open(temp_path, 'wb') as img_file:
+                    size, digest = decode_to_file(img_url, payload_offset, img_file, MAX_IMAGE_SIZE)
+                blob_store.commit(temp_path, digest, output_path, session_id)
+                manifests.record_file(session_output_dir, f'{img_name}.{ext}', size, 'image', digest)
+                saved_images.append(f'{img_name}.{ext}')
+                if job:
+                    job.images_downloaded += 1
+                    job.add_bytes(size)
+                    job.emit("image", name=f'{img_name}.{ext}', size=size)
+                logger.info(f"Saved base64 image: {img_name}.{ext}")
+        except Exception as e:
+            logger.error(f"Error processing base64 image {img_index}: {str(e)}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            continue
     
-    log_scraping_activity(f"Starting scraping session | ID: {session_id} | URL: {request.url}")
+    if not svg_images:
+        return saved_images
     
+    # Convert SVG to PNG in the rendering process pool
+    rendered = svg_rasterizer.rasterize_many([svg_data for _, svg_data in svg_images])
+    for (img_index, _), png_data in zip(svg_images, rendered):
+        img_name = f'image_{img_index}'
+        if isinstance(png_data, Exception):
+            logger.error(f"Error converting SVG image {img_index}: {str(png_data)}")
+            continue
+        try:
+            output_path = os.path.join(session_output_dir, f'{img_name}.png')
+            blob_store.put_bytes(png_data, output_path, session_id)
+            manifests.record_file(session_output_dir, f'{img_name}.png', len(png_data), 'image', hashlib.sha256(png_data).hexdigest())
+            saved_images.append(f'{img_name}.png')
+            if job:
+                job.images_downloaded += 1
+                job.add_bytes(len(png_data))
+                job.emit("image", name=f'{img_name}.png', size=len(png_data))
+            logger.info(f"Saved SVG image as PNG: {img_name}.png")
+        except Exception as e:
+            logger.error(f"Error saving converted SVG image {img_index}: {str(e)}")
+    return saved_images
+
+def link_or_copy(source_path, dest_path):
+    """Hardlink a file, copying it where links are not possible"""
     try:
-        # Ensure output directory exists and has proper permissions
-        if not os.path.exists(OUTPUT_DIR):
+        os.link(source_path, dest_path)
+    except OSError:
+        shutil.copyfile(source_path, dest_path)
+
+async def fetch_page(session, url, debug=False):
+    """Fetch a page into a spool file as UTF-8; returns (status, headers, path), path None unless status is 200.
+    
+    The body is streamed, decompressed and decoded a chunk at a time within
+    MAX_PAGE_SIZE and MAX_DECOMPRESSION_RATIO, so it is never held in memory
+    whole. A cached copy is revalidated if there is one. The caller removes
+    the spool file. A ``debug`` fetch bypasses the HTTP cache and the
+    politeness state, so it leaves nothing behind.
+    """
+    cached = None if debug else await asyncio.to_thread(http_cache.lookup, url)
+    headers = {**http_cache.validators(cached), 'Accept-Encoding': ACCEPT_ENCODING}
+    if not debug:
+        await politeness.acquire(url)
+    async with session.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=PAGE_TIMEOUT), auto_decompress=False) as response:
+        if not debug:
+            politeness.feedback(url, response.status, response.headers.get('Retry-After'))
+        if response.status in THROTTLE_STATUSES:
+            # Retried by retry_request once the host's backoff has passed
+            raise ThrottledError(f"Host throttled request. Status code: {response.status}")
+        
+        os.makedirs(PAGE_SPOOL_DIR, exist_ok=True)
+        spool_path = os.path.join(PAGE_SPOOL_DIR, uuid.uuid4().hex)
+        
+        if response.status == 304 and cached:
             try:
-                os.makedirs(OUTPUT_DIR, exist_ok=True)
-                log_scraping_activity(f"Created output directory: {OUTPUT_DIR}")
-            except PermissionError as e:
-                log_error_with_context(e, f"Cannot create output directory: {OUTPUT_DIR}")
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"Server configuration error: Cannot create output directory. Please contact administrator."
-                )
-        
-        # Check if we can write to output directory
-        if not os.access(OUTPUT_DIR, os.W_OK):
-            log_error_with_context("Permission denied", f"Cannot write to output directory: {OUTPUT_DIR}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Server configuration error: Cannot write to output directory. Please contact administrator."
-            )
-        
-        session_output_dir = os.path.join(OUTPUT_DIR, session_id)
+                # A link keeps the body readable even if the cache evicts it meanwhile
+                await asyncio.to_thread(link_or_copy, cached['body_path'], spool_path)
+            except OSError:
+                # Cached body vanished; drop the entry so the retry fetches in full
+                await asyncio.to_thread(http_cache.evict, url)
+                raise
+            await asyncio.to_thread(http_cache.refresh, url, response.headers)
+            log_scraping_activity(f"Page not modified, using cached copy | URL: {url}")
+            return 200, {'Content-Type': cached.get('content_type') or ''}, spool_path
+        
+        if response.status != 200:
+            return response.status, response.headers, None
+        
+        content_length = response.headers.get('Content-Length')
+        if content_length and content_length.isdigit() and int(content_length) > MAX_PAGE_SIZE:
+            raise PageTooLargeError(f"Page larger than {MAX_PAGE_SIZE} bytes (Content-Length: {content_length})")
+        
+        decoder = PageDecoder(
+            response.headers.get('Content-Encoding'), response.headers.get('Content-Type'),
+            MAX_PAGE_SIZE, MAX_DECOMPRESSION_RATIO, CHUNK_SIZE
+        )
         try:
-            os.makedirs(session_output_dir, exist_ok=True)
-            log_scraping_activity(f"Created session directory: {session_output_dir}")
-        except PermissionError as e:
-            log_error_with_context(e, f"Cannot create session directory: {session_output_dir}")
-            raise HTTPException(
-                status_code=500,
-                detail=f"Server configuration error: Cannot create session directory. Please contact administrator."
-            )
-        
-        # Validate URL
-        if not request.url.startswith(('http://', 'https://')):
-            request.url = 'https://' + request.url
-            log_scraping_activity(f"Added https:// prefix to URL: {request.url}")
-        
-        # Create session for all requests
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
+            async with aiofiles.open(spool_path, 'wb') as spool_file:
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    for piece in decoder.feed(chunk):
+                        await spool_file.write(piece)
+                await spool_file.write(decoder.close())
+            # The cache keeps the UTF-8 text, linked from the spool file
+            if not debug:
+                await asyncio.to_thread(http_cache.store, url, response.headers, source_path=spool_path)
+        except BaseException:
+            if os.path.exists(spool_path):
+                os.remove(spool_path)
+            raise
+        return 200, response.headers, spool_path
 
-        
-        # Scrape the website with retry logic
-        scrape_start_time = time.time()
-        
-        def fetch_website():
-            rate_limit_delay()  # Add rate limiting
-            return session.get(request.url, timeout=30)
-        
-        response = retry_request(fetch_website)
-        scrape_duration = time.time() - scrape_start_time
-        
-        log_request_details(request.url, "GET", response.status_code, scrape_duration)
-        
-        if response.status_code != 200:
-            log_error_with_context(f"Failed to fetch website. Status code: {response.status_code}", f"Session: {session_id}")
-            raise HTTPException(
-                status_code=400, 
-                detail=f"Failed to fetch website. Status code: {response.status_code}"
-            )
-        
-        log_scraping_activity(f"Successfully fetched website | URL: {request.url} | Duration: {scrape_duration:.2f}s")
-        log_scraping_activity(f"Response content type: {response.headers.get('Content-Type', 'unknown')}")
-        log_scraping_activity(f"Response content length: {len(response.text)} characters")
+async def link_known_image(img_index, img_url, session_output_dir, job=None):
+    """Link a still-fresh, previously downloaded image from the blob store; None if unknown"""
+    known = await asyncio.to_thread(image_index.lookup_fresh, img_url)
+    if not known:
+        return None
+    
+    img_name = f"image_{img_index}.{get_file_extension_from_mime_type(known['content_type'] or 'image/jpeg')}"
+    output_path = os.path.join(session_output_dir, img_name)
+    try:
+        await asyncio.to_thread(
+            blob_store.link_file, blob_store.blob_path(known['digest']), known['digest'], output_path,
+            os.path.basename(session_output_dir)
+        )
+    except FileNotFoundError:
+        # Blob was released since; fall back to a normal download
+        await asyncio.to_thread(image_index.forget, img_url)
+        return None
+    
+    image_index.mark_skipped()
+    await asyncio.to_thread(manifests.record_file, session_output_dir, img_name, known['size'], 'image', known['digest'])
+    if job:
+        job.images_downloaded += 1
+    return img_name
+
+async def download_single_image(session, semaphore, img_index, img_url, session_output_dir, job=None):
+    """Download one image with streaming size validation"""
+    # Known immutable images need no request at all
+    known_name = await link_known_image(img_index, img_url, session_output_dir, job)
+    if known_name:
+        return known_name
+    
+    # Wait for the host's turn before taking a download slot, so a throttled host does not hold slots other hosts could use
+    await politeness.acquire(img_url)
+    async with semaphore:
+        temp_path = None
+        try:
+            session_id = os.path.basename(session_output_dir)
+            cached = await asyncio.to_thread(http_cache.lookup, img_url)
+            
+            async with session.get(img_url, headers=http_cache.validators(cached), timeout=aiohttp.ClientTimeout(total=TIMEOUT)) as img_response:
+                politeness.feedback(img_url, img_response.status, img_response.headers.get('Retry-After'))
+                
+                if img_response.status == 304 and cached and cached.get('digest'):
+                    # Not modified: link the cached body into the session, nothing is downloaded
+                    img_name = f"image_{img_index}.{get_file_extension_from_mime_type(cached.get('content_type') or 'image/jpeg')}"
+                    output_path = os.path.join(session_output_dir, img_name)
+                    await asyncio.to_thread(blob_store.link_file, cached['body_path'], cached['digest'], output_path, session_id)
+                    await asyncio.to_thread(http_cache.refresh, img_url, img_response.headers)
+                    await asyncio.to_thread(
+                        image_index.record, img_url, cached['digest'], cached['size'], cached.get('content_type'),
+                        img_response.headers
+                    )
+                    await asyncio.to_thread(
+                        manifests.record_file, session_output_dir, img_name, cached['size'], 'image', cached['digest']
+                    )
+                    if job:
+                        job.images_downloaded += 1
+                    return img_name
+                
+                if img_response.status != 200:
+                    logger.warning(f"Failed to download image {img_url}: Status {img_response.status}")
+                    return None
+                
+                # Get content type and validate
+                content_type = img_response.headers.get('Content-Type', 'image/jpeg')
+                ext = get_file_extension_from_mime_type(content_type)
+                
+                # Check content length if available
+                content_length = img_response.headers.get('Content-Length')
+                if content_length and int(content_length) > MAX_IMAGE_SIZE:
+                    logger.warning(f"Image {img_url} too large: {content_length} bytes")
+                    return None
+                
+                img_name = f'image_{img_index}.{ext}'
+                output_path = os.path.join(session_output_dir, img_name)
+                
+                # Download to a temp file in the blob store, hashing while streaming
+                temp_path = blob_store.temp_path()
+                digest = hashlib.sha256()
+                total_size = 0
+                too_large = False
+                async with aiofiles.open(temp_path, 'wb') as img_file:
+                    async for chunk in img_response.content.iter_chunked(CHUNK_SIZE):
+                        total_size += len(chunk)
+                        if total_size > MAX_IMAGE_SIZE:
+                            too_large = True
+                            break
+                        await img_file.write(chunk)
+                        digest.update(chunk)
+                        if job:
+                            job.add_bytes(len(chunk))
+                
+                if too_large:
+                    logger.warning(f"Image {img_url} exceeded size limit during download")
+                    os.remove(temp_path)
+                    if job:
+                        job.add_bytes(-(total_size - len(chunk)))
+                    return None
+                
+                # Identical content already stored by any session is linked instead of kept twice
+                await asyncio.to_thread(blob_store.commit, temp_path, digest.hexdigest(), output_path, session_id)
+                await asyncio.to_thread(
+                    http_cache.store, img_url, img_response.headers, source_path=output_path, digest=digest.hexdigest()
+                )
+                await asyncio.to_thread(image_index.record, img_url, digest.hexdigest(), total_size, content_type, img_response.headers)
+                await asyncio.to_thread(
+                    manifests.record_file, session_output_dir, img_name, total_size, 'image', digest.hexdigest()
+                )
+                
+                if job:
+                    job.images_downloaded += 1
+                return img_name
+                
+        except Exception as e:
+            logger.error(f"Error downloading image {img_url}: {str(e)}")
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return None
+
+async def rasterize_saved_svg(img_name, session_output_dir, job=None):
+    """Replace a downloaded .svg image with its PNG rendering; keeps the SVG if rendering fails"""
+    svg_path = os.path.join(session_output_dir, img_name)
+    png_name = f"{os.path.splitext(img_name)[0]}.png"
+    try:
+        async with aiofiles.open(svg_path, 'rb') as svg_file:
+            svg_data = await svg_file.read()
+        png_data = await svg_rasterizer.rasterize_async(svg_data)
+        await asyncio.to_thread(
+            blob_store.put_bytes, png_data, os.path.join(session_output_dir, png_name), os.path.basename(session_output_dir)
+        )
+        os.remove(svg_path)
+        await asyncio.to_thread(manifests.remove_file, session_output_dir, img_name)
+        await asyncio.to_thread(
+            manifests.record_file, session_output_dir, png_name, len(png_data), 'image', hashlib.sha256(png_data).hexdigest()
+        )
+    except Exception as e:
+        logger.error(f"Error converting SVG image {img_name}: {str(e)}")
+        return img_name
+    
+    if job:
+        job.add_bytes(len(png_data) - len(svg_data))
+    return png_name
+
+async def download_images(session, image_tasks, session_output_dir, job=None):
+    """Download images concurrently, bounded by MAX_CONCURRENT_DOWNLOADS"""
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    
+    async def download(img_index, img_url):
+        img_name = await download_single_image(session, semaphore, img_index, img_url, session_output_dir, job)
+        if img_name and SVG_RASTERIZE_REMOTE and img_name.endswith('.svg'):
+            img_name = await rasterize_saved_svg(img_name, session_output_dir, job)
+        return img_name
+    
+    downloads = [download(img_index, img_url) for img_index, img_url in image_tasks]
+    
+    saved_images = []
+    # Collect results as they complete
+    for download in asyncio.as_completed(downloads):
+        img_name = await download
+        if img_name:
+            saved_images.append(img_name)
+            if job:
+                job.emit("image", name=img_name)
+            logger.info(f"Downloaded image: {img_name}")
+    return saved_images
+
+async def postprocess_images(session_output_dir, image_names):
+    """Probe, thumbnail and optionally transcode saved images; records their details in the session manifest.
+
+    Returns the image names, with transcoded images renamed to their new extension.
+    """
+    session_id = os.path.basename(session_output_dir)
+    results = await asyncio.to_thread(image_processor.process_session, session_output_dir, image_names, blob_store.tmp_dir)
+    
+    final_names = []
+    images = {}
+    for name in image_names:
+        info = results.get(name)
+        if info is None:
+            final_names.append(name)
+            continue
+        
+        transcoded = info.pop('transcoded', None)
+        if transcoded:
+            # The smaller transcode replaces the downloaded file
+            new_name = f"{os.path.splitext(name)[0]}.{IMAGE_TRANSCODE_FORMAT}"
+            try:
+                await asyncio.to_thread(
+                    blob_store.commit, transcoded['path'], transcoded['digest'],
+                    os.path.join(session_output_dir, new_name), session_id
+                )
+                os.remove(os.path.join(session_output_dir, name))
+                await asyncio.to_thread(manifests.remove_file, session_output_dir, name)
+                await asyncio.to_thread(
+                    manifests.record_file, session_output_dir, new_name, transcoded['size'], 'image', transcoded['digest']
+                )
+                info.update(format=IMAGE_TRANSCODE_FORMAT, size=transcoded['size'], original=name)
+                name = new_name
+            except Exception as e:
+                logger.error(f"Error storing transcoded image {name}: {str(e)}")
+                if os.path.exists(transcoded['path']):
+                    os.remove(transcoded['path'])
+        final_names.append(name)
+        images[name] = info
+    
+    await asyncio.to_thread(manifests.update, session_output_dir, images=images)
+    return final_names
+
+@app.get("/")
+async def root():
+    return {"message": "Web Scraper API is running!"}
+
+async def scrape_page(session, url, session_id, known_hash=None):
+    """Fetch one page with retries and parse it off the event loop.
+    
+    Returns None without parsing when the HTML hashes to ``known_hash``.
+    """
+    scrape_start_time = time.time()
+    status, headers, body_path = await retry_request(lambda: fetch_page(session, url))
+    scrape_duration = time.time() - scrape_start_time
+    
+    log_request_details(url, "GET", status, scrape_duration)
+    
+    if status != 200:
+        log_error_with_context(f"Failed to fetch website. Status code: {status}", f"Session: {session_id} | URL: {url}")
+        raise Exception(f"Failed to fetch website. Status code: {status}")
+    
+    try:
+        log_scraping_activity(f"Successfully fetched website | URL: {url} | Duration: {scrape_duration:.2f}s")
+        log_scraping_activity(f"Response content type: {headers.get('Content-Type', 'unknown')}")
+        log_scraping_activity(f"Response content length: {os.path.getsize(body_path)} bytes")
         
         # Check if response is actually HTML
-        if 'text/html' not in response.headers.get('Content-Type', '').lower():
-            log_scraping_activity(f"Warning: Response is not HTML. Content-Type: {response.headers.get('Content-Type')}")
-        
-        # Parse HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Debug: Check if we got valid HTML
-        title = soup.find('title')
-        log_scraping_activity(f"Page title: {title.get_text() if title else 'No title found'}")
-        
-        # Extract links with more details
-        links_data = []
-        links = soup.find_all('a')
-        
-        log_scraping_activity(f"Found {len(links)} anchor tags to process")
+        if 'text/html' not in headers.get('Content-Type', '').lower():
+            log_scraping_activity(f"Warning: Response is not HTML. Content-Type: {headers.get('Content-Type')}")
+        
+        page_hash = await asyncio.to_thread(file_hash, body_path)
+        if page_hash == known_hash:
+            log_scraping_activity(f"Page unchanged since last scrape, skipping | URL: {url}")
+            return None
+        
+        # Parse HTML off the event loop, reading the spooled page a slice at a time
+        page = await asyncio.to_thread(parse_page_file, body_path, url)
+        page['content_hash'] = page_hash
+    finally:
+        os.remove(body_path)
+    
+    log_scraping_activity(f"Page title: {page['title'] or 'No title found'}")
+    log_scraping_activity(f"Found {page['anchor_count']} anchor tags to process")
+    log_scraping_activity(f"Found {page['image_count']} images to process")
+    return page
+
+async def run_scrape_job(job: ScrapeJob):
+    """Run the fetch/parse/persist pipeline for a queued scrape job"""
+    start_time = time.time()
+    session_id = job.session_id
+    session_output_dir = os.path.join(OUTPUT_DIR, session_id)
+    crawl_options = job.options
+    
+    log_scraping_activity(f"Starting scraping session | ID: {session_id} | URL: {job.url} | Crawl: {crawl_options or 'off'}")
+    
+    try:
+        # Files are recorded in the manifest as they land
+        await asyncio.to_thread(
+            manifests.open, session_output_dir, session_id=session_id, url=job.url, format=job.export_format,
+            status=JOB_RUNNING, created_at=job.created_at.timestamp()
+        )
         
-        for link in links:
-            href = link.get('href')
-            if href:
-                # Clean and validate href
-                href = href.strip()
+        # Use the shared connection pool for all requests
+        async with http_client.acquire() as session:
+            # A single-page scrape is a crawl of depth 0 limited to one page, a batch one of depth 0 over all its URLs
+            report_writer = None
+            if job.urls:
+                frontier = CrawlFrontier(
+                    job.url, max_depth=0, max_pages=len(job.urls), scope=SCOPE_ANY, canonicalize=canonical_url
+                )
+                frontier.seed(job.urls)
+                report_file = page_report_filename(session_id)
+                report_writer = PageReportWriter(os.path.join(session_output_dir, report_file))
+            elif crawl_options:
+                frontier = CrawlFrontier(job.url, canonicalize=canonical_url, **crawl_options)
+            else:
+                frontier = CrawlFrontier(job.url, max_depth=0, max_pages=1, canonicalize=canonical_url)
+            
+            # Incremental scrapes list the links added and removed per page next to the export of added links
+            changes_writer = None
+            change_counts = {PAGE_NEW: 0, PAGE_CHANGED: 0, PAGE_UNCHANGED: 0, "links_added": 0, "links_removed": 0}
+            if job.incremental:
+                changes_file = changes_filename(session_id)
+                changes_writer = ChangeReportWriter(os.path.join(session_output_dir, changes_file))
+            
+            # Links are streamed to the export as pages are processed; only URLs are kept for dedup
+            links_file = links_filename(session_id, job.export_format)
+            links_path = os.path.join(session_output_dir, links_file)
+            links_writer = create_link_writer(links_path, job.export_format)
+            seen_link_urls = set()
+            sample_links = []
+            
+            # Images aggregated across every crawled page
+            image_sources = []
+            seen_image_urls = set()
+            image_index_offset = 0
+            
+            async def process_page(url, depth):
+                nonlocal image_index_offset
+                previous = await asyncio.to_thread(page_fingerprints.get, url) if job.incremental else None
+                try:
+                    page = await scrape_page(session, url, session_id, previous['content_hash'] if previous else None)
+                except Exception as e:
+                    job.emit("page_error", url=url, depth=depth, error=str(e))
+                    if report_writer:
+                        await asyncio.to_thread(report_writer.write, {'url': url, 'status': JOB_FAILED, 'error': str(e)})
+                    raise
+                job.pages_crawled += 1
                 
-                # Skip empty, javascript, mailto, tel links
-                if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#', 'data:')):
-                    continue
+                if page is None:
+                    # Same HTML as last time: nothing to parse or export, the stored links continue the crawl
+                    await asyncio.to_thread(page_fingerprints.touch, url, session_id)
+                    change_counts[PAGE_UNCHANGED] += 1
+                    job.emit("page", url=url, depth=depth, change=PAGE_UNCHANGED, links=0, images=0, new_links=[])
+                    if report_writer:
+                        await asyncio.to_thread(
+                            report_writer.write,
+                            {'url': url, 'status': JOB_DONE, 'change': PAGE_UNCHANGED,
+                             'links': len(previous['links']), 'images': len(previous['images'])}
+                        )
+                    return previous['links']
                 
-                # Resolve relative URLs
-                if href.startswith('/'):
-                    from urllib.parse import urljoin
-                    href = urljoin(request.url, href)
-                elif href.startswith('./'):
-                    from urllib.parse import urljoin
-                    href = urljoin(request.url, href)
-                elif not href.startswith(('http://', 'https://')):
-                    # Skip relative paths that don't start with /
-                    continue
+                # The fingerprint is recorded as the page's links are exported; it is the next scrape's baseline
+                image_urls = [img_url for _, img_url in page['images']]
+                await asyncio.to_thread(
+                    page_fingerprints.record, url, session_id, page['content_hash'],
+                    [link['url'] for link in page['links']], image_urls
+                )
                 
-                # Clean the URL
-                try:
-                    from urllib.parse import urlparse, urlunparse
-                    parsed = urlparse(href)
-                    # Remove fragments and normalize
-                    clean_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, parsed.query, ''))
-                    
-                    # Skip if URL is invalid
-                    if not parsed.netloc:
-                        continue
-                        
-                except Exception as e:
-                    logger.warning(f"Invalid URL {href}: {str(e)}")
-                    continue
+                change = None
+                page_links = page['links']
+                page_image_urls = None
+                if job.incremental:
+                    change = PAGE_NEW if previous is None else PAGE_CHANGED
+                    page_links, removed, new_image_urls = diff_page(previous, page['links'], image_urls)
+                    page_image_urls = set(new_image_urls)
+                    change_counts[change] += 1
+                    change_counts["links_added"] += len(page_links)
+                    change_counts["links_removed"] += len(removed)
+                    await asyncio.to_thread(changes_writer.write_many, [
+                        {'page': url, 'change': 'added', 'url': link['url'], 'text': link['text'], 'title': link['title']}
+                        for link in page_links
+                    ] + [{'page': url, 'change': 'removed', 'url': link_url} for link_url in removed])
                 
-                # Get link text and clean it
-                link_text = link.get_text(strip=True)
-                if not link_text:
-                    link_text = link.get('title', '') or link.get('alt', '')
+                new_links = [link for link in page_links if link['url'] not in seen_link_urls]
+                seen_link_urls.update(link['url'] for link in new_links)
+                sample_links.extend(new_links[:5 - len(sample_links)])
+                await asyncio.to_thread(links_writer.write_rows, new_links)
+                job.links_found = links_writer.rows_written
+                job.emit(
+                    "page", url=url, depth=depth, title=page['title'], change=change, links=len(new_links),
+                    images=page['image_count'], new_links=[link['url'] for link in new_links[:EVENT_MAX_LINKS]]
+                )
+                
+                # Reserve one index per <img> so file names stay unique across pages
+                offset = image_index_offset
+                image_index_offset += page['image_count']
+                for img_index, img_url in page['images']:
+                    if page_image_urls is not None and img_url not in page_image_urls:
+                        continue  # Already saved by an earlier scrape of this page
+                    if img_url not in seen_image_urls:
+                        seen_image_urls.add(img_url)
+                        image_sources.append((offset + img_index, img_url))
                 
-                links_data.append({
-                    'url': clean_url,
-                    'text': link_text[:200],  # Limit text length
-                    'title': link.get('title', '')[:100],
-                    'target': link.get('target', ''),
-                    'rel': ' '.join(link.get('rel', [])) if isinstance(link.get('rel'), list) else link.get('rel', '')
-                })
-        
-        # Remove duplicates based on URL
-        unique_links = []
-        seen_urls = set()
-        for link in links_data:
-            if link['url'] not in seen_urls:
-                unique_links.append(link)
-                seen_urls.add(link['url'])
-        
-        links_data = unique_links
-        
-        # Create DataFrame and save to CSV
-        if links_data:
-            df_links = pd.DataFrame(links_data)
-            csv_filename = f'links_{session_id}.csv'
-            csv_path = os.path.join(session_output_dir, csv_filename)
+                if report_writer:
+                    await asyncio.to_thread(
+                        report_writer.write,
+                        {'url': url, 'status': JOB_DONE, 'change': change,
+                         'links': len(page['links']), 'images': len(page['images'])}
+                    )
+                return [link['url'] for link in page['links']]
             
-            # Debug: Log DataFrame info
-            log_scraping_activity(f"DataFrame shape: {df_links.shape}")
-            log_scraping_activity(f"DataFrame columns: {list(df_links.columns)}")
-            log_scraping_activity(f"First few rows of DataFrame:")
-            for i, row in df_links.head(3).iterrows():
-                log_scraping_activity(f"  Row {i}: URL={row['url'][:50]}... | Text={row['text'][:30]}...")
+            try:
+                await frontier.run(process_page, BATCH_CONCURRENCY if job.urls else CRAWL_CONCURRENCY)
+            finally:
+                links_writer.close()
+                if report_writer:
+                    report_writer.close()
+                    await asyncio.to_thread(manifests.record_file, session_output_dir, report_file, report_writer.size, 'report')
+                if changes_writer:
+                    changes_writer.close()
+                    await asyncio.to_thread(manifests.record_file, session_output_dir, changes_file, changes_writer.size, 'report')
             
-            # Save with proper encoding and format
-            df_links.to_csv(csv_path, index=False, encoding='utf-8-sig', quoting=1)  # quoting=1 for QUOTE_ALL
+            if frontier.pages_fetched == 0:
+                # Nothing could be fetched, surface the start page error
+                os.remove(links_path)
+                raise frontier.errors[0][1]
+            for failed_url, error in frontier.errors:
+                logger.warning(f"Skipped page {failed_url} in session {session_id}: {str(error)}")
             
-            # Verify the saved file
-            try:
-                with open(csv_path, 'r', encoding='utf-8-sig') as f:
-                    first_lines = f.readlines()[:5]
-                    log_scraping_activity(f"CSV file content (first 5 lines):")
-                    for i, line in enumerate(first_lines):
-                        log_scraping_activity(f"  Line {i+1}: {line.strip()}")
-            except Exception as e:
-                log_error_with_context(e, f"Error reading saved CSV file: {csv_path}")
+            if job.urls:
+                log_scraping_activity(f"Batch finished | Pages: {frontier.pages_fetched} | Failed: {len(frontier.errors)} | URLs: {len(job.urls)}")
+            elif crawl_options:
+                log_scraping_activity(f"Crawl finished | Pages: {frontier.pages_fetched} | Failed: {len(frontier.errors)} | Scheduled: {len(frontier.scheduled)}")
+            if job.incremental:
+                log_scraping_activity(
+                    f"Changes since last scrape | New pages: {change_counts[PAGE_NEW]} | Changed: {change_counts[PAGE_CHANGED]}"
+                    f" | Unchanged: {change_counts[PAGE_UNCHANGED]} | Links added: {change_counts['links_added']}"
+                    f" | Removed: {change_counts['links_removed']}"
+                )
             
-            log_scraping_activity(f"CSV file saved: {csv_path}")
-        else:
-            # Create empty CSV with headers
-            csv_filename = f'links_{session_id}.csv'
-            csv_path = os.path.join(session_output_dir, csv_filename)
+            links_count = links_writer.rows_written
+            job.add_bytes(links_writer.size)
+            await asyncio.to_thread(manifests.record_file, session_output_dir, links_file, links_writer.size, 'links')
             
-            with open(csv_path, 'w', encoding='utf-8-sig', newline='') as f:
-                import csv
-                writer = csv.writer(f, quoting=csv.QUOTE_ALL)
-                writer.writerow(['url', 'text', 'title', 'target', 'rel'])
+            log_scraping_activity(f"Extracted {links_count} unique links, saved to {links_file}")
             
-            log_scraping_activity("No links found, created empty CSV with headers")
-        
-        log_scraping_activity(f"Extracted {len(links_data)} unique links, saved to {csv_filename}")
-        
-        # Log some sample links for debugging
-        if links_data:
-            log_scraping_activity("Sample links extracted:")
-            for i, link in enumerate(links_data[:5]):
-                log_scraping_activity(f"  {i+1}. {link['url']} - {link['text'][:50]}")
-            if len(links_data) > 5:
-                log_scraping_activity(f"  ... and {len(links_data) - 5} more links")
-        
-        # Extract and save images with optimized concurrent downloads
-        images = soup.find_all('img')
-        saved_images = []
-        
-        log_scraping_activity(f"Found {len(images)} images to process")
-        
-        # Prepare image URLs for concurrent download
-        image_tasks = []
-        base64_images = []
-        
-        for img_index, img in enumerate(images):
-            img_url = img.get('src')
-            if not img_url:
-                continue
-                
-            try:
-                # Resolve relative image URLs
-                if img_url.startswith('/'):
-                    from urllib.parse import urljoin
-                    img_url = urljoin(request.url, img_url)
-                elif not img_url.startswith(('http://', 'https://', 'data:')):
-                    continue
-                
-                if img_url.startswith('data:image'):
-                    # Handle base64 encoded images (process immediately)
-                    try:
-                        img_type, img_data = img_url.split(';base64,')
-                        img_type = img_type.split(':')[-1]
-                        img_data_decoded = base64.b64decode(img_data)
-                        
-                        # Validate image data
-                        is_valid, validation_msg = validate_image_data(img_data_decoded)
-                        if not is_valid:
-                            logger.warning(f"Base64 image {img_index} validation failed: {validation_msg}")
-                            continue
-                        
-                        img_name = f'image_{img_index}'
-                        ext = get_file_extension_from_mime_type(img_type)
-                        
-                        if ext.lower() in ['svg', 'plain']:
-                            # Convert SVG to PNG
-                            try:
-                                svg_content = img_data_decoded.decode('utf-8')
-                                output_path = os.path.join(session_output_dir, f'{img_name}.png')
-                                cairosvg.svg2png(bytestring=svg_content, write_to=output_path)
-                                saved_images.append(f'{img_name}.png')
-                                logger.info(f"Saved SVG image as PNG: {img_name}.png")
-                            except Exception as svg_error:
-                                logger.error(f"Error converting SVG image {img_index}: {str(svg_error)}")
-                                continue
-                        else:
-                            # Save as original format
-                            output_path = os.path.join(session_output_dir, f'{img_name}.{ext}')
-                            with open(output_path, 'wb') as img_file:
-                                img_file.write(img_data_decoded)
-                            saved_images.append(f'{img_name}.{ext}')
-                            logger.info(f"Saved base64 image: {img_name}.{ext}")
-                    except Exception as e:
-                        logger.error(f"Error processing base64 image {img_index}: {str(e)}")
-                        continue
-                        
-                else:
-                    # Add to concurrent download queue
-                    image_tasks.append((img_index, img_url))
-                    
-            except Exception as e:
-                logger.error(f"Error processing image {img_index}: {str(e)}")
-                continue
-        
-        # Download images concurrently
-        if image_tasks:
-            log_scraping_activity(f"Starting concurrent download of {len(image_tasks)} images")
+            # Log some sample links for debugging
+            if sample_links:
+                log_scraping_activity("Sample links extracted:")
+                for i, link in enumerate(sample_links):
+                    log_scraping_activity(f"  {i+1}. {link['url']} - {link['text'][:50]}")
+                if links_count > len(sample_links):
+                    log_scraping_activity(f"  ... and {links_count - len(sample_links)} more links")
+            else:
+                log_scraping_activity(f"No links found, created empty {job.export_format} export")
             
-            def download_single_image(task):
-                img_index, img_url = task
-                try:
-                    # Minimal rate limiting
-                    time.sleep(random.uniform(0.05, 0.2))  # 50-200ms delay
-                    
-                    img_response = session.get(img_url, stream=True, timeout=TIMEOUT)
-                    
-                    if img_response.status_code == 200:
-                        # Get content type and validate
-                        content_type = img_response.headers.get('Content-Type', 'image/jpeg')
-                        ext = get_file_extension_from_mime_type(content_type)
-                        
-                        # Check content length if available
-                        content_length = img_response.headers.get('Content-Length')
-                        if content_length and int(content_length) > MAX_IMAGE_SIZE:
-                            logger.warning(f"Image {img_url} too large: {content_length} bytes")
-                            return None
-                        
-                        img_name = f'image_{img_index}.{ext}'
-                        output_path = os.path.join(session_output_dir, img_name)
-                        
-                        # Download with size validation and larger chunks
-                        total_size = 0
-                        with open(output_path, 'wb') as img_file:
-                            for chunk in img_response.iter_content(chunk_size=CHUNK_SIZE):
-                                if chunk:
-                                    total_size += len(chunk)
-                                    if total_size > MAX_IMAGE_SIZE:
-                                        logger.warning(f"Image {img_url} exceeded size limit during download")
-                                        img_file.close()
-                                        os.remove(output_path)
-                                        return None
-                                    img_file.write(chunk)
-                        
-                        return img_name
-                    else:
-                        logger.warning(f"Failed to download image {img_url}: Status {img_response.status_code}")
-                        return None
-                        
-                except Exception as e:
-                    logger.error(f"Error downloading image {img_url}: {str(e)}")
-                    return None
+            # Split data-URI images (decoded in a worker thread) from remote downloads
+            base64_images = [(i, u) for i, u in image_sources if u.startswith('data:image')]
+            image_tasks = [(i, u) for i, u in image_sources if not u.startswith('data:')]
             
-            # Use ThreadPoolExecutor for concurrent downloads
-            with ThreadPoolExecutor(max_workers=MAX_CONCURRENT_DOWNLOADS) as executor:
-                # Submit all download tasks
-                future_to_task = {executor.submit(download_single_image, task): task for task in image_tasks}
-                
-                # Collect results as they complete
-                for future in as_completed(future_to_task):
-                    img_name = future.result()
-                    if img_name:
-                        saved_images.append(img_name)
-                        logger.info(f"Downloaded image: {img_name}")
+            if image_tasks:
+                log_scraping_activity(f"Starting concurrent download of {len(image_tasks)} images")
+            
+            base64_saved, downloaded = await asyncio.gather(
+                asyncio.to_thread(save_base64_images, base64_images, session_output_dir, job),
+                download_images(session, image_tasks, session_output_dir, job)
+            )
+            saved_images = base64_saved + downloaded
+            
+            if image_tasks:
+                log_scraping_activity(f"Concurrent download completed. Successfully downloaded {len(downloaded)} images")
             
-            log_scraping_activity(f"Concurrent download completed. Successfully downloaded {len(saved_images)} images")
+            # Dimensions and thumbnails for the info endpoint and the gallery
+            if IMAGE_POSTPROCESS_ENABLED and saved_images:
+                try:
+                    saved_images = await postprocess_images(session_output_dir, saved_images)
+                    log_scraping_activity(f"Post-processed {len(saved_images)} images")
+                except Exception as e:
+                    logger.error(f"Image post-processing failed for session {session_id}: {str(e)}")
         
         # Clean up memory
         cleanup_memory()
@@ -622,34 +1249,263 @@ async def scrape_website(request: ScrapingRequest):
         log_scraping_activity(f"Session directory: {session_output_dir}")
         
         # Log session summary
-        log_scraping_session(session_id, request.url, len(links_data), len(saved_images), success=True)
-        log_scraping_activity(f"Scraping session completed | Duration: {total_duration:.2f}s | Links: {len(links_data)} | Images: {len(saved_images)}")
+        log_scraping_session(session_id, job.url, links_count, len(saved_images), success=True)
+        log_scraping_activity(f"Scraping session completed | Duration: {total_duration:.2f}s | Links: {links_count} | Images: {len(saved_images)}")
+        
+        job.result = {
+            "links_count": links_count,
+            "images_count": len(saved_images),
+            "pages_crawled": frontier.pages_fetched,
+            "pages_failed": len(frontier.errors),
+            "csv_file": links_file,
+            "format": job.export_format,
+            "duration_seconds": round(total_duration, 2)
+        }
+        if job.urls:
+            job.result["report_file"] = report_file
+        if job.incremental:
+            job.result["changes"] = change_counts
+            job.result["changes_file"] = changes_file
+        await asyncio.to_thread(
+            manifests.close, session_output_dir, status=JOB_DONE, completed_at=time.time(), result=job.result
+        )
+    
+    except Exception as e:
+        total_duration = time.time() - start_time
+        log_error_with_context(e, f"Session: {session_id} | URL: {job.url} | Duration: {total_duration:.2f}s")
+        log_scraping_session(session_id, job.url, 0, 0, success=False)
+        try:
+            await asyncio.to_thread(
+                manifests.close, session_output_dir, status=JOB_FAILED, completed_at=time.time(), error=str(e)
+            )
+        except OSError as manifest_error:
+            # Session folder removed while the job ran
+            manifests.forget(session_output_dir)
+            logger.warning(f"Could not write manifest for session {session_id}: {str(manifest_error)}")
+        raise
+
+def create_session_directory(session_id: str) -> str:
+    """Create the folder of a new session, checking the output directory is writable"""
+    # Ensure output directory exists and has proper permissions
+    if not os.path.exists(OUTPUT_DIR):
+        try:
+            os.makedirs(OUTPUT_DIR, exist_ok=True)
+            log_scraping_activity(f"Created output directory: {OUTPUT_DIR}")
+        except PermissionError as e:
+            log_error_with_context(e, f"Cannot create output directory: {OUTPUT_DIR}")
+            raise HTTPException(
+                status_code=500,
+                detail=f"Server configuration error: Cannot create output directory. Please contact administrator."
+            )
+    
+    # Check if we can write to output directory
+    if not os.access(OUTPUT_DIR, os.W_OK):
+        log_error_with_context("Permission denied", f"Cannot write to output directory: {OUTPUT_DIR}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Server configuration error: Cannot write to output directory. Please contact administrator."
+        )
+    
+    session_output_dir = os.path.join(OUTPUT_DIR, session_id)
+    try:
+        os.makedirs(session_output_dir, exist_ok=True)
+        log_scraping_activity(f"Created session directory: {session_output_dir}")
+    except PermissionError as e:
+        log_error_with_context(e, f"Cannot create session directory: {session_output_dir}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Server configuration error: Cannot create session directory. Please contact administrator."
+        )
+    
+    return session_output_dir
+
+@app.post("/api/scrape", response_model=ScrapingResponse)
+async def scrape_website(request: ScrapingRequest):
+    start_time = time.time()
+    session_id = str(uuid.uuid4())
+    
+    log_scraping_activity(f"Queueing scraping session | ID: {session_id} | URL: {request.url}")
+    
+    try:
+        create_session_directory(session_id)
+        
+        # Validate URL
+        if not request.url.startswith(('http://', 'https://')):
+            request.url = 'https://' + request.url
+            log_scraping_activity(f"Added https:// prefix to URL: {request.url}")
+        
+        # Validate crawl patterns up front so bad regexes fail the request, not the job
+        crawl_options = None
+        if request.crawl:
+            for pattern in request.include_patterns + request.exclude_patterns:
+                try:
+                    re.compile(pattern)
+                except re.error as e:
+                    cleanup_session_folder(session_id, "invalid-request")
+                    raise HTTPException(status_code=422, detail=f"Invalid pattern {pattern!r}: {str(e)}")
+            crawl_options = {
+                "max_depth": request.max_depth,
+                "max_pages": request.max_pages,
+                "scope": request.scope,
+                "include_patterns": request.include_patterns,
+                "exclude_patterns": request.exclude_patterns
+            }
+        
+        if request.format == "parquet" and not PARQUET_AVAILABLE:
+            cleanup_session_folder(session_id, "invalid-request")
+            raise HTTPException(status_code=422, detail="Parquet export is not available on this server (pyarrow is not installed)")
+        
+        # Hand the job to the background workers and return immediately
+        try:
+            job = ScrapeJob(
+                session_id, request.url, options=crawl_options, export_format=request.format,
+                incremental=request.incremental
+            )
+            session_index.upsert(session_id, url=request.url, status=JOB_QUEUED, created_at=job.created_at.timestamp())
+            job_queue.submit(job)
+        except (QueueFullError, QueueNotRunningError) as e:
+            cleanup_session_folder(session_id, "queue-rejected")
+            log_error_with_context(e, f"Session: {session_id} | URL: {request.url}")
+            raise HTTPException(status_code=503, detail=f"Scraper is busy, please retry later: {str(e)}")
+        
+        log_scraping_activity(f"Scraping session queued | ID: {session_id} | Setup: {time.time() - start_time:.2f}s")
         
-        # Calculate expiration time (24 hours from now)
-        from datetime import timedelta
         expires_at = (datetime.now() + timedelta(hours=DEFAULT_CLEANUP_HOURS)).isoformat()
         
         return ScrapingResponse(
             success=True,
-            message="Scraping completed successfully! Your files will be available for 24 hours.",
-            links_count=len(links_data),
-            images_count=len(saved_images),
-            excel_file=f"/api/download/{session_id}/{csv_filename}",
+            message="Scraping job queued. Poll the status URL for progress; files will be available for 24 hours.",
+            excel_file=f"/api/download/{session_id}/{links_filename(session_id, request.format)}",
             images_folder=f"/api/images/{session_id}",
             session_id=session_id,
-            expires_at=expires_at
+            expires_at=expires_at,
+            status=job_queue.get(session_id).status,
+            status_url=f"/api/session/{session_id}/status",
+            events_url=f"/api/session/{session_id}/events",
+            changes_file=f"/api/download/{session_id}/{changes_filename(session_id)}" if request.incremental else None
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
-        total_duration = time.time() - start_time
-        log_error_with_context(e, f"Session: {session_id} | URL: {request.url} | Duration: {total_duration:.2f}s")
-        log_scraping_session(session_id, request.url, 0, 0, success=False)
+        log_error_with_context(e, f"Session: {session_id} | URL: {request.url}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.post("/api/scrape/batch", response_model=ScrapingResponse)
+async def scrape_batch(
+    urls: List[str] = Form([]),
+    file: Optional[UploadFile] = File(None),
+    format: str = Form(DEFAULT_EXPORT_FORMAT, pattern=EXPORT_FORMAT_PATTERN),
+    incremental: bool = Form(False)
+):
+    """Queue one scrape job for many URLs.
+    
+    URLs come from ``urls`` form fields and/or an uploaded ``file``, one per
+    line. All pages are scraped into a single session: one links export, one
+    image set and a per-page JSON Lines report. ``incremental`` exports only
+    what changed since each page's last scrape.
+    """
+    start_time = time.time()
+    session_id = str(uuid.uuid4())
+    
+    try:
+        lines = [line for value in urls for line in value.splitlines()]
+        if file is not None:
+            data = await file.read(BATCH_MAX_UPLOAD_BYTES + 1)
+            if len(data) > BATCH_MAX_UPLOAD_BYTES:
+                raise HTTPException(status_code=413, detail=f"URL list too large (max: {BATCH_MAX_UPLOAD_BYTES} bytes)")
+            lines.extend(data.decode('utf-8-sig', errors='replace').splitlines())
+        
+        batch_urls = parse_batch_urls(lines)
+        if not batch_urls:
+            raise HTTPException(status_code=422, detail="No URLs given")
+        if len(batch_urls) > BATCH_MAX_URLS:
+            raise HTTPException(status_code=422, detail=f"Too many URLs: {len(batch_urls)} (max: {BATCH_MAX_URLS})")
+        if format == "parquet" and not PARQUET_AVAILABLE:
+            raise HTTPException(status_code=422, detail="Parquet export is not available on this server (pyarrow is not installed)")
+        
+        log_scraping_activity(f"Queueing batch scraping session | ID: {session_id} | URLs: {len(batch_urls)}")
+        create_session_directory(session_id)
+        
+        # One job for the whole batch: it shares a worker, the connection pool and the page concurrency
+        try:
+            job = ScrapeJob(session_id, batch_urls[0], export_format=format, urls=batch_urls, incremental=incremental)
+            session_index.upsert(session_id, url=batch_urls[0], status=JOB_QUEUED, created_at=job.created_at.timestamp())
+            job_queue.submit(job)
+        except (QueueFullError, QueueNotRunningError) as e:
+            cleanup_session_folder(session_id, "queue-rejected")
+            log_error_with_context(e, f"Session: {session_id} | Batch of {len(batch_urls)} URLs")
+            raise HTTPException(status_code=503, detail=f"Scraper is busy, please retry later: {str(e)}")
+        
+        log_scraping_activity(f"Batch scraping session queued | ID: {session_id} | Setup: {time.time() - start_time:.2f}s")
+        
+        expires_at = (datetime.now() + timedelta(hours=DEFAULT_CLEANUP_HOURS)).isoformat()
+        
+        return ScrapingResponse(
+            success=True,
+            message=f"Batch of {len(batch_urls)} URLs queued. Poll the status URL for progress; files will be available for 24 hours.",
+            excel_file=f"/api/download/{session_id}/{links_filename(session_id, format)}",
+            images_folder=f"/api/images/{session_id}",
+            session_id=session_id,
+            expires_at=expires_at,
+            status=job_queue.get(session_id).status,
+            status_url=f"/api/session/{session_id}/status",
+            events_url=f"/api/session/{session_id}/events",
+            urls_count=len(batch_urls),
+            report_file=f"/api/download/{session_id}/{page_report_filename(session_id)}",
+            changes_file=f"/api/download/{session_id}/{changes_filename(session_id)}" if incremental else None
+        )
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        log_error_with_context(e, f"Session: {session_id} | Batch scrape")
         raise HTTPException(status_code=500, detail=str(e))
 
+async def get_links_export(session_id: str, fmt: str) -> str:
+    """File name of the session's links in ``fmt``, converting the stored export on first request"""
+    session_path = os.path.join(OUTPUT_DIR, session_id)
+    target_file = links_filename(session_id, fmt)
+    files, _ = await asyncio.to_thread(session_files, session_path)
+    if target_file in files:
+        return target_file
+    
+    job = job_queue.get(session_id)
+    if job and job.status in (JOB_QUEUED, JOB_RUNNING):
+        raise HTTPException(status_code=409, detail=f"Session {session_id} is still being scraped")
+    
+    stored = find_links_export(session_path, [name for name, info in files.items() if info['kind'] == 'links'])
+    if not stored:
+        raise HTTPException(status_code=404, detail=f"No links export found in session {session_id}")
+    
+    source_file, source_format = stored
+    try:
+        rows = await asyncio.to_thread(
+            convert_links,
+            os.path.join(session_path, source_file), source_format,
+            os.path.join(session_path, target_file), fmt
+        )
+    except ExportUnavailableError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    await asyncio.to_thread(
+        manifests.record_file, session_path, target_file, os.path.getsize(os.path.join(session_path, target_file)), 'links'
+    )
+    log_scraping_activity(f"Converted {source_file} to {fmt} ({rows} links) for session {session_id}")
+    return target_file
+
 @app.get("/api/download/{session_id}/{filename}")
-async def download_file(session_id: str, filename: str):
-    """Download file from scraping session with proper content type and auto-cleanup"""
+async def download_file(session_id: str, filename: str, format: Optional[str] = Query(None, pattern=EXPORT_FORMAT_PATTERN)):
+    """Download file from scraping session with proper content type and auto-cleanup.
+    
+    For links exports, ``format`` selects csv, csv.gz, jsonl or parquet.
+    """
     try:
+        if not os.path.isdir(os.path.join(OUTPUT_DIR, session_id)):
+            raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+        
+        if format and detect_format(filename):
+            filename = await get_links_export(session_id, format)
+        
         file_path = os.path.join(OUTPUT_DIR, session_id, filename)
         
         if not os.path.exists(file_path):
@@ -657,8 +1513,13 @@ async def download_file(session_id: str, filename: str):
         
         # Determine content type based on file extension
         content_type = "application/octet-stream"
-        if filename.endswith('.csv'):
+        export_format = detect_format(filename)
+        if export_format:
+            content_type = EXPORT_MEDIA_TYPES[export_format]
+        elif filename.endswith('.csv'):
             content_type = "text/csv"
+        elif filename.endswith('.jsonl'):
+            content_type = EXPORT_MEDIA_TYPES['jsonl']
         elif filename.endswith('.xlsx'):
             content_type = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
         elif filename.endswith(('.jpg', '.jpeg')):
@@ -671,7 +1532,7 @@ async def download_file(session_id: str, filename: str):
             content_type = "image/webp"
         
         # Create response
-        if filename.endswith('.csv'):
+        if filename.endswith('.csv') or export_format:
             response = FileResponse(
                 file_path, 
                 filename=filename,
@@ -699,6 +1560,8 @@ async def download_file(session_id: str, filename: str):
         
         return response
             
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error downloading file {filename} from session {session_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error downloading file: {str(e)}")
@@ -712,17 +1575,15 @@ async def list_session_files(session_id: str):
         if not os.path.exists(session_path):
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
         
+        session_entries, _ = await asyncio.to_thread(session_files, session_path)
         files = []
-        for filename in os.listdir(session_path):
-            file_path = os.path.join(session_path, filename)
-            if os.path.isfile(file_path):
-                file_size = os.path.getsize(file_path)
-                files.append({
-                    "filename": filename,
-                    "size_bytes": file_size,
-                    "size_mb": round(file_size / (1024 * 1024), 2),
-                    "download_url": f"/api/download/{session_id}/{filename}"
-                })
+        for filename, info in sorted(session_entries.items()):
+            files.append({
+                "filename": filename,
+                "size_bytes": info['size'],
+                "size_mb": round(info['size'] / (1024 * 1024), 2),
+                "download_url": f"/api/download/{session_id}/{filename}"
+            })
         
         return {
             "session_id": session_id,
@@ -736,34 +1597,27 @@ async def list_session_files(session_id: str):
         raise HTTPException(status_code=500, detail=f"Error listing files: {str(e)}")
 
 @app.get("/api/csv/{session_id}")
-async def download_csv(session_id: str):
-    """Download CSV file from scraping session with proper encoding"""
+async def download_csv(session_id: str, format: str = Query("csv", pattern=EXPORT_FORMAT_PATTERN)):
+    """Download the links of a scraping session; CSV unless another ``format`` is requested"""
     try:
         session_path = os.path.join(OUTPUT_DIR, session_id)
         
         if not os.path.exists(session_path):
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
         
-        # Find CSV file in session
-        csv_file = None
-        for filename in os.listdir(session_path):
-            if filename.endswith('.csv'):
-                csv_file = filename
-                break
-        
-        if not csv_file:
-            raise HTTPException(status_code=404, detail=f"No CSV file found in session {session_id}")
-        
+        # Serve the stored export, converting it when another format is requested
+        csv_file = await get_links_export(session_id, format)
         csv_path = os.path.join(session_path, csv_file)
+        content_type = "text/csv; charset=utf-8" if format == "csv" else EXPORT_MEDIA_TYPES[format]
         
         # Create response
         response = FileResponse(
             csv_path,
             filename=csv_file,
-            media_type="text/csv",
+            media_type=EXPORT_MEDIA_TYPES[format],
             headers={
                 "Content-Disposition": f"attachment; filename={csv_file}",
-                "Content-Type": "text/csv; charset=utf-8"
+                "Content-Type": content_type
             }
         )
         
@@ -781,13 +1635,19 @@ async def download_csv(session_id: str):
         
         return response
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error downloading CSV for session {session_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error downloading CSV: {str(e)}")
 
 @app.get("/api/images/{session_id}")
-async def download_images_zip(session_id: str):
-    """Download all images from scraping session as ZIP file"""
+async def download_images_zip(session_id: str, request: Request):
+    """Download all images from scraping session as ZIP file.
+    
+    The archive is cached in the session folder until the images change; cached
+    archives support ETag revalidation and byte ranges.
+    """
     try:
         session_path = os.path.join(OUTPUT_DIR, session_id)
         
@@ -795,59 +1655,73 @@ async def download_images_zip(session_id: str):
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
         
         # Find all image files in session
-        image_files = []
-        for filename in os.listdir(session_path):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg')):
-                image_files.append(filename)
+        files, manifest = await asyncio.to_thread(session_files, session_path)
+        image_files = sorted(filename for filename, info in files.items() if info['kind'] == 'image')
         
         if not image_files:
             raise HTTPException(status_code=404, detail=f"No images found in session {session_id}")
         
-        # Create ZIP file in memory
         zip_filename = f"images_{session_id}.zip"
+        entries = [(os.path.join(session_path, image_file), image_file) for image_file in image_files]
         
-        # Create temporary ZIP file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.zip') as temp_zip:
-            temp_zip_path = temp_zip.name
-        
-        try:
-            with zipfile.ZipFile(temp_zip_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
-                for image_file in image_files:
-                    image_path = os.path.join(session_path, image_file)
-                    # Add file to ZIP with just the filename (no path)
-                    zipf.write(image_path, image_file)
-            
-            # Create response
-            response = FileResponse(
-                temp_zip_path,
-                filename=zip_filename,
-                media_type="application/zip",
-                headers={
-                    "Content-Disposition": f"attachment; filename={zip_filename}",
-                    "Content-Type": "application/zip"
-                }
+        # The cache key follows the images, so adding or changing one invalidates the archive
+        if manifest is not None:
+            # Content hashes from the manifest; no file is stat-ed
+            archive_id = archive_key_for(
+                (image_file, files[image_file]['size'], files[image_file].get('sha256', '')) for image_file in image_files
             )
+        else:
+            archive_id = await asyncio.to_thread(archive_key, entries)
+        etag = f'"{archive_id}"'
+        cache_dir = os.path.join(session_path, ARCHIVE_CACHE_DIR)
+        cache_path = os.path.join(cache_dir, f"images_{archive_id}.zip")
+        headers = {"Content-Disposition": f"attachment; filename={zip_filename}", "ETag": etag}
+        
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if if_range and if_range != etag:
+            range_header = None  # Resource changed since the partial download began, send it whole
+        
+        # Auto-cleanup after download if enabled; runs once the last chunk has been sent
+        cleanup_task = None
+        if CLEANUP_AFTER_DOWNLOAD:
+            cleanup_task = BackgroundTask(cleanup_session_folder, session_id, "images-download-complete")
+            logger.info(f"Scheduled cleanup for session {session_id} after images download")
+        
+        if not os.path.exists(cache_path):
+            await asyncio.to_thread(prune_archive_cache, cache_dir, os.path.basename(cache_path))
             
-            # Auto-cleanup after download if enabled
-            if CLEANUP_AFTER_DOWNLOAD:
-                # Schedule cleanup after response is sent
-                import asyncio
-                async def delayed_cleanup():
-                    await asyncio.sleep(1)  # Wait for response to be sent
-                    cleanup_session_folder(session_id, "images-download-complete")
-                
-                # Start cleanup task in background
-                asyncio.create_task(delayed_cleanup())
-                logger.info(f"Scheduled cleanup for session {session_id} after images download")
-            
-            return response
-            
-        except Exception as zip_error:
-            # Clean up temp file on error
-            if os.path.exists(temp_zip_path):
-                os.unlink(temp_zip_path)
-            raise zip_error
-            
+            if not range_header:
+                # Stream the archive while it is built and cached; no waiting for the whole ZIP
+                log_scraping_activity(f"Building images ZIP for session {session_id} ({len(entries)} files)")
+                return StreamingResponse(
+                    iter_zip_cached(entries, cache_path),
+                    media_type="application/zip",
+                    headers=headers,
+                    background=cleanup_task
+                )
+            await asyncio.to_thread(build_zip, entries, cache_path)
+        
+        # Repeat downloads are served straight from the cached file
+        try:
+            byte_range = parse_range(range_header, os.path.getsize(cache_path))
+        except RangeNotSatisfiable:
+            return Response(status_code=416, headers={"Content-Range": f"bytes */{os.path.getsize(cache_path)}"})
+        
+        return RangedFileResponse(
+            cache_path,
+            byte_range,
+            headers=headers,
+            media_type="application/zip",
+            method=request.method,
+            background=cleanup_task
+        )
+        
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error creating images ZIP for session {session_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error creating images ZIP: {str(e)}")
@@ -861,21 +1735,27 @@ async def get_images_info(session_id: str):
         if not os.path.exists(session_path):
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
         
-        # Find all image files in session
+        files, manifest = await asyncio.to_thread(session_files, session_path)
+        # Dimensions and thumbnails recorded by the post-processing stage
+        details = manifest.get('images', {}) if manifest else {}
         image_files = []
         total_size = 0
         
-        for filename in os.listdir(session_path):
-            if filename.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg')):
-                image_path = os.path.join(session_path, filename)
-                file_size = os.path.getsize(image_path)
-                image_files.append({
-                    "filename": filename,
-                    "size_bytes": file_size,
-                    "size_mb": round(file_size / (1024 * 1024), 2),
-                    "extension": filename.split('.')[-1].lower()
-                })
-                total_size += file_size
+        for filename in sorted(name for name, info in files.items() if info['kind'] == 'image'):
+            file_size = files[filename]['size']
+            info = details.get(filename, {})
+            thumbnail = info.get('thumbnail')
+            image_files.append({
+                "filename": filename,
+                "size_bytes": file_size,
+                "size_mb": round(file_size / (1024 * 1024), 2),
+                "extension": filename.split('.')[-1].lower(),
+                "format": info.get('format'),
+                "width": info.get('width'),
+                "height": info.get('height'),
+                "thumbnail_url": f"/api/images/{session_id}/thumbnails/{thumbnail}" if thumbnail else None
+            })
+            total_size += file_size
         
         return {
             "session_id": session_id,
@@ -890,6 +1770,24 @@ async def get_images_info(session_id: str):
         logger.error(f"Error getting images info for session {session_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting images info: {str(e)}")
 
+@app.get("/api/images/{session_id}/thumbnails/{filename}")
+async def get_image_thumbnail(session_id: str, filename: str):
+    """Serve a thumbnail generated by the post-processing stage"""
+    try:
+        thumbnail_path = os.path.join(OUTPUT_DIR, session_id, THUMBNAIL_DIR, filename)
+        if filename != os.path.basename(filename) or filename.startswith('.') or not os.path.isfile(thumbnail_path):
+            raise HTTPException(status_code=404, detail=f"Thumbnail {filename} not found in session {session_id}")
+        
+        media_type = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        # Thumbnails never change for a given session and file name
+        return FileResponse(thumbnail_path, media_type=media_type, headers={"Cache-Control": "public, max-age=86400, immutable"})
+    
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error serving thumbnail {filename} for session {session_id}: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error serving thumbnail: {str(e)}")
+
 @app.get("/api/session/{session_id}/status")
 async def get_session_status(session_id: str):
     """Get status and information about a scraping session"""
@@ -899,25 +1797,33 @@ async def get_session_status(session_id: str):
         if not os.path.exists(session_path):
             raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
         
+        files, manifest = await asyncio.to_thread(session_files, session_path)
+        
         # Get session creation time
-        creation_time = datetime.fromtimestamp(os.path.getctime(session_path))
+        if manifest is not None:
+            creation_time = datetime.fromtimestamp(manifest['created_at'])
+        else:
+            creation_time = datetime.fromtimestamp(os.path.getctime(session_path))
         expires_at = creation_time + timedelta(hours=DEFAULT_CLEANUP_HOURS)
         
-        # Count files
-        files = os.listdir(session_path)
-        csv_files = [f for f in files if f.endswith('.csv')]
-        image_files = [f for f in files if f.lower().endswith(('.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg'))]
+        # Count files (the archive cache folder and the manifest are not session files)
+        csv_files = sorted(f for f in files if f.endswith('.csv'))
+        links_files = sorted(f for f, info in files.items() if info['kind'] == 'links')
+        image_files = [f for f, info in files.items() if info['kind'] == 'image']
         
         # Calculate total size
-        total_size = sum(
-            os.path.getsize(os.path.join(session_path, f)) 
-            for f in files 
-            if os.path.isfile(os.path.join(session_path, f))
-        )
+        total_size = manifest['total_size'] if manifest is not None else sum(info['size'] for info in files.values())
+        
+        # Live job state when the session was scraped by this process, else the state recorded in the manifest
+        job = job_queue.get(session_id)
+        manifest = manifest or {}
         
         return {
             "session_id": session_id,
-            "status": "available",
+            "status": job.status if job else manifest.get('status', "available"),
+            "progress": job.to_dict()["progress"] if job else None,
+            "error": job.error if job else manifest.get('error'),
+            "result": job.result if job else manifest.get('result'),
             "created_at": creation_time.isoformat(),
             "expires_at": expires_at.isoformat(),
             "time_remaining_hours": max(0, (expires_at - datetime.now()).total_seconds() / 3600),
@@ -929,6 +1835,7 @@ async def get_session_status(session_id: str):
             "total_size_mb": round(total_size / (1024 * 1024), 2),
             "download_urls": {
                 "csv": f"/api/download/{session_id}/{csv_files[0]}" if csv_files else None,
+                "links": f"/api/download/{session_id}/{links_files[0]}" if links_files else None,
                 "images": f"/api/images/{session_id}" if image_files else None
             }
         }
@@ -937,6 +1844,54 @@ async def get_session_status(session_id: str):
         logger.error(f"Error getting session status for {session_id}: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Error getting session status: {str(e)}")
 
+@app.get("/api/session/{session_id}/events")
+async def stream_session_events(session_id: str, request: Request, after: int = Query(0, ge=0)):
+    """Follow a scrape as Server-Sent Events: ``status``, ``page``, ``page_error`` and ``image``.
+    
+    Buffered events after ``Last-Event-ID`` (or ``after``) are replayed first, so
+    reconnecting clients miss nothing; the stream ends once the job has finished.
+    Sessions without a job in this process get a single ``status`` event.
+    """
+    session_path = os.path.join(OUTPUT_DIR, session_id)
+    if not os.path.isdir(session_path):
+        raise HTTPException(status_code=404, detail=f"Session {session_id} not found")
+    
+    job = job_queue.get(session_id)
+    try:
+        last_event_id = int(request.headers.get("last-event-id") or after)
+    except ValueError:
+        last_event_id = after
+    
+    async def event_stream():
+        if job is None:
+            # Finished before this process started: the manifest holds the final state
+            manifest = await asyncio.to_thread(manifests.get, session_path) or {}
+            yield format_sse("status", {
+                "status": manifest.get("status", "available"),
+                "error": manifest.get("error"),
+                "result": manifest.get("result"),
+                "progress": None
+            })
+            return
+        
+        yield b"retry: 3000\n\n"
+        event_id = last_event_id
+        while not (job.status in JOB_FINISHED and event_id >= job.last_event_id):
+            events = await job.wait_for_events(event_id, EVENT_KEEPALIVE_INTERVAL)
+            if not events:
+                # Comment line keeps proxies from closing an idle stream
+                yield b": keep-alive\n\n"
+                continue
+            for event_id, event, data in events:
+                # Current counters on every event, so a client that missed events still shows the right totals
+                yield format_sse(event, {**data, "progress": job.progress()}, event_id)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint with system info"""
@@ -952,13 +1907,27 @@ async def health_check():
                 "memory_usage_percent": memory_info.percent,
                 "disk_usage_percent": (disk_info.used / disk_info.total) * 100,
                 "output_dir_size_mb": disk_info.used / (1024 * 1024)
-            }
+            },
+            "http_pool": http_client.stats(),
+            "politeness": politeness.stats(),
+            "http_cache": http_cache.stats(),
+            "image_index": image_index.stats(),
+            "page_fingerprints": page_fingerprints.stats(),
+            "svg_rasterizer": svg_rasterizer.stats(),
+            "image_processing": image_processor.stats()
         }
     except ImportError:
         return {
             "status": "healthy", 
             "timestamp": datetime.now().isoformat(),
-            "note": "psutil not available for detailed system info"
+            "note": "psutil not available for detailed system info",
+            "http_pool": http_client.stats(),
+            "politeness": politeness.stats(),
+            "http_cache": http_cache.stats(),
+            "image_index": image_index.stats(),
+            "page_fingerprints": page_fingerprints.stats(),
+            "svg_rasterizer": svg_rasterizer.stats(),
+            "image_processing": image_processor.stats()
         }
 
 @app.get("/api/debug/last-session")
@@ -969,16 +1938,16 @@ async def get_last_session_info():
         if not os.path.exists(OUTPUT_DIR):
             return {"error": "No output directory found"}
         
-        session_dirs = [d for d in os.listdir(OUTPUT_DIR) if os.path.isdir(os.path.join(OUTPUT_DIR, d))]
-        if not session_dirs:
+        # Get the most recent session
+        latest = session_index.latest()
+        if not latest:
             return {"error": "No sessions found"}
         
-        # Get the most recent session
-        latest_session = max(session_dirs, key=lambda x: os.path.getctime(os.path.join(OUTPUT_DIR, x)))
+        latest_session = latest['session_id']
         session_path = os.path.join(OUTPUT_DIR, latest_session)
         
         # Get files in the session
-        files = os.listdir(session_path)
+        files = sorted((await asyncio.to_thread(session_files, session_path))[0])
         
         # Read CSV content if exists
         csv_content = None
@@ -1070,16 +2039,11 @@ async def cleanup_old_sessions(older_than_hours: int = DEFAULT_CLEANUP_HOURS):
         if not os.path.exists(OUTPUT_DIR):
             return {"message": "No output directory found", "cleaned_sessions": 0}
         
-        for session_dir in os.listdir(OUTPUT_DIR):
-            session_path = os.path.join(OUTPUT_DIR, session_dir)
-            if os.path.isdir(session_path):
-                # Check if directory is older than cutoff time
-                dir_creation_time = datetime.fromtimestamp(os.path.getctime(session_path))
-                if dir_creation_time < cutoff_time:
-                    success, size = cleanup_session_folder(session_dir, "scheduled-cleanup")
-                    if success:
-                        cleaned_sessions.append(session_dir)
-                        total_size_freed += size
+        for session in session_index.created_before(cutoff_time.timestamp()):
+            success, size = cleanup_session_folder(session['session_id'], "scheduled-cleanup")
+            if success:
+                cleaned_sessions.append(session['session_id'])
+                total_size_freed += size
         
         # Clean up memory
         cleanup_memory()
@@ -1122,13 +2086,11 @@ async def cleanup_all_sessions():
         if not os.path.exists(OUTPUT_DIR):
             return {"message": "No output directory found", "cleaned_sessions": 0}
         
-        for session_dir in os.listdir(OUTPUT_DIR):
-            session_path = os.path.join(OUTPUT_DIR, session_dir)
-            if os.path.isdir(session_path):
-                success, size = cleanup_session_folder(session_dir, "cleanup-all")
-                if success:
-                    cleaned_sessions.append(session_dir)
-                    total_size_freed += size
+        for session_dir in list_session_ids():
+            success, size = cleanup_session_folder(session_dir, "cleanup-all")
+            if success:
+                cleaned_sessions.append(session_dir)
+                total_size_freed += size
         
         # Clean up memory
         cleanup_memory()
@@ -1150,24 +2112,17 @@ async def get_maintenance_stats():
         if not os.path.exists(OUTPUT_DIR):
             return {"error": "Output directory not found"}
         
-        total_sessions = 0
-        total_files = 0
-        total_size = 0
-        
-        for session_dir in os.listdir(OUTPUT_DIR):
-            session_path = os.path.join(OUTPUT_DIR, session_dir)
-            if os.path.isdir(session_path):
-                total_sessions += 1
-                for dirpath, dirnames, filenames in os.walk(session_path):
-                    total_files += len(filenames)
-                    for filename in filenames:
-                        file_path = os.path.join(dirpath, filename)
-                        total_size += os.path.getsize(file_path)
+        # Aggregates over the session index; no session folder is touched
+        sessions = await asyncio.to_thread(session_index.stats)
         
         return {
-            "total_sessions": total_sessions,
-            "total_files": total_files,
-            "total_size_mb": round(total_size / (1024 * 1024), 2),
+            "total_sessions": sessions["sessions"],
+            "total_files": sessions["files"],
+            "total_size_mb": round(sessions["size"] / (1024 * 1024), 2),
+            # Part of the total not shared through the blob store (images are counted there once)
+            "unshared_size_mb": round(sessions["own_size"] / (1024 * 1024), 2),
+            "sessions_by_status": sessions["statuses"],
+            "blob_store": blob_store.stats(),
             "output_dir": OUTPUT_DIR
         }
     except Exception as e:
@@ -1181,75 +2136,29 @@ async def test_scrape_debug(request: ScrapingRequest):
         if not request.url.startswith(('http://', 'https://')):
             request.url = 'https://' + request.url
         
-        # Simple scraping without login
-        session = requests.Session()
-        session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
-        
-        response = session.get(request.url, timeout=30)
-        
-        if response.status_code != 200:
-            return {"error": f"Failed to fetch website. Status code: {response.status_code}"}
-        
-        # Parse HTML
-        soup = BeautifulSoup(response.text, 'html.parser')
+        # Simple scraping without login, through the shared connection pool
+        async with http_client.acquire() as session:
+            status, _, body_path = await fetch_page(session, request.url, debug=True)
         
-        # Extract links for debugging
-        links_data = []
-        links = soup.find_all('a')
+        if status != 200:
+            return {"error": f"Failed to fetch website. Status code: {status}"}
         
-        for i, link in enumerate(links[:10]):  # Only first 10 for debugging
-            href = link.get('href')
-            if href:
-                href = href.strip()
-                
-                # Skip empty, javascript, mailto, tel links
-                if not href or href.startswith(('javascript:', 'mailto:', 'tel:', '#', 'data:')):
-                    continue
-                
-                # Resolve relative URLs
-                if href.startswith('/'):
-                    from urllib.parse import urljoin
-                    href = urljoin(request.url, href)
-                elif href.startswith('./'):
-                    from urllib.parse import urljoin
-                    href = urljoin(request.url, href)
-                elif not href.startswith(('http://', 'https://')):
-                    continue
-                
-                # Clean the URL
-                try:
-                    from urllib.parse import urlparse, urlunparse
-                    parsed = urlparse(href)
-                    clean_url = urlunparse((parsed.scheme, parsed.netloc, parsed.path, parsed.params, parsed.query, ''))
-                    
-                    if not parsed.netloc:
-                        continue
-                        
-                except Exception as e:
-                    continue
-                
-                # Get link text
-                link_text = link.get_text(strip=True)
-                if not link_text:
-                    link_text = link.get('title', '') or link.get('alt', '')
-                
-                links_data.append({
-                    'url': clean_url,
-                    'text': link_text[:100],
-                    'title': link.get('title', '')[:50],
-                    'target': link.get('target', ''),
-                    'rel': ' '.join(link.get('rel', [])) if isinstance(link.get('rel'), list) else link.get('rel', '')
-                })
+        # Parse HTML and extract links for debugging (first 10 anchors only)
+        try:
+            extracted = await asyncio.to_thread(extract_page_file, body_path, PARSER_BACKEND)
+            with open(body_path, 'r', encoding='utf-8', errors='replace') as body_file:
+                html = body_file.read(501)
+        finally:
+            os.remove(body_path)
+        links_data = normalize_links(extracted['anchors'][:10], request.url, text_limit=100, title_limit=50)
         
         return {
             "url": request.url,
-            "response_status": response.status_code,
-            "total_links_found": len(links),
+            "response_status": status,
+            "total_links_found": extracted['anchor_count'],
             "valid_links_extracted": len(links_data),
             "sample_links": links_data,
-            "html_preview": response.text[:500] + "..." if len(response.text) > 500 else response.text
+            "html_preview": html[:500] + "..." if len(html) > 500 else html
         }
         
     except Exception as e:
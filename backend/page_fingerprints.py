@@ -0,0 +1,144 @@
+"""
+Fingerprints of the last scrape of each page.
+
+For every page URL the index keeps a hash of the fetched HTML, the link and
+image URLs the page had, and the session that saw it. Every scrape records
+them; incremental scrapes compare against them:
+
+- a page whose content hash is unchanged is not parsed again, and its stored
+  links still feed the crawl frontier
+- for a changed (or new) page only the links added since the last scrape,
+  the links removed and the images not seen before are exported
+
+Inline ``data:`` images are stored and compared by a digest of the URI, so a
+fingerprint stays small however large the page's embedded images are.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from typing import List, Optional
+
+PAGE_NEW = "new"
+PAGE_CHANGED = "changed"
+PAGE_UNCHANGED = "unchanged"
+
+
+def file_hash(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """sha256 of a fetched page's spool file, read in chunks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as page_file:
+        for chunk in iter(lambda: page_file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def image_key(url: str) -> str:
+    """How an image URL is kept in a fingerprint: ``data:`` URIs by their sha256"""
+    if url.startswith('data:'):
+        return 'data:sha256,' + hashlib.sha256(url.encode()).hexdigest()
+    return url
+
+
+def diff_page(previous: Optional[dict], links: List[dict], image_urls: List[str]):
+    """(added links, removed link URLs, new image URLs) of a page against its fingerprint.
+
+    Without a fingerprint every link is added and every image is new.
+    """
+    if previous is None:
+        return list(links), [], list(image_urls)
+    old_links = set(previous['links'])
+    current_links = {link['url'] for link in links}
+    old_images = set(previous['images'])
+    return (
+        [link for link in links if link['url'] not in old_links],
+        sorted(old_links - current_links),
+        [url for url in image_urls if image_key(url) not in old_images]
+    )
+
+
+class PageFingerprints:
+    """SQLite-backed page URL -> last scrape fingerprint"""
+
+    def __init__(self, path: str, enabled: bool = True):
+        self.path = path
+        self.enabled = enabled
+        self.skipped = 0  # unchanged pages not parsed again
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        if not self.enabled or self._conn is not None:
+            return
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages ("
+            " url TEXT PRIMARY KEY, content_hash TEXT NOT NULL, links TEXT NOT NULL, images TEXT NOT NULL,"
+            " session_id TEXT, scraped_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_scraped_at ON pages (scraped_at)")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def get(self, url: str) -> Optional[dict]:
+        if self._conn is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, links, images, session_id, scraped_at FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            'content_hash': row[0], 'links': json.loads(row[1]), 'images': json.loads(row[2]),
+            'session_id': row[3], 'scraped_at': row[4]
+        }
+
+    def record(self, url: str, session_id: str, page_hash: str, link_urls: List[str], image_urls: List[str]):
+        """Remember what a scrape of ``url`` found"""
+        if self._conn is None:
+            return
+        images = [image_key(image_url) for image_url in image_urls]
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, links, images, session_id, scraped_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (url, page_hash, json.dumps(link_urls), json.dumps(images), session_id, time.time())
+            )
+            self._conn.commit()
+
+    def touch(self, url: str, session_id: str):
+        """Mark an unchanged page as seen by ``session_id``"""
+        if self._conn is None:
+            return
+        with self._lock:
+            self.skipped += 1
+            self._conn.execute(
+                "UPDATE pages SET session_id = ?, scraped_at = ? WHERE url = ?", (session_id, time.time(), url)
+            )
+            self._conn.commit()
+
+    def prune(self, older_than: float) -> int:
+        """Drop fingerprints of pages not scraped since ``older_than`` (a timestamp)"""
+        if self._conn is None:
+            return 0
+        with self._lock:
+            count = self._conn.execute("DELETE FROM pages WHERE scraped_at < ?", (older_than,)).rowcount
+            self._conn.commit()
+        return count
+
+    def stats(self) -> dict:
+        if self._conn is None:
+            return {"enabled": self.enabled, "pages": 0, "skipped_pages": self.skipped}
+        with self._lock:
+            pages = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {"enabled": self.enabled, "pages": pages, "skipped_pages": self.skipped}
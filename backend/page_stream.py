@@ -0,0 +1,204 @@
+"""
+Bounded decoding of streamed page bodies.
+
+Pages are requested with aiohttp's automatic decompression turned off and
+their bodies are read in chunks. ``PageDecoder`` turns each received chunk
+into UTF-8 text pieces of at most ``step`` bytes:
+
+1. the ``Content-Encoding`` (gzip or deflate) is undone in bounded steps;
+   past ``max_bytes`` of decoded body it raises ``PageTooLargeError``, and
+   once the decoded body outgrows the received bytes by more than
+   ``max_ratio`` it raises ``DecompressionBombError``, long before a
+   compression bomb reaches the size cap
+2. the charset is settled once from the first bytes (``sniff_charset``):
+   byte order mark, then the ``Content-Type`` header, then a ``<meta>``
+   declaration within the first ``SNIFF_BYTES``, then a UTF-8 validity check
+   of those bytes (windows-1252 if they are not UTF-8). No statistical
+   detection runs over the body.
+3. UTF-8 pages pass through as they are, so the parser is the only decoder
+   of their text; other charsets are transcoded to UTF-8 once
+
+so a worker holds a few chunks of a page at a time, whatever the page size.
+"""
+
+import codecs
+import re
+import zlib
+from typing import Iterator, Optional, Tuple
+
+# Only encodings we can decode in bounded steps are advertised
+ACCEPT_ENCODING = "gzip, deflate"
+
+# Decoded size below which the compression ratio is not checked (small pages compress well)
+RATIO_MIN_BYTES = 1024 * 1024
+
+# Bytes searched for a <meta> charset declaration
+SNIFF_BYTES = 4096
+
+BOMS = ((codecs.BOM_UTF8, 'utf-8'), (codecs.BOM_UTF16_LE, 'utf-16'), (codecs.BOM_UTF16_BE, 'utf-16'))
+
+# <meta charset="x"> and <meta http-equiv="Content-Type" content="text/html; charset=x">
+META_CHARSET = re.compile(rb'<meta[^>]*?charset\s*=\s*["\']?\s*([a-zA-Z0-9_.:-]+)', re.IGNORECASE)
+
+# Labels browsers decode with a superset codec (WHATWG Encoding Standard)
+CHARSET_SUPERSETS = {
+    'ascii': 'cp1252',
+    'iso8859-1': 'cp1252',
+    'iso8859-9': 'cp1254',
+    'gb2312': 'gbk',
+    'shift_jis': 'cp932',
+    'euc_kr': 'cp949',
+}
+
+
+class PageTooLargeError(Exception):
+    """Raised when a page body exceeds the size limit"""
+
+
+class DecompressionBombError(PageTooLargeError):
+    """Raised when a compressed body expands far beyond what was received"""
+
+
+class ContentEncodingError(Exception):
+    """Raised for an unsupported Content-Encoding or a corrupt compressed body"""
+
+
+def charset_codec(label) -> Optional[str]:
+    """Python codec for a charset label, None if unknown"""
+    if isinstance(label, bytes):
+        label = label.decode('ascii', errors='ignore')
+    try:
+        name = codecs.lookup(label.strip().strip('"\'')).name
+    except LookupError:
+        return None
+    return CHARSET_SUPERSETS.get(name, name)
+
+
+def response_charset(content_type: Optional[str]) -> Optional[str]:
+    """Codec of the charset in a Content-Type header, None if missing or unknown"""
+    for param in (content_type or '').split(';')[1:]:
+        name, _, value = param.partition('=')
+        if name.strip().lower() == 'charset':
+            return charset_codec(value)
+    return None
+
+
+def sniff_charset(head: bytes, declared: Optional[str] = None, final: bool = True) -> Tuple[str, str]:
+    """(codec, source) of a page from its first bytes and the header charset ``declared``.
+
+    ``final`` tells that ``head`` is the whole body; otherwise it may end
+    inside a character.
+    """
+    for bom, codec in BOMS:
+        if head.startswith(bom):
+            return codec, 'bom'
+    if declared:
+        return declared, 'header'
+    match = META_CHARSET.search(head, 0, SNIFF_BYTES)
+    codec = charset_codec(match.group(1)) if match else None
+    if codec:
+        # A document that could be read to find the declaration is not UTF-16
+        return ('utf-8' if codec.startswith('utf-16') else codec), 'meta'
+    try:
+        head[:SNIFF_BYTES].decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A character cut off by the end of the window is not an error
+        cut_off = not final or len(head) > SNIFF_BYTES
+        if not cut_off or e.reason != 'unexpected end of data':
+            return 'cp1252', 'default'
+    return 'utf-8', 'default'
+
+
+class PageDecoder:
+    """Incremental Content-Encoding and charset decoding of one response body.
+
+    ``charset`` and ``charset_source`` are set once the charset is settled.
+    """
+
+    def __init__(self, content_encoding: Optional[str] = None, content_type: Optional[str] = None,
+                 max_bytes: int = 20 * 1024 * 1024, max_ratio: float = 100, step: int = 64 * 1024):
+        encoding = (content_encoding or 'identity').strip().lower()
+        if encoding in ('identity', ''):
+            self._zlib = None
+        elif encoding in ('gzip', 'x-gzip'):
+            self._zlib = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == 'deflate':
+            self._zlib = False  # zlib-wrapped or raw, decided by the first byte
+        else:
+            raise ContentEncodingError(f"Unsupported Content-Encoding: {content_encoding}")
+        self.max_bytes = max_bytes
+        self.max_ratio = max_ratio
+        self.step = step
+        self.received = 0
+        self.decoded = 0
+        self.charset: Optional[str] = None
+        self.charset_source: Optional[str] = None
+        self._declared = response_charset(content_type)
+        self._head = b''  # Bytes held back until the charset is settled
+        self._text = None  # Incremental decoder; None while UTF-8 passes through
+
+    def feed(self, chunk: bytes) -> Iterator[bytes]:
+        """UTF-8 pieces of a received chunk"""
+        self.received += len(chunk)
+        if self._zlib is None:
+            for start in range(0, len(chunk), self.step):
+                yield from self._to_utf8(self._count(chunk[start:start + self.step]))
+            return
+        if self._zlib is False and chunk:
+            # Servers disagree on whether "deflate" carries the zlib header
+            self._zlib = zlib.decompressobj(zlib.MAX_WBITS if chunk[0] & 0x0F == 8 else -zlib.MAX_WBITS)
+        while chunk:
+            try:
+                piece = self._zlib.decompress(chunk, self.step)
+            except zlib.error as e:
+                raise ContentEncodingError(f"Corrupt compressed body: {e}")
+            chunk = self._zlib.unconsumed_tail
+            if piece:
+                yield from self._to_utf8(self._count(piece))
+
+    def close(self) -> bytes:
+        """The remaining UTF-8 text once the body has been received"""
+        tail = b''
+        if self._zlib:
+            try:
+                tail = self._count(self._zlib.flush())
+            except zlib.error as e:
+                raise ContentEncodingError(f"Corrupt compressed body: {e}")
+        pieces = list(self._to_utf8(tail))
+        if self.charset is None:
+            pieces.extend(self._settle(final=True))
+        if self._text is not None:
+            pieces.append(self._text.decode(b'', final=True).encode('utf-8'))
+        return b''.join(pieces)
+
+    def _count(self, piece: bytes) -> bytes:
+        self.decoded += len(piece)
+        if self.decoded > self.max_bytes:
+            raise PageTooLargeError(f"Page larger than {self.max_bytes} bytes")
+        if self.max_ratio and self.decoded > RATIO_MIN_BYTES and self.decoded > self.received * self.max_ratio:
+            raise DecompressionBombError(
+                f"Page expands more than {self.max_ratio}x ({self.received} bytes received, {self.decoded} decoded)"
+            )
+        return piece
+
+    def _to_utf8(self, piece: bytes) -> Iterator[bytes]:
+        if self.charset is None:
+            self._head += piece
+            # A declared charset only waits for a possible byte order mark
+            if len(self._head) >= (3 if self._declared else SNIFF_BYTES):
+                yield from self._settle()
+        elif self._text is None:
+            yield piece
+        elif piece:
+            yield self._text.decode(piece).encode('utf-8')
+
+    def _settle(self, final: bool = False) -> Iterator[bytes]:
+        self.charset, self.charset_source = sniff_charset(self._head, self._declared, final)
+        head, self._head = self._head, b''
+        if self.charset == 'utf-8':
+            if head.startswith(codecs.BOM_UTF8):
+                head = head[len(codecs.BOM_UTF8):]
+        else:
+            self._text = codecs.getincrementaldecoder(self.charset)(errors='replace')
+        for start in range(0, len(head), self.step):
+            yield from self._to_utf8(head[start:start + self.step])
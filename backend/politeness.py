@@ -0,0 +1,123 @@
+"""
+Per-host politeness scheduler.
+
+Every page and image fetch reserves a slot from a token bucket belonging to
+the target host. Buckets are implemented in GCRA form (a "theoretical arrival
+time" per host), which needs no locks: a reservation is computed
+synchronously and the caller then sleeps until its slot. The rate of a host
+is halved when it answers 429/503 and honours ``Retry-After``; it recovers
+gradually on successful responses.
+"""
+
+import asyncio
+import time
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+THROTTLE_STATUSES = (429, 503)
+
+
+class ThrottledError(Exception):
+    """Raised when a host answered 429/503; the request may be retried"""
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class HostBucket:
+    """Token bucket state of one host"""
+
+    def __init__(self, rate: float, burst: int):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tat = 0.0  # theoretical arrival time of the next request
+        self.blocked_until = 0.0
+
+    def reserve(self, now: float) -> float:
+        """Reserve the next slot and return how long to wait for it"""
+        interval = 1.0 / self.rate
+        tolerance = (self.burst - 1) * interval
+        self.tat = max(self.tat, now)
+        delay = max(self.tat - tolerance - now, self.blocked_until - now, 0.0)
+        self.tat = max(self.tat, self.blocked_until) + interval
+        return delay
+
+
+class PolitenessScheduler:
+    """Rate-limits requests per host with adaptive backoff"""
+
+    def __init__(self, rate: float, burst: int, host_overrides: Optional[Dict[str, Tuple[float, int]]] = None,
+                 min_rate: float = 0.1, default_backoff: float = 2.0, max_backoff: float = 120.0,
+                 max_tracked_hosts: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.host_overrides = host_overrides or {}
+        self.min_rate = min_rate
+        self.default_backoff = default_backoff
+        self.max_backoff = max_backoff
+        self.max_tracked_hosts = max_tracked_hosts
+        self.buckets: Dict[str, HostBucket] = {}
+
+    def _bucket(self, host: str) -> HostBucket:
+        bucket = self.buckets.get(host)
+        if bucket is None:
+            if len(self.buckets) >= self.max_tracked_hosts:
+                self._prune()
+            rate, burst = self.host_overrides.get(host, (self.rate, self.burst))
+            bucket = self.buckets[host] = HostBucket(rate, burst)
+        return bucket
+
+    def _prune(self):
+        """Forget hosts whose buckets are idle and fully refilled"""
+        now = time.monotonic()
+        for host, bucket in list(self.buckets.items()):
+            if bucket.tat <= now and bucket.blocked_until <= now and bucket.rate == bucket.base_rate:
+                del self.buckets[host]
+
+    async def acquire(self, url: str):
+        """Wait until the host of ``url`` may receive another request"""
+        host = (urlparse(url).hostname or '').lower()
+        delay = self._bucket(host).reserve(time.monotonic())
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def feedback(self, url: str, status: int, retry_after: Optional[str] = None):
+        """Adapt the host rate to the response status"""
+        host = (urlparse(url).hostname or '').lower()
+        bucket = self._bucket(host)
+        if status in THROTTLE_STATUSES:
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+            backoff = parse_retry_after(retry_after)
+            if backoff is None:
+                backoff = self.default_backoff
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + min(backoff, self.max_backoff))
+            # Drain the burst so requests resume at the reduced rate after the block
+            bucket.tat = max(bucket.tat, bucket.blocked_until + (bucket.burst - 1) / bucket.rate)
+        elif status < 400 and bucket.rate < bucket.base_rate:
+            # Additive recovery towards the configured rate
+            bucket.rate = min(bucket.base_rate, bucket.rate + bucket.base_rate * 0.1)
+
+    def stats(self) -> dict:
+        now = time.monotonic()
+        throttled = {
+            host: round(bucket.rate, 3)
+            for host, bucket in self.buckets.items()
+            if bucket.rate < bucket.base_rate or bucket.blocked_until > now
+        }
+        return {"tracked_hosts": len(self.buckets), "throttled_hosts": throttled}
@@ -0,0 +1,119 @@
+"""
+File responses with HTTP Range support.
+
+Starlette's ``FileResponse`` always sends the whole file. ``RangedFileResponse``
+serves a single byte range (206) or the full file (200). It hands the file
+to the server with the ASGI ``http.response.zerocopysend`` extension (sendfile)
+when the server offers it, and falls back to chunked reads otherwise.
+
+``format_sse`` encodes one Server-Sent Events message for streamed job events.
+"""
+
+import json
+import os
+from typing import Optional, Tuple
+
+import anyio
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+RANGE_CHUNK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when a Range header does not overlap the file"""
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Parse a single ``bytes=`` range into inclusive ``(start, end)``.
+
+    Returns None when the whole file should be sent (no header, an unsupported
+    unit or multiple ranges, which servers may ignore per RFC 9110).
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    first, _, last = header[len('bytes='):].strip().partition('-')
+    try:
+        if first == '':
+            # Suffix range: the last N bytes
+            length = int(last)
+            if length <= 0:
+                raise RangeNotSatisfiable(header)
+            return max(0, size - length), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise RangeNotSatisfiable(header)
+    return start, min(end, size - 1)
+
+
+def format_sse(event: Optional[str], data, event_id: Optional[int] = None) -> bytes:
+    """One ``text/event-stream`` message; ``data`` is sent as a single line of JSON"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    if event:
+        lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'), default=str)}")
+    return ('\n'.join(lines) + '\n\n').encode()
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison)"""
+    if not header:
+        return False
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return '*' in candidates or etag in (c[2:] if c.startswith('W/') else c for c in candidates)
+
+
+class RangedFileResponse(Response):
+    """Send a file, or one byte range of it, preferring zero-copy sends"""
+
+    def __init__(self, path: str, byte_range: Optional[Tuple[int, int]] = None,
+                 headers: Optional[dict] = None, media_type: Optional[str] = None,
+                 method: Optional[str] = None, background: Optional[BackgroundTask] = None):
+        self.path = path
+        size = os.path.getsize(path)
+        self.start, self.end = byte_range if byte_range else (0, size - 1)
+        self.status_code = 206 if byte_range else 200
+        self.media_type = media_type
+        self.background = background
+        self.send_header_only = method is not None and method.upper() == 'HEAD'
+        self.init_headers(headers)
+        self.headers['accept-ranges'] = 'bytes'
+        self.headers['content-length'] = str(self.end - self.start + 1)
+        if byte_range:
+            self.headers['content-range'] = f"bytes {self.start}-{self.end}/{size}"
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+        count = self.end - self.start + 1
+        if self.send_header_only or count <= 0:
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+        elif "http.response.zerocopysend" in scope.get("extensions", {}):
+            with open(self.path, 'rb') as file:
+                await send({
+                    "type": "http.response.zerocopysend",
+                    "file": file,
+                    "offset": self.start,
+                    "count": count,
+                    "more_body": False,
+                })
+        else:
+            async with await anyio.open_file(self.path, mode='rb') as file:
+                await file.seek(self.start)
+                remaining = count
+                while remaining > 0:
+                    chunk = await file.read(min(RANGE_CHUNK_SIZE, remaining))
+                    if not chunk:
+                        break
+                    remaining -= len(chunk)
+                    await send({"type": "http.response.body", "body": chunk, "more_body": remaining > 0})
+                if remaining > 0:
+                    # File shrank underneath us; terminate the body
+                    await send({"type": "http.response.body", "body": b"", "more_body": False})
+        if self.background is not None:
+            await self.background()
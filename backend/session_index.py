@@ -0,0 +1,120 @@
+"""
+Persistent index of scraping sessions.
+
+One row per session folder with its URL, status, creation and expiry time,
+file count and sizes. Maintenance endpoints answer from it instead of
+walking the output directory: statistics are SQL aggregates, cleanup reads
+the sessions past their cutoff from an index on the creation time, and the
+latest session is a single lookup.
+
+Rows are written when a session is created, whenever its manifest is written
+and when the session is removed. ``size`` is the total size of the session
+files; ``own_size`` the part not shared with the blob store, i.e. the bytes
+removing the folder frees by itself.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Set
+
+COLUMNS = ('url', 'status', 'created_at', 'expires_at', 'file_count', 'size', 'own_size')
+
+
+class SessionIndex:
+    """SQLite-backed session summary table"""
+
+    def __init__(self, path: str, ttl: float = 24 * 3600):
+        self.path = path
+        self.ttl = ttl  # Seconds until a session expires, for expires_at
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def open(self):
+        if self._conn is not None:
+            return
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY, url TEXT, status TEXT,"
+            " created_at REAL NOT NULL, expires_at REAL NOT NULL,"
+            " file_count INTEGER NOT NULL DEFAULT 0, size INTEGER NOT NULL DEFAULT 0,"
+            " own_size INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS sessions_created_at ON sessions (created_at)")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def upsert(self, session_id: str, **fields):
+        """Create or update a session row; ``created_at`` is only set when the row is created"""
+        if self._conn is None:
+            return
+        unknown = set(fields) - set(COLUMNS)
+        if unknown:
+            raise ValueError(f"Unknown session index fields: {sorted(unknown)}")
+        created_at = fields.pop('created_at', None) or time.time()
+        fields.pop('expires_at', None)
+        names = ['session_id', 'created_at', 'expires_at'] + list(fields)
+        if fields:
+            on_conflict = "DO UPDATE SET " + ', '.join(f"{name} = excluded.{name}" for name in fields)
+        else:
+            on_conflict = "DO NOTHING"
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO sessions ({', '.join(names)}) VALUES ({', '.join('?' * len(names))})"
+                f" ON CONFLICT (session_id) {on_conflict}",
+                [session_id, created_at, created_at + self.ttl] + list(fields.values())
+            )
+            self._conn.commit()
+
+    def remove(self, session_id: str):
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._conn.commit()
+
+    def _rows(self, query: str, params=()) -> List[dict]:
+        if self._conn is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT session_id, {', '.join(COLUMNS)} FROM sessions {query}", params
+            ).fetchall()
+        return [dict(zip(('session_id',) + COLUMNS, row)) for row in rows]
+
+    def get(self, session_id: str) -> Optional[dict]:
+        rows = self._rows("WHERE session_id = ?", (session_id,))
+        return rows[0] if rows else None
+
+    def latest(self) -> Optional[dict]:
+        rows = self._rows("ORDER BY created_at DESC LIMIT 1")
+        return rows[0] if rows else None
+
+    def created_before(self, cutoff: float, limit: Optional[int] = None) -> List[dict]:
+        """Sessions created before ``cutoff`` (a timestamp), oldest first"""
+        return self._rows("WHERE created_at < ? ORDER BY created_at LIMIT ?", (cutoff, -1 if limit is None else limit))
+
+    def session_ids(self) -> Set[str]:
+        if self._conn is None:
+            return set()
+        with self._lock:
+            return {row[0] for row in self._conn.execute("SELECT session_id FROM sessions")}
+
+    def stats(self) -> dict:
+        if self._conn is None:
+            return {"sessions": 0, "files": 0, "size": 0, "own_size": 0, "statuses": {}}
+        with self._lock:
+            sessions, files, size, own_size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(file_count), 0), COALESCE(SUM(size), 0), COALESCE(SUM(own_size), 0)"
+                " FROM sessions"
+            ).fetchone()
+            statuses = dict(self._conn.execute("SELECT status, COUNT(*) FROM sessions GROUP BY status").fetchall())
+        return {"sessions": sessions, "files": files, "size": size, "own_size": own_size, "statuses": statuses}
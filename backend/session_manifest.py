@@ -0,0 +1,213 @@
+"""
+Per-session manifest.
+
+Each session folder holds a small JSON document, ``.manifest.json``, listing
+what the scrape produced: every file with its size, kind and content hash,
+per-kind counts, the total size, timestamps and the job status. Read
+endpoints answer from it instead of listing and stat-ing the session's files.
+
+The manifest is always replaced atomically (write to a temp file, then
+``os.replace``), so readers never see a partial document. While a scrape
+runs, ``ManifestStore`` keeps the manifest in memory and flushes it at most
+every ``flush_interval`` seconds; finished manifests are cached in memory
+and re-read only when the file changes (one ``stat`` per lookup).
+
+Flushes of live manifests write a snapshot after the store lock is released,
+so recording a file never waits for another session's write; writes of one
+session are serialized and a snapshot older than the last one written is
+dropped.
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+MANIFEST_NAME = '.manifest.json'
+MANIFEST_VERSION = 2  # 1 only held image details, not the file list
+
+
+def manifest_path(session_dir: str) -> str:
+    return os.path.join(session_dir, MANIFEST_NAME)
+
+
+def read_manifest(session_dir: str) -> Optional[dict]:
+    """The session manifest, or None for sessions written before manifests existed"""
+    try:
+        with open(manifest_path(session_dir)) as manifest_file:
+            return json.load(manifest_file)
+    except (OSError, ValueError):
+        return None
+
+
+def write_manifest(session_dir: str, manifest: dict):
+    manifest['version'] = MANIFEST_VERSION
+    manifest['updated_at'] = time.time()
+    path = manifest_path(session_dir)
+    temp_path = f"{path}.{uuid.uuid4().hex}.part"
+    with open(temp_path, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, separators=(',', ':'))
+    os.replace(temp_path, path)
+
+
+def new_manifest(**fields) -> dict:
+    manifest = {'created_at': time.time(), 'files': {}, 'counts': {}, 'total_size': 0}
+    manifest.update(fields)
+    return manifest
+
+
+def add_file(manifest: dict, name: str, size: int, kind: str, digest: Optional[str] = None):
+    """Add or replace a file entry, keeping counts and total size in step"""
+    remove_file(manifest, name)
+    entry = {'size': size, 'kind': kind}
+    if digest:
+        entry['sha256'] = digest
+    manifest.setdefault('files', {})[name] = entry
+    counts = manifest.setdefault('counts', {})
+    counts[kind] = counts.get(kind, 0) + 1
+    manifest['total_size'] = manifest.get('total_size', 0) + size
+
+
+def remove_file(manifest: dict, name: str):
+    entry = manifest.get('files', {}).pop(name, None)
+    if entry:
+        counts = manifest['counts']
+        counts[entry['kind']] = counts.get(entry['kind'], 1) - 1
+        manifest['total_size'] -= entry['size']
+    manifest.get('images', {}).pop(name, None)
+
+
+def snapshot(manifest: dict) -> dict:
+    """Copy that stays consistent while the live manifest keeps changing"""
+    copy = dict(manifest)
+    for section in ('files', 'counts', 'images'):
+        if section in copy:
+            copy[section] = dict(copy[section])
+    return copy
+
+
+class ManifestStore:
+    """Live manifests of running scrapes plus a cache of finished ones"""
+
+    def __init__(self, flush_interval: float = 1.0, cache_size: int = 256,
+                 on_write: Optional[Callable[[str, dict], None]] = None):
+        self.flush_interval = flush_interval
+        self.cache_size = cache_size
+        self.on_write = on_write  # Called with (session_dir, manifest) after each write
+        self._live: Dict[str, dict] = {}
+        self._last_flush: Dict[str, float] = {}
+        self._cache: "OrderedDict[str, tuple]" = OrderedDict()  # session_dir -> (mtime_ns, manifest)
+        self._lock = threading.RLock()
+        self._generation = 0
+        self._write_locks: Dict[str, threading.Lock] = {}  # Per session; taken after _lock, never before it
+        self._written: Dict[str, int] = {}  # session_dir -> generation of the last written snapshot
+
+    def open(self, session_dir: str, **fields) -> dict:
+        """Start the live manifest of a session about to be scraped"""
+        with self._lock:
+            manifest = new_manifest(**fields)
+            self._live[session_dir] = manifest
+            self._cache.pop(session_dir, None)
+            pending = self._flush(session_dir, force=True)
+        self._write(session_dir, pending)
+        return manifest
+
+    def close(self, session_dir: str, **fields):
+        """Write the final manifest of a scrape and stop tracking it as live"""
+        with self._lock:
+            if session_dir not in self._live:
+                return
+            self._live[session_dir].update(fields)
+            pending = self._flush(session_dir, force=True)
+            del self._live[session_dir]
+            self._last_flush.pop(session_dir, None)
+        self._write(session_dir, pending)
+
+    def _flush(self, session_dir: str, force: bool = False) -> Optional[tuple]:
+        """``(generation, snapshot)`` to write if a flush is due; called with the lock held"""
+        now = time.monotonic()
+        if not force and now - self._last_flush.get(session_dir, 0) < self.flush_interval:
+            return None
+        self._last_flush[session_dir] = now
+        return self._pending(self._live[session_dir])
+
+    def _pending(self, manifest: dict) -> tuple:
+        self._generation += 1
+        return self._generation, snapshot(manifest)
+
+    def _write(self, session_dir: str, pending: Optional[tuple]):
+        if pending is None:
+            return
+        generation, manifest = pending
+        with self._lock:
+            write_lock = self._write_locks.setdefault(session_dir, threading.Lock())
+        with write_lock:
+            if generation < self._written.get(session_dir, 0):
+                return  # A newer snapshot was written meanwhile
+            self._written[session_dir] = generation
+            write_manifest(session_dir, manifest)
+            if self.on_write is not None:
+                self.on_write(session_dir, manifest)
+
+    def _edit(self, session_dir: str, change: Callable[[dict], None]):
+        with self._lock:
+            manifest = self._live.get(session_dir)
+            if manifest is not None:
+                change(manifest)
+                pending = self._flush(session_dir)
+            else:
+                # Finished session (e.g. a converted export): read-modify-write, written under
+                # the lock so a concurrent edit reads the result
+                manifest = self.get(session_dir)
+                if manifest is None:
+                    return
+                change(manifest)
+                self._write(session_dir, self._pending(manifest))
+                self._cache.pop(session_dir, None)
+                return
+        self._write(session_dir, pending)
+
+    def record_file(self, session_dir: str, name: str, size: int, kind: str, digest: Optional[str] = None):
+        self._edit(session_dir, lambda manifest: add_file(manifest, name, size, kind, digest))
+
+    def remove_file(self, session_dir: str, name: str):
+        self._edit(session_dir, lambda manifest: remove_file(manifest, name))
+
+    def update(self, session_dir: str, **sections):
+        self._edit(session_dir, lambda manifest: manifest.update(sections))
+
+    def get(self, session_dir: str) -> Optional[dict]:
+        """Current manifest of a session (a copy), or None if it has none"""
+        with self._lock:
+            manifest = self._live.get(session_dir)
+            if manifest is not None:
+                return snapshot(manifest)
+            try:
+                mtime_ns = os.stat(manifest_path(session_dir)).st_mtime_ns
+            except OSError:
+                self._cache.pop(session_dir, None)
+                return None
+            cached = self._cache.get(session_dir)
+            if cached and cached[0] == mtime_ns:
+                self._cache.move_to_end(session_dir)
+                return snapshot(cached[1]) if cached[1] is not None else None
+        manifest = read_manifest(session_dir)
+        if manifest is not None and manifest.get('version') != MANIFEST_VERSION:
+            manifest = None  # Older format, treated like a session without manifest
+        with self._lock:
+            self._cache[session_dir] = (mtime_ns, manifest)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return snapshot(manifest) if manifest is not None else None
+
+    def forget(self, session_dir: str):
+        """Drop a removed session from memory"""
+        with self._lock:
+            self._live.pop(session_dir, None)
+            self._last_flush.pop(session_dir, None)
+            self._cache.pop(session_dir, None)
+            self._write_locks.pop(session_dir, None)
+            self._written.pop(session_dir, None)
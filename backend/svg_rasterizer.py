@@ -0,0 +1,219 @@
+"""
+SVG to PNG conversion in a bounded process pool.
+
+``cairosvg`` is CPU-heavy and holds the GIL, so rendering it in the server
+process stalls every other request. ``SVGRasterizer`` renders in worker
+processes instead, with a per-job timeout (a stuck worker is killed and the
+pool replaced) and an address-space limit per worker. Results are kept in a
+small LRU keyed by the SVG content hash, so the same icon repeated across
+pages and sessions is only rendered once.
+"""
+
+import asyncio
+import concurrent.futures
+import hashlib
+import multiprocessing
+import threading
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, List, Optional, Union
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+
+class SVGTimeoutError(Exception):
+    """Raised when rendering an SVG takes longer than the configured timeout"""
+
+
+def _lost(future: concurrent.futures.Future) -> bool:
+    """Whether a future died with its recycled pool instead of finishing"""
+    if not future.done() or future.cancelled():
+        return True
+    return isinstance(future.exception(), BrokenProcessPool)
+
+
+def _init_worker(memory_limit: Optional[int]):
+    if memory_limit and resource is not None:
+        try:
+            resource.setrlimit(resource.RLIMIT_AS, (memory_limit, memory_limit))
+        except (ValueError, OSError):
+            pass
+
+
+def render_png(svg_data: bytes) -> bytes:
+    """Render an SVG document to PNG (runs in a worker process)"""
+    import cairosvg
+    return cairosvg.svg2png(bytestring=svg_data)
+
+
+class SVGRasterizer:
+    """Process pool for SVG rendering with a content-hash result cache"""
+
+    def __init__(self, workers: int = 2, timeout: float = 10.0, memory_limit: Optional[int] = None,
+                 cache_max_bytes: int = 16 * 1024 * 1024, render: Callable[[bytes], bytes] = render_png):
+        self.workers = workers  # 0 renders in the calling thread (no timeout)
+        self.timeout = timeout
+        self.memory_limit = memory_limit
+        self.cache_max_bytes = cache_max_bytes
+        self.render = render
+        self.rendered = 0
+        self.cache_hits = 0
+        self.timeouts = 0
+        self.failures = 0
+        self._cache: "OrderedDict[str, bytes]" = OrderedDict()
+        self._cache_bytes = 0
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs threads and an event loop is unsafe
+                self._pool = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=(self.memory_limit,)
+                )
+            return self._pool
+
+    def _recycle(self, pool: concurrent.futures.ProcessPoolExecutor):
+        """Kill a pool with a stuck worker; the next job starts a fresh one"""
+        with self._lock:
+            if self._pool is pool:
+                self._pool = None
+        # A running task cannot be cancelled, only its process terminated
+        processes = list((pool._processes or {}).values())
+        pool.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+
+    def close(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def _cached(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            png = self._cache.get(key)
+            if png is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+            return png
+
+    def _remember(self, key: str, png: bytes):
+        with self._lock:
+            self.rendered += 1
+            if len(png) > self.cache_max_bytes or key in self._cache:
+                return
+            self._cache[key] = png
+            self._cache_bytes += len(png)
+            while self._cache_bytes > self.cache_max_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cache_bytes -= len(evicted)
+
+    def _failed(self, timed_out: bool = False):
+        with self._lock:
+            self.failures += 1
+            if timed_out:
+                self.timeouts += 1
+
+    def rasterize(self, svg_data: bytes) -> bytes:
+        """Render one SVG to PNG, blocking the calling thread (not the event loop's)"""
+        result = self.rasterize_many([svg_data])[0]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def rasterize_many(self, documents: List[bytes]) -> List[Union[bytes, Exception]]:
+        """Render several SVGs in parallel; failed ones are returned as exceptions (blocking)"""
+        keys = [hashlib.sha256(svg_data).hexdigest() for svg_data in documents]
+        results: List[Union[bytes, Exception, None]] = [self._cached(key) for key in keys]
+        if self.workers <= 0:
+            for position, svg_data in enumerate(documents):
+                if results[position] is None:
+                    results[position] = self._render_inline(keys[position], svg_data)
+            return results
+
+        pending = [position for position, result in enumerate(results) if result is None]
+        if not pending:
+            return results
+        try:
+            pool = self._get_pool()
+            futures = {position: pool.submit(self.render, documents[position]) for position in pending}
+        except Exception as e:
+            # The pool could not start workers; fail these documents, not the caller
+            for position in pending:
+                self._failed()
+                results[position] = e
+            return results
+
+        retried = set()
+        index = 0
+        while index < len(pending):
+            position = pending[index]
+            try:
+                png = futures[position].result(timeout=self.timeout)
+            except concurrent.futures.TimeoutError:
+                self._failed(timed_out=True)
+                results[position] = SVGTimeoutError(f"SVG rendering exceeded {self.timeout}s")
+                # Only the stuck document fails; the ones queued behind it go to a fresh pool
+                pool = self._replace_pool(pool, futures, documents, pending[index + 1:])
+            except BrokenProcessPool as e:
+                # Killed by the memory limit or along with its pool; retried once
+                if position not in retried:
+                    retried.add(position)
+                    pool = self._replace_pool(pool, futures, documents, pending[index:])
+                    continue
+                self._failed()
+                results[position] = e
+            except Exception as e:
+                self._failed()
+                results[position] = e
+            else:
+                self._remember(keys[position], png)
+                results[position] = png
+            index += 1
+        return results
+
+    def _replace_pool(self, pool, futures, documents, positions):
+        """Recycle ``pool`` and resubmit the documents at ``positions`` it lost to a fresh one"""
+        self._recycle(pool)
+        lost = [position for position in positions if _lost(futures[position])]
+        if not lost:
+            return pool
+        try:
+            pool = self._get_pool()
+            for position in lost:
+                futures[position] = pool.submit(self.render, documents[position])
+        except Exception:
+            pass  # Futures left cancelled or broken fail when waited on
+        return pool
+
+    def _render_inline(self, key: str, svg_data: bytes) -> Union[bytes, Exception]:
+        try:
+            png = self.render(svg_data)
+        except Exception as e:
+            self._failed()
+            return e
+        self._remember(key, png)
+        return png
+
+    async def rasterize_async(self, svg_data: bytes) -> bytes:
+        """Render one SVG to PNG without blocking the event loop"""
+        return await asyncio.to_thread(self.rasterize, svg_data)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "rendered": self.rendered,
+                "cache_hits": self.cache_hits,
+                "cache_entries": len(self._cache),
+                "timeouts": self.timeouts,
+                "failures": self.failures,
+            }
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark page charset handling on a corpus of mixed-encoding fixture pages.
+
+Every fixture is fed through ``PageDecoder`` in 64 KB chunks, as fetch_page
+does, and compared with two ways of turning a body into text:
+
+- header: decode with the Content-Type charset, UTF-8 without one (what
+  aiohttp's ``text()`` did), then re-encode as UTF-8
+- detect: statistical detection over the whole body with charset_normalizer
+  (what ``requests``' ``apparent_encoding`` does), then decode and re-encode;
+  skipped if charset_normalizer is not installed
+
+A result is "ok" when the UTF-8 it produced decodes to the page's text.
+
+Usage:
+    python benchmarks/bench_charset.py [--size 2] [--repeat 3]
+"""
+
+import argparse
+import codecs
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from page_stream import PageDecoder, response_charset  # noqa: E402
+
+try:
+    from charset_normalizer import from_bytes
+except ImportError:  # pragma: no cover - depends on the environment
+    from_bytes = None
+
+CHUNK_SIZE = 64 * 1024
+
+WORDS = {
+    'latin': ['café', 'naïve', 'über', 'façade', 'señor', 'crème', 'brûlée', 'product', 'news', 'sale'],
+    'japanese': ['日本語', 'ページ', '商品', 'ニュース', 'カテゴリ', '東京', 'セール', 'について'],
+    'chinese': ['中文', '网页', '商品', '新闻', '分类', '北京', '促销', '关于'],
+    'cyrillic': ['Русский', 'текст', 'товар', 'новости', 'категория', 'Москва', 'скидка', 'о нас'],
+}
+
+# (name, words, codec, Content-Type header, declaration in the page, byte order mark)
+CORPUS = [
+    ('utf-8 header', 'latin', 'utf-8', 'text/html; charset=utf-8', '', b''),
+    ('utf-8 meta', 'japanese', 'utf-8', 'text/html', '<meta charset="utf-8">', b''),
+    ('utf-8 undeclared', 'cyrillic', 'utf-8', 'text/html', '', b''),
+    ('utf-8 bom', 'chinese', 'utf-8', 'text/html; charset=iso-8859-1', '', codecs.BOM_UTF8),
+    ('utf-16 bom', 'japanese', 'utf-16-le', 'text/html', '', codecs.BOM_UTF16_LE),
+    ('windows-1252 header', 'latin', 'cp1252', 'text/html; charset=ISO-8859-1', '', b''),
+    ('windows-1252 undeclared', 'latin', 'cp1252', 'text/html', '', b''),
+    ('shift_jis meta', 'japanese', 'cp932', 'text/html', '<meta charset="Shift_JIS">', b''),
+    ('gbk http-equiv', 'chinese', 'gbk', 'text/html',
+     '<meta http-equiv="Content-Type" content="text/html; charset=gb2312">', b''),
+    ('koi8-r meta', 'cyrillic', 'koi8_r', 'text/html', '<meta charset="koi8-r">', b''),
+]
+
+
+def build_fixture(words, declaration, size_mb, seed=42):
+    """Build a page of roughly ``size_mb`` megabytes of text in ``words``"""
+    rng = random.Random(seed)
+    parts = [f'<!DOCTYPE html><html><head>{declaration}<title>{words[0]}</title></head><body>']
+    target = size_mb * 1024 * 1024
+    size = len(parts[0])
+    i = 0
+    while size < target:
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(2, 8)))
+        block = f'<div class="card"><a href="/item/{i}" title="{text}">{text}</a><p>{text} {text}</p></div>\n'
+        parts.append(block)
+        size += len(block)
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def decode_streamed(body, content_type):
+    decoder = PageDecoder(None, content_type, max_bytes=len(body) + 1, step=CHUNK_SIZE)
+    pieces = []
+    for start in range(0, len(body), CHUNK_SIZE):
+        pieces.extend(decoder.feed(body[start:start + CHUNK_SIZE]))
+    pieces.append(decoder.close())
+    return b''.join(pieces)
+
+
+def decode_header(body, content_type):
+    return body.decode(response_charset(content_type) or 'utf-8', errors='replace').encode('utf-8')
+
+
+def decode_detected(body, content_type):
+    best = from_bytes(body).best()
+    return body.decode(best.encoding if best else 'utf-8', errors='replace').encode('utf-8')
+
+
+def measure(method, body, content_type, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = method(body, content_type)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', type=int, default=2, help='Fixture size in MB')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    args = parser.parse_args()
+
+    methods = [('decoder', decode_streamed), ('header', decode_header)]
+    if from_bytes is not None:
+        methods.append(('detect', decode_detected))
+    else:
+        print("charset_normalizer not installed; skipping full-body detection")
+
+    print(f"{'fixture':<24} " + ' '.join(f"{name + ' MB/s':>13} {'ok':>3}" for name, _ in methods))
+    totals = {name: [0.0, 0] for name, _ in methods}
+    for name, words, codec, content_type, declaration, bom in CORPUS:
+        html = build_fixture(WORDS[words], declaration, args.size)
+        body = bom + html.encode(codec)
+        megabytes = len(body) / (1024 * 1024)
+        row = f"{name:<24} "
+        for method_name, method in methods:
+            best, result = measure(method, body, content_type, args.repeat)
+            ok = result.decode('utf-8', errors='replace') == html
+            totals[method_name][0] += best
+            totals[method_name][1] += ok
+            row += f"{megabytes / best:>13.1f} {'yes' if ok else 'no':>3} "
+        print(row.rstrip())
+
+    print(f"{'total':<24} " + ' '.join(
+        f"{args.size * len(CORPUS) / seconds:>13.1f} {f'{ok}/{len(CORPUS)}':>3}" for seconds, ok in totals.values()
+    ))
+
+
+if __name__ == '__main__':
+    main()
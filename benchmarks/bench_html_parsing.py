@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark the HTML extraction backends on large synthetic fixture pages.
+
+Compares the lxml pull parser, the stdlib streaming tokenizer and the
+BeautifulSoup fallback on pages of increasing size. Each measurement runs in
+a fresh subprocess so the reported peak RSS belongs to that backend alone.
+
+Usage:
+    python benchmarks/bench_html_parsing.py [--sizes 1,5,10] [--repeat 3]
+"""
+
+import argparse
+import os
+import random
+import resource
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from html_parsing import LXML_AVAILABLE, extract_page  # noqa: E402
+
+
+def build_fixture(size_mb, seed=42):
+    """Build a realistic-looking page of roughly ``size_mb`` megabytes"""
+    rng = random.Random(seed)
+    words = ['lorem', 'ipsum', 'dolor', 'sit', 'amet', 'product', 'category', 'sale', 'news', 'about']
+    parts = ['<!DOCTYPE html><html><head><title>Fixture page</title>',
+             '<style>.card{margin:0}</style><script>var tracking = {"id": 1};</script></head><body>']
+    target = size_mb * 1024 * 1024
+    size = sum(len(p) for p in parts)
+    i = 0
+    while size < target:
+        text = ' '.join(rng.choice(words) for _ in range(rng.randint(2, 8)))
+        block = (
+            f'<div class="card" id="c{i}"><h2>{text}</h2>'
+            f'<a href="/item/{i}?ref=list&amp;page={i % 50}" title="{text}" rel="nofollow">'
+            f'<span>{text}</span> <b>#{i}</b></a>'
+            f'<img src="/img/{i}.jpg" srcset="/img/{i}@2x.jpg 2x" alt="{text}" loading="lazy">'
+            f'<p>{text} {text} <a href="https://cdn{i % 7}.example.com/x/{i}">mirror</a></p></div>\n'
+        )
+        parts.append(block)
+        size += len(block)
+        i += 1
+    parts.append('</body></html>')
+    return ''.join(parts)
+
+
+def run_single(backend, size_mb, repeat):
+    """Measure one backend in this process and print a result line"""
+    html = build_fixture(size_mb)
+    baseline_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = extract_page(html, backend)
+        timings.append(time.perf_counter() - start)
+        anchors = len(result['anchors'])
+        del result
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(f"{backend}\t{size_mb}\t{min(timings):.3f}\t{(peak_rss - baseline_rss) / 1024:.1f}\t{anchors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', default='1,5,10', help='Fixture sizes in MB (comma separated)')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is reported)')
+    parser.add_argument('--single', nargs=2, metavar=('BACKEND', 'SIZE_MB'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        run_single(args.single[0], int(args.single[1]), args.repeat)
+        return
+
+    backends = (['lxml'] if LXML_AVAILABLE else []) + ['stream', 'bs4']
+    print(f"{'backend':<8} {'size':>6} {'best (s)':>9} {'MB/s':>7} {'peak RSS +MB':>13} {'anchors':>8}")
+    for size_mb in (int(s) for s in args.sizes.split(',')):
+        for backend in backends:
+            out = subprocess.run(
+                [sys.executable, __file__, '--single', backend, str(size_mb), '--repeat', str(args.repeat)],
+                capture_output=True, text=True, check=True
+            ).stdout.strip()
+            name, size, best, rss, anchors = out.split('\t')
+            print(f"{name:<8} {size + 'MB':>6} {float(best):>9.3f} {size_mb / float(best):>7.1f} "
+                  f"{float(rss):>13.1f} {anchors:>8}")
+
+
+if __name__ == '__main__':
+    main()
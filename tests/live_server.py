@@ -0,0 +1,21 @@
+"""
+Helpers shared by the test scripts that run against a live backend.
+"""
+
+import time
+
+import requests
+
+
+def wait_for_scrape(base_url, data, timeout=300):
+    """Poll the session status until the queued scrape job finishes"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        status = requests.get(f"{base_url}{data['status_url']}").json()
+        if status.get("status") == "done":
+            data.update(status.get("result") or {})
+            return data
+        if status.get("status") == "failed":
+            assert False, f"Scraping job failed: {status.get('error')}"
+        time.sleep(1)
+    assert False, f"Scraping job did not finish within {timeout}s"
@@ -0,0 +1,78 @@
+import io
+import os
+import zipfile
+
+from backend.archives import archive_key, archive_key_for, iter_zip, iter_zip_cached, prune_archive_cache
+
+
+def test_iter_zip_streams_valid_archive(tmp_path):
+    """Test that the chunked output is a valid ZIP with the original contents"""
+    photo = tmp_path / "image_0.jpg"
+    photo.write_bytes(b"\xff\xd8" + bytes(range(256)) * 1000)
+    drawing = tmp_path / "image_1.svg"
+    drawing.write_text("<svg>" + "<g/>" * 5000 + "</svg>")
+
+    chunks = list(iter_zip([(str(photo), photo.name), (str(drawing), drawing.name)], chunk_size=4096))
+    assert len(chunks) > 2
+
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    assert archive.read("image_0.jpg") == photo.read_bytes()
+    assert archive.read("image_1.svg") == drawing.read_bytes()
+
+
+def test_iter_zip_stores_compressed_formats(tmp_path):
+    """Test that JPEG/PNG are stored as-is while text formats are deflated"""
+    (tmp_path / "a.png").write_bytes(b"png" * 100)
+    (tmp_path / "b.svg").write_bytes(b"svg" * 100)
+
+    data = b"".join(iter_zip([(str(tmp_path / "a.png"), "a.png"), (str(tmp_path / "b.svg"), "b.svg")]))
+    types = {info.filename: info.compress_type for info in zipfile.ZipFile(io.BytesIO(data)).infolist()}
+    assert types == {"a.png": zipfile.ZIP_STORED, "b.svg": zipfile.ZIP_DEFLATED}
+
+
+def test_iter_zip_cached_writes_cache_once_complete(tmp_path):
+    """Test that the streamed bytes are cached and an aborted stream leaves no file"""
+    image = tmp_path / "a.png"
+    image.write_bytes(b"png" * 50000)
+    entries = [(str(image), "a.png")]
+    cache_path = tmp_path / "cache.zip"
+
+    stream = iter_zip_cached(entries, str(cache_path), chunk_size=1024)
+    next(stream)
+    stream.close()
+    assert list(tmp_path.iterdir()) == [image]
+
+    data = b"".join(iter_zip_cached(entries, str(cache_path)))
+    assert cache_path.read_bytes() == data
+
+
+def test_archive_key_changes_with_contents(tmp_path):
+    image = tmp_path / "a.png"
+    image.write_bytes(b"one")
+    entries = [(str(image), "a.png")]
+    key = archive_key(entries)
+    assert archive_key(entries) == key
+
+    image.write_bytes(b"three")
+    assert archive_key(entries) != key
+
+
+def test_archive_key_for_uses_given_versions():
+    key = archive_key_for([("a.png", 3, "hash-1")])
+    assert archive_key_for([("a.png", 3, "hash-1")]) == key
+    assert archive_key_for([("a.png", 3, "hash-2")]) != key
+    assert archive_key_for([("a.png", 3, "hash-1"), ("b.png", 1, "")]) != key
+
+
+def test_prune_archive_cache_tolerates_concurrent_removal(tmp_path, monkeypatch):
+    """Test that stale archives are removed, even if another download removed one first"""
+    cache_dir = tmp_path / ".archives"
+    cache_dir.mkdir()
+    for name in ("images_old.zip", "images_new.zip", "notes.txt"):
+        (cache_dir / name).write_bytes(b"x")
+
+    listdir = os.listdir
+    monkeypatch.setattr(os, "listdir", lambda path: listdir(path) + ["images_gone.zip"])
+    prune_archive_cache(str(cache_dir), "images_new.zip")
+    assert sorted(listdir(cache_dir)) == ["images_new.zip", "notes.txt"]
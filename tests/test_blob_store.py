@@ -0,0 +1,72 @@
+import os
+
+from backend.blob_store import BlobStore
+
+
+def make_store(tmp_path):
+    store = BlobStore(str(tmp_path / ".blobs"))
+    store.ensure()
+    for session_id in ("s1", "s2"):
+        (tmp_path / session_id).mkdir()
+    return store
+
+
+def test_identical_content_is_stored_once(tmp_path):
+    """Test that the same image in two sessions shares one blob"""
+    store = make_store(tmp_path)
+    assert store.put_bytes(b"logo", str(tmp_path / "s1" / "image_0.png"), "s1") is False
+    assert store.put_bytes(b"logo", str(tmp_path / "s2" / "image_3.png"), "s2") is True
+    assert store.put_bytes(b"other", str(tmp_path / "s2" / "image_4.png"), "s2") is False
+
+    assert (tmp_path / "s2" / "image_3.png").read_bytes() == b"logo"
+    assert os.path.samefile(tmp_path / "s1" / "image_0.png", tmp_path / "s2" / "image_3.png")
+    assert store.stats()["blobs"] == 2
+    assert os.listdir(store.tmp_dir) == []
+
+
+def test_release_session_drops_unreferenced_blobs(tmp_path):
+    """Test that blobs are deleted only once the last session linking them is gone"""
+    store = make_store(tmp_path)
+    store.put_bytes(b"shared", str(tmp_path / "s1" / "image_0.png"), "s1")
+    store.put_bytes(b"shared", str(tmp_path / "s2" / "image_0.png"), "s2")
+    store.put_bytes(b"only-s1", str(tmp_path / "s1" / "image_1.png"), "s1")
+
+    for path in (tmp_path / "s1").iterdir():
+        path.unlink()
+    assert store.release_session("s1") == len(b"only-s1")
+    assert store.stats()["blobs"] == 1
+
+    (tmp_path / "s2" / "image_0.png").unlink()
+    assert store.release_session("s2") == len(b"shared")
+    assert store.stats()["blobs"] == 0
+    assert store.release_session("s2") == 0
+
+
+def test_disabled_store_writes_plain_files(tmp_path):
+    store = BlobStore(str(tmp_path / ".blobs"), enabled=False)
+    store.ensure()
+    dest = tmp_path / "image_0.png"
+    assert store.put_bytes(b"data", str(dest), "s1") is False
+    assert dest.read_bytes() == b"data"
+    assert os.stat(dest).st_nlink == 1
+
+
+def test_stats_are_running_totals(tmp_path):
+    """Test that stats follow stores and releases and are recounted when the store is reopened"""
+    store = make_store(tmp_path)
+    store.put_bytes(b"shared", str(tmp_path / "s1" / "image_0.png"), "s1")
+    store.put_bytes(b"shared", str(tmp_path / "s2" / "image_0.png"), "s2")
+    store.put_bytes(b"only-s1", str(tmp_path / "s1" / "image_1.png"), "s1")
+    stats = store.stats()
+    assert (stats["blobs"], stats["session_references"]) == (2, 3)
+    assert store._size == len(b"shared") + len(b"only-s1")
+
+    reopened = BlobStore(store.root)
+    reopened.ensure()
+    assert reopened.stats() == stats
+    assert reopened._size == store._size
+
+    for path in (tmp_path / "s1").iterdir():
+        path.unlink()
+    store.release_session("s1")
+    assert (store.stats()["blobs"], store.stats()["session_references"], store._size) == (1, 1, len(b"shared"))
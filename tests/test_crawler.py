@@ -0,0 +1,95 @@
+import asyncio
+import pytest
+from backend.crawler import CrawlFrontier, SCOPE_HOST, SCOPE_ANY
+from backend.link_normalizer import canonical_url
+
+SITE = {
+    "https://www.example.com/": ["https://www.example.com/a", "https://blog.example.com/", "https://other.org/"],
+    "https://www.example.com/a": ["https://www.example.com/b", "https://www.example.com/", "https://www.example.com/file.pdf"],
+    "https://www.example.com/b": ["https://www.example.com/c"],
+    "https://blog.example.com/": ["https://blog.example.com/post"],
+}
+
+
+def crawl(frontier, site=SITE):
+    visited = []
+
+    async def handler(url, depth):
+        visited.append((url, depth))
+        if url not in site:
+            raise Exception("404")
+        return site[url]
+
+    asyncio.run(frontier.run(handler, concurrency=3))
+    return visited
+
+
+def test_domain_scope_and_depth_limit():
+    """Test that subdomains are followed, other domains and binaries are not"""
+    frontier = CrawlFrontier("https://www.example.com/", max_depth=1, max_pages=50)
+    visited = dict(crawl(frontier))
+    assert visited == {
+        "https://www.example.com/": 0,
+        "https://www.example.com/a": 1,
+        "https://blog.example.com/": 1,
+    }
+    assert frontier.pages_fetched == 3
+
+
+def test_host_scope_dedup_and_errors():
+    """Test exact-host scoping, revisit dedup and error collection"""
+    frontier = CrawlFrontier("https://www.example.com/", max_depth=5, max_pages=50, scope=SCOPE_HOST)
+    visited = [url for url, _ in crawl(frontier)]
+    assert sorted(visited) == sorted([
+        "https://www.example.com/",
+        "https://www.example.com/a",
+        "https://www.example.com/b",
+        "https://www.example.com/c",
+    ])
+    assert [url for url, _ in frontier.errors] == ["https://www.example.com/c"]
+
+
+def test_max_pages_and_patterns():
+    """Test the page budget and include/exclude patterns"""
+    frontier = CrawlFrontier("https://www.example.com/", max_depth=5, max_pages=2, scope=SCOPE_ANY)
+    assert len(crawl(frontier)) == 2
+
+    frontier = CrawlFrontier("https://www.example.com/", max_depth=5, max_pages=50,
+                             include_patterns=[r"www\.example\.com"], exclude_patterns=[r"/b$"])
+    visited = [url for url, _ in crawl(frontier)]
+    assert sorted(visited) == ["https://www.example.com/", "https://www.example.com/a"]
+
+
+def test_seeded_batch_ignores_scope_and_follows_nothing():
+    """Test that batch URLs are all fetched once, whatever their host"""
+    frontier = CrawlFrontier("https://www.example.com/", max_depth=0, max_pages=3, scope=SCOPE_HOST)
+    assert frontier.seed([
+        "https://www.example.com/", "https://other.org/", "https://www.example.com/", "https://www.example.com/a",
+        "https://www.example.com/b",
+    ]) == 3
+    visited = [url for url, _ in crawl(frontier)]
+    assert sorted(visited) == ["https://other.org/", "https://www.example.com/", "https://www.example.com/a"]
+
+
+def test_start_url_shares_dedup_key_with_discovered_links():
+    """Test that a start URL without trailing slash is not fetched again as '/'"""
+    site = {
+        "https://example.com/": ["https://example.com/", "https://example.com/about"],
+        "https://example.com/about": ["https://example.com/"],
+    }
+    frontier = CrawlFrontier("https://Example.com", max_depth=2, max_pages=50, canonicalize=canonical_url)
+    visited = [url for url, _ in crawl(frontier, site)]
+    assert sorted(visited) == ["https://example.com/", "https://example.com/about"]
+
+    frontier = CrawlFrontier("https://example.com", max_depth=0, max_pages=5, scope=SCOPE_ANY,
+                             canonicalize=canonical_url)
+    assert frontier.seed(["https://example.com", "https://example.com:443/", "https://example.com/about"]) == 2
+
+
+def test_invalid_scope():
+    with pytest.raises(ValueError):
+        CrawlFrontier("https://www.example.com/", scope="planet")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -9,6 +9,8 @@ import time
 import os
 from datetime import datetime
 
+from live_server import wait_for_scrape
+
 # Configuration
 BASE_URL = "http://backend:8000"
 TEST_URL = "https://jeevawasa.com"
@@ -32,7 +34,7 @@ def test_scraping_and_download():
             print(f"   Response: {response.text}")
             assert False, f"Scraping failed with status {response.status_code}"
         
-        data = response.json()
+        data = wait_for_scrape(BASE_URL, response.json())
         print(f"✅ Scraping successful!")
         print(f"   Links: {data['links_count']}")
         print(f"   Images: {data['images_count']}")
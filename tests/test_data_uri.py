@@ -0,0 +1,44 @@
+import base64
+import hashlib
+import io
+
+import pytest
+
+from backend.data_uri import DataURIError, decode_to_file, decoded_size, parse_data_uri
+
+
+def make_uri(data, mime="image/png"):
+    return f"data:{mime};base64," + base64.b64encode(data).decode()
+
+
+def test_parse_data_uri():
+    uri = make_uri(b"abc", "image/svg+xml")
+    assert parse_data_uri(uri) == ("image/svg+xml", uri.index(",") + 1)
+    assert parse_data_uri("data:image/png;charset=utf-8;base64,AAAA")[0] == "image/png"
+    with pytest.raises(DataURIError):
+        parse_data_uri("data:image/svg+xml;utf8,<svg/>")
+
+
+@pytest.mark.parametrize("length", [0, 1, 2, 3, 100, 4097])
+def test_decoded_size_is_exact_for_unwrapped_payloads(length):
+    uri = make_uri(bytes(length))
+    assert decoded_size(uri, parse_data_uri(uri)[1]) == length
+
+
+def test_decode_in_chunks_matches_b64decode():
+    data = bytes(range(256)) * 50
+    encoded = base64.b64encode(data).decode()
+    # Line-wrapped payload: whitespace shifts the 4-character groups across chunks
+    uri = "data:image/png;base64," + "\n".join(encoded[i:i + 76] for i in range(0, len(encoded), 76))
+    target = io.BytesIO()
+    size, digest = decode_to_file(uri, parse_data_uri(uri)[1], target, chunk_chars=1000)
+    assert target.getvalue() == data
+    assert (size, digest) == (len(data), hashlib.sha256(data).hexdigest())
+
+
+def test_oversize_payload_is_rejected_before_decoding():
+    uri = make_uri(bytes(5000))
+    target = io.BytesIO()
+    with pytest.raises(DataURIError):
+        decode_to_file(uri, parse_data_uri(uri)[1], target, max_size=4096)
+    assert target.getvalue() == b""
@@ -0,0 +1,126 @@
+import gzip
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from backend.exporters import (
+    PARQUET_AVAILABLE, ChangeReportWriter, LinkCSVWriter, convert_links, create_link_writer, detect_format,
+    iter_link_batches
+)
+
+LINKS = [
+    {'url': 'https://a.com/x', 'text': 'He said "hi"', 'title': '', 'target': '_blank', 'rel': 'nofollow'},
+    {'url': 'https://b.com/ü?q=1', 'text': 'multi\nline', 'title': 't', 'target': '', 'rel': ''},
+]
+
+
+def test_link_csv_matches_previous_format(tmp_path):
+    """Test that rows are written with BOM, full quoting and the original columns"""
+    path = tmp_path / "links.csv"
+    with LinkCSVWriter(str(path)) as writer:
+        writer.write_rows([{'url': 'https://a.com/x', 'text': 'He said "hi"', 'title': '', 'target': '_blank', 'rel': 'nofollow'}])
+        writer.write_rows([{'url': 'https://a.com/ü', 'text': 'ü', 'title': 't', 'target': '', 'rel': ''}])
+
+    nl = os.linesep.encode()
+    assert path.read_bytes() == (
+        b'\xef\xbb\xbf"url","text","title","target","rel"' + nl
+        + b'"https://a.com/x","He said ""hi""","","_blank","nofollow"' + nl
+        + '"https://a.com/ü","ü","t","",""'.encode() + nl
+    )
+    assert writer.rows_written == 2
+
+
+def test_link_csv_empty_has_header(tmp_path):
+    """Test that a file without links still has the header row"""
+    path = tmp_path / "links.csv"
+    writer = LinkCSVWriter(str(path))
+    writer.close()
+    assert writer.size == len(b'\xef\xbb\xbf"url","text","title","target","rel"' + os.linesep.encode())
+    assert writer.rows_written == 0
+
+
+def test_csv_gz_decompresses_to_csv(tmp_path):
+    """Test that the gzip export holds exactly the plain CSV bytes"""
+    for fmt in ('csv', 'csv.gz'):
+        with create_link_writer(str(tmp_path / f"links.{fmt}"), fmt) as writer:
+            writer.write_rows(LINKS)
+    assert gzip.decompress((tmp_path / "links.csv.gz").read_bytes()) == (tmp_path / "links.csv").read_bytes()
+
+
+def test_jsonl_writes_one_object_per_link(tmp_path):
+    path = tmp_path / "links.jsonl"
+    with create_link_writer(str(path), 'jsonl') as writer:
+        writer.write_rows(LINKS)
+    assert [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()] == LINKS
+
+
+@pytest.mark.parametrize("fmt", ['csv', 'csv.gz', 'jsonl', 'parquet'])
+def test_convert_round_trip(tmp_path, fmt):
+    """Test that every format converts from the CSV export and back without changing the data"""
+    if fmt == 'parquet' and not PARQUET_AVAILABLE:
+        pytest.skip("pyarrow not installed")
+    source = tmp_path / "links_s.csv"
+    with create_link_writer(str(source), 'csv') as writer:
+        writer.write_rows(LINKS)
+
+    target = tmp_path / f"links_s.{fmt}"
+    if fmt != 'csv':
+        assert convert_links(str(source), 'csv', str(target), fmt) == len(LINKS)
+    rows = [row for batch in iter_link_batches(str(target), fmt, batch_rows=1) for row in batch]
+    assert rows == LINKS
+    assert sorted(os.listdir(tmp_path)) == sorted({source.name, target.name})
+
+
+def test_concurrent_conversions_of_one_export(tmp_path):
+    """Test that simultaneous conversions to the same target don't share a temporary file"""
+    source = tmp_path / "links_s.csv"
+    with create_link_writer(str(source), 'csv') as writer:
+        writer.write_rows(LINKS * 5000)
+    target = tmp_path / "links_s.jsonl"
+
+    with ThreadPoolExecutor(8) as pool:
+        counts = list(pool.map(lambda _: convert_links(str(source), 'csv', str(target), 'jsonl'), range(8)))
+    assert counts == [len(LINKS) * 5000] * 8
+    assert sum(len(batch) for batch in iter_link_batches(str(target), 'jsonl')) == len(LINKS) * 5000
+    assert sorted(os.listdir(tmp_path)) == [source.name, target.name]
+
+
+@pytest.mark.skipif(not PARQUET_AVAILABLE, reason="pyarrow not installed")
+def test_parquet_domain_column_is_dictionary_encoded(tmp_path):
+    import pyarrow.parquet as pq
+
+    path = tmp_path / "links.parquet"
+    with create_link_writer(str(path), 'parquet') as writer:
+        writer.write_rows(LINKS)
+    table = pq.read_table(str(path))
+    assert table.column('domain').to_pylist() == ['a.com', 'b.com']
+    assert 'RLE_DICTIONARY' in pq.ParquetFile(str(path)).metadata.row_group(0).column(5).encodings
+
+
+@pytest.mark.parametrize("filename, expected", [
+    ("links_abc.csv", 'csv'),
+    ("links_abc.csv.gz", 'csv.gz'),
+    ("links_abc.jsonl", 'jsonl'),
+    ("links_abc.parquet", 'parquet'),
+    ("links_abc.csv.gz.part", None),
+    ("image_0.png", None),
+])
+def test_detect_format(filename, expected):
+    assert detect_format(filename) == expected
+
+
+def test_change_report_keeps_fixed_columns(tmp_path):
+    path = tmp_path / "changes.jsonl"
+    writer = ChangeReportWriter(str(path))
+    writer.write_many([
+        {'page': 'https://a.com/', 'change': 'added', 'url': 'https://a.com/x', 'text': 'x', 'title': '', 'rel': ''},
+        {'page': 'https://a.com/', 'change': 'removed', 'url': 'https://a.com/y'},
+    ])
+    writer.write_many([])
+    writer.close()
+    rows = [json.loads(line) for line in path.read_text().splitlines()]
+    assert rows[1] == {'page': 'https://a.com/', 'change': 'removed', 'url': 'https://a.com/y', 'text': None, 'title': None}
+    assert list(rows[0]) == ['page', 'change', 'url', 'text', 'title']
+    assert writer.rows_written == 2
@@ -0,0 +1,74 @@
+import pytest
+from backend.html_parsing import LXML_AVAILABLE, create_extractor, extract_page, extract_page_file
+
+FAST_BACKENDS = ['stream'] + (['lxml'] if LXML_AVAILABLE else [])
+
+PAGE = """<!DOCTYPE html><html><head><title>Shop &amp; More</title></head><body>
+<a href="/a" rel="nofollow  noopener" title="First"><b>Bold <i>italic</i></b> tail<script>var x = 1;</script> end</a>
+<a name="anchor-without-href">skip me</a>
+<a href="/b?x=1&amp;y=2" target="_blank"><img src="/inner.png" alt="Inner"></a>
+<img alt="no source"><img src="data:image/png;base64,AAAA" data-src="/lazy.png">
+<p>text <a href="">empty href</a></p>
+</body></html>"""
+
+
+@pytest.mark.parametrize("backend", FAST_BACKENDS)
+def test_fast_backends_match_beautifulsoup(backend):
+    """Test that streaming backends produce exactly what BeautifulSoup produces"""
+    expected = extract_page(PAGE, 'bs4')
+    assert extract_page(PAGE, backend) == expected
+    assert expected['title'] == 'Shop & More'
+    assert expected['anchor_count'] == 4
+    assert expected['anchors'][0] == {
+        'href': '/a', 'text': 'Bolditalictailend', 'title': 'First',
+        'target': '', 'rel': 'nofollow noopener', 'alt': ''
+    }
+    assert [img.get('src') for img in expected['images']] == ['/inner.png', None, 'data:image/png;base64,AAAA']
+
+
+@pytest.mark.parametrize("backend", FAST_BACKENDS)
+def test_incremental_feed(backend):
+    """Test that feeding the page in small chunks gives the same result"""
+    extractor = create_extractor(backend)
+    for i in range(0, len(PAGE), 7):
+        extractor.feed(PAGE[i:i + 7])
+    assert extractor.result() == extract_page(PAGE, 'bs4')
+
+
+@pytest.mark.parametrize("backend", FAST_BACKENDS + ['bs4'])
+def test_extract_page_file_matches_in_memory(tmp_path, backend, monkeypatch):
+    """Test that a spooled page read in slices gives the same result"""
+    monkeypatch.setattr("backend.html_parsing.FEED_CHUNK_SIZE", 16)
+    path = tmp_path / "page.html"
+    path.write_bytes(PAGE.encode('utf-8'))
+    assert extract_page_file(str(path), backend) == extract_page(PAGE, 'bs4')
+
+
+RESPONSIVE_PAGE = """<html><body>
+<div style="color: red; background-image: url('/hero.jpg')">hero</div>
+<picture>
+  <source srcset="/a.avif" type="image/avif">
+  <source srcset="/a-400.webp 400w, /a-800.webp 800w" type="image/webp">
+  <img src="/a.jpg" alt="A">
+</picture>
+<img src="/b.jpg"><span style='background: #fff url("/c.png") no-repeat'></span>
+</body></html>"""
+
+
+@pytest.mark.parametrize("backend", FAST_BACKENDS)
+def test_picture_sources_and_backgrounds(backend):
+    """Test that <picture> sources and inline background images are collected like BeautifulSoup does"""
+    expected = extract_page(RESPONSIVE_PAGE, 'bs4')
+    assert extract_page(RESPONSIVE_PAGE, backend) == expected
+    assert [source['srcset'] for source in expected['picture_sources'][0]] == ['/a.avif', '/a-400.webp 400w, /a-800.webp 800w']
+    assert 1 not in expected['picture_sources']
+    assert expected['backgrounds'] == ['/hero.jpg', '/c.png']
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError):
+        extract_page(PAGE, 'regex')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
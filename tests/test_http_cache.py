@@ -0,0 +1,67 @@
+from backend.http_cache import HTTPCache
+
+
+def store_body(cache, tmp_path, url, headers, body, digest=None):
+    """Store a response the way fetches do: from a file holding the body"""
+    source = tmp_path / f"body_{HTTPCache.key_for(url)}"
+    source.write_bytes(body)
+    cache.store(url, headers, source_path=str(source), digest=digest)
+
+
+def read_body(entry):
+    with open(entry["body_path"], "rb") as body_file:
+        return body_file.read()
+
+
+def test_store_and_revalidate(tmp_path):
+    """Test that validators are stored and sent back as conditional headers"""
+    cache = HTTPCache(str(tmp_path / "cache"), max_bytes=1024)
+    cache.load()
+    store_body(cache, tmp_path, "https://a.com/", {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+                                                   "Content-Type": "text/html"}, b"<html></html>")
+
+    entry = cache.lookup("https://a.com/")
+    assert read_body(entry) == b"<html></html>"
+    assert cache.validators(entry) == {"If-None-Match": '"v1"', "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT"}
+
+    cache.refresh("https://a.com/", {"ETag": '"v2"'})
+    assert cache.lookup("https://a.com/")["etag"] == '"v2"'
+    assert cache.stats()["revalidated"] == 1
+
+
+def test_responses_without_validators_are_not_cached(tmp_path):
+    cache = HTTPCache(str(tmp_path / "cache"), max_bytes=1024)
+    store_body(cache, tmp_path, "https://a.com/1", {"Content-Type": "text/html"}, b"x")
+    store_body(cache, tmp_path, "https://a.com/2", {"ETag": '"x"', "Cache-Control": "no-store"}, b"x")
+    assert cache.lookup("https://a.com/1") is None
+    assert cache.lookup("https://a.com/2") is None
+    assert cache.validators(None) == {}
+
+
+def test_lru_eviction_and_reload(tmp_path):
+    """Test that the least recently used entries are evicted and the index survives a restart"""
+    evicted = []
+    cache = HTTPCache(str(tmp_path / "cache"), max_bytes=10, on_evict=lambda meta: evicted.append(meta["url"]))
+    store_body(cache, tmp_path, "https://a.com/1", {"ETag": '"1"'}, b"aaaa")
+    store_body(cache, tmp_path, "https://a.com/2", {"ETag": '"2"'}, b"bbbb")
+    cache.lookup("https://a.com/1")
+    store_body(cache, tmp_path, "https://a.com/3", {"ETag": '"3"'}, b"cccc")
+
+    assert evicted == ["https://a.com/2"]
+    assert cache.lookup("https://a.com/2") is None
+
+    reloaded = HTTPCache(str(tmp_path / "cache"), max_bytes=10)
+    reloaded.load()
+    assert reloaded.stats()["entries"] == 2
+    assert read_body(reloaded.lookup("https://a.com/3")) == b"cccc"
+
+
+def test_store_links_source_file(tmp_path):
+    source = tmp_path / "image_0.png"
+    source.write_bytes(b"png")
+    cache = HTTPCache(str(tmp_path / "cache"), max_bytes=1024)
+    cache.store("https://a.com/i.png", {"ETag": '"i"', "Content-Type": "image/png"}, source_path=str(source), digest="d")
+
+    entry = cache.lookup("https://a.com/i.png")
+    assert entry["digest"] == "d"
+    assert (tmp_path / "image_0.png").stat().st_nlink == 2
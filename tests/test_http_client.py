@@ -0,0 +1,41 @@
+import asyncio
+import pytest
+from backend.http_client import SharedHTTPClient
+
+
+def make_client():
+    return SharedHTTPClient(limit=20, limit_per_host=2, dns_cache_ttl=60, keepalive_timeout=15)
+
+
+def test_acquire_reuses_shared_session():
+    """Test that every acquire on the owning loop yields the same pooled session"""
+    async def scenario():
+        client = make_client()
+        await client.start()
+        try:
+            async with client.acquire() as first:
+                async with client.acquire() as second:
+                    assert first is second is client.session
+                    assert first.connector.limit_per_host == 2
+        finally:
+            await client.close()
+        assert not client.started
+
+    asyncio.run(scenario())
+
+
+def test_acquire_without_start_uses_temporary_session():
+    """Test that fetch paths still work before the lifespan handler has run"""
+    async def scenario():
+        client = make_client()
+        async with client.acquire() as session:
+            assert not session.closed
+        assert session.closed
+        with pytest.raises(RuntimeError):
+            client.session
+
+    asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,69 @@
+import pytest
+
+from backend.image_discovery import choose_candidate, discover_images, parse_srcset
+
+
+def resolve(url):
+    return "https://example.com" + url if url.startswith("/") else url
+
+
+def page(images, picture_sources=None, backgrounds=None):
+    return {"images": images, "picture_sources": picture_sources or {}, "backgrounds": backgrounds or []}
+
+
+def test_parse_srcset():
+    assert parse_srcset("/a.jpg 1x, /a@2x.jpg 2x") == [("/a.jpg", 1.0, "x"), ("/a@2x.jpg", 2.0, "x")]
+    assert parse_srcset("/img,w_400.jpg 400w,/img,w_800.jpg 800w") == [
+        ("/img,w_400.jpg", 400.0, "w"), ("/img,w_800.jpg", 800.0, "w")
+    ]
+    assert parse_srcset("/plain.jpg") == [("/plain.jpg", 1.0, "x")]
+    assert parse_srcset("/bad.jpg 2q, /ok.jpg 1.5x") == [("/ok.jpg", 1.5, "x")]
+
+
+@pytest.mark.parametrize("target_width, dpr, expected", [
+    (None, 1.0, "/l.jpg"),
+    (300, 1.0, "/m.jpg"),
+    (300, 2.0, "/l.jpg"),
+    (100, 1.0, "/s.jpg"),
+    (5000, 1.0, "/l.jpg"),
+])
+def test_width_policy(target_width, dpr, expected):
+    candidates = parse_srcset("/s.jpg 200w, /m.jpg 400w, /l.jpg 800w")
+    assert choose_candidate(candidates, target_width, dpr) == expected
+
+
+def test_density_policy():
+    candidates = parse_srcset("/a.jpg, /a@2x.jpg 2x, /a@3x.jpg 3x")
+    assert choose_candidate(candidates) == "/a@3x.jpg"
+    assert choose_candidate(candidates, target_width=100, dpr=2.0) == "/a@2x.jpg"
+
+
+def test_lazy_and_placeholder_sources():
+    """Test that lazy-load attributes win over placeholder src values"""
+    images = [
+        {"src": "data:image/gif;base64,R0lGODlhAQABAAAAACw=", "data-src": "/real.jpg"},
+        {"src": "/spacer.gif", "data-lazy": "/other.jpg"},
+        {"src": "data:image/gif;base64,R0lGODlhAQABAAAAACw=", "srcset": "/x.jpg 1x, /x@2x.jpg 2x"},
+        {"src": "data:image/png;base64,AAAA"},
+    ]
+    assert discover_images(page(images), resolve) == [
+        (0, "https://example.com/real.jpg"),
+        (1, "https://example.com/other.jpg"),
+        (2, "https://example.com/x@2x.jpg"),
+        (3, "data:image/png;base64,AAAA"),
+    ]
+
+
+def test_picture_sources_and_variant_dedup():
+    images = [
+        {"src": "/a.jpg"},
+        {"src": "/a-small.jpg", "srcset": "/a-400.webp 400w, /a-800.webp 800w"},
+        {"src": "/b.jpg"},
+    ]
+    sources = {0: [
+        {"srcset": "/a.avif", "type": "image/avif"},
+        {"srcset": "/a-400.webp 400w, /a-800.webp 800w", "type": "image/webp"},
+    ]}
+    found = discover_images(page(images, sources, ["/bg.png", "/b.jpg"]), resolve, target_width=400)
+    # The second <img> is another rendition of the first; the background repeats /b.jpg
+    assert found == [(0, "https://example.com/a-400.webp"), (2, "https://example.com/b.jpg"), (3, "https://example.com/bg.png")]
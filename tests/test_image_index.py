@@ -0,0 +1,53 @@
+import pytest
+
+from backend.image_index import ImageIndex, is_fingerprinted
+
+
+@pytest.mark.parametrize("url, expected", [
+    ("https://cdn.a.com/static/app.3f9a2c1d8e7b6a50.png", True),
+    ("https://cdn.a.com/img/5d41402abc4b2a76b9719d911017c592/logo.jpg", True),
+    ("https://a.com/logo.png?v=5d41402abc4b2a76", True),
+    ("https://shop.com/products/12345678/main.jpg", False),
+    ("https://a.com/uploads/20231017/banner.png", False),
+    ("https://a.com/uploads/2023101712345678/banner.png", False),
+    ("https://a.com/logo.png?v=20231017", False),
+    ("https://cdn.a.com/static/app.3f9a2c1d.png", False),
+    ("https://a.com/images/logo.png", False),
+    ("https://a.com/photo-2024.jpg", False),
+])
+def test_is_fingerprinted(url, expected):
+    assert is_fingerprinted(url) is expected
+
+
+def test_ttl_policy():
+    """Test that caching hints and fingerprinted URLs decide how long an image is reused"""
+    index = ImageIndex(":memory:", default_ttl=0, fingerprint_ttl=100, max_ttl=1000)
+    assert index.ttl_for("https://a.com/x.png", {"Cache-Control": "public, max-age=31536000, immutable"}) == 1000
+    assert index.ttl_for("https://a.com/x.png", {"Cache-Control": "max-age=60"}) == 60
+    assert index.ttl_for("https://a.com/x.png", {"Cache-Control": "no-cache"}) == 0
+    assert index.ttl_for("https://a.com/x.3f9a2c1d8e7b6a50.png", {}) == 100
+    assert index.ttl_for("https://a.com/x.png", {}) == 0
+
+
+def test_lookup_only_returns_fresh_entries(tmp_path):
+    index = ImageIndex(str(tmp_path / "index.sqlite3"), default_ttl=0)
+    index.open()
+    index.record("https://a.com/x.png", "d1", 10, "image/png", {"Cache-Control": "max-age=3600"})
+    index.record("https://a.com/y.png", "d2", 20, "image/png", {})
+
+    assert index.lookup_fresh("https://a.com/x.png") == {"digest": "d1", "size": 10, "content_type": "image/png"}
+    assert index.lookup_fresh("https://a.com/y.png") is None
+    assert index.stats()["entries"] == 2
+    assert index.stats()["fresh"] == 1
+
+    index.forget("https://a.com/x.png")
+    assert index.lookup_fresh("https://a.com/x.png") is None
+    index.close()
+
+
+def test_disabled_index_is_inert(tmp_path):
+    index = ImageIndex(str(tmp_path / "index.sqlite3"), enabled=False)
+    index.open()
+    index.record("https://a.com/x.png", "d1", 10, "image/png", {"Cache-Control": "immutable"})
+    assert index.lookup_fresh("https://a.com/x.png") is None
+    assert not (tmp_path / "index.sqlite3").exists()
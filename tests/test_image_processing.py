@@ -0,0 +1,79 @@
+import os
+import time
+
+import pytest
+
+from backend.image_processing import PILLOW_AVAILABLE, ImageProcessor, probe_image, transcode_supported
+
+needs_pillow = pytest.mark.skipif(not PILLOW_AVAILABLE, reason="Pillow not installed")
+
+
+def process_or_hang(path, *args):
+    if "stuck" in os.path.basename(path):
+        time.sleep(60)
+    return {"format": "test", "name": os.path.basename(path)}
+
+
+def save_image(path, fmt, size=(640, 480), **params):
+    from PIL import Image
+    Image.new("RGB", size, (200, 30, 30)).save(path, format=fmt, **params)
+    return str(path)
+
+
+@needs_pillow
+@pytest.mark.parametrize("fmt, name", [("PNG", "a.png"), ("GIF", "a.gif"), ("JPEG", "a.jpg"), ("WEBP", "a.webp"), ("BMP", "a.bmp")])
+def test_probe_reads_dimensions_from_header(tmp_path, fmt, name):
+    path = save_image(tmp_path / name, fmt, size=(321, 123))
+    assert probe_image(path) == {"format": fmt.lower(), "width": 321, "height": 123}
+
+
+@needs_pillow
+def test_probe_jpeg_with_large_exif_segment(tmp_path):
+    """Test that the SOF marker is found even after a big APP1 segment"""
+    path = save_image(tmp_path / "exif.jpg", "JPEG", size=(50, 40), exif=b"Exif\x00\x00" + b"\x00" * 60000)
+    assert probe_image(path)["width"] == 50
+
+
+def test_probe_svg(tmp_path):
+    (tmp_path / "a.svg").write_text('<?xml version="1.0"?>\n<svg xmlns="http://www.w3.org/2000/svg" width="24px" height="16"/>')
+    (tmp_path / "b.svg").write_text('<svg viewBox="0 0 100 50" width="100%"></svg>')
+    assert probe_image(str(tmp_path / "a.svg")) == {"format": "svg", "width": 24, "height": 16}
+    assert probe_image(str(tmp_path / "b.svg")) == {"format": "svg", "width": 100, "height": 50}
+
+
+@needs_pillow
+def test_process_session_thumbnails_and_transcodes(tmp_path):
+    from PIL import Image
+
+    save_image(tmp_path / "image_0.bmp", "BMP", size=(1200, 600))
+    (tmp_path / "image_1.svg").write_text('<svg width="10" height="10"></svg>')
+    processor = ImageProcessor(workers=0, thumbnail_size=128, transcode_format="webp" if transcode_supported("webp") else None)
+    results = processor.process_session(str(tmp_path), ["image_0.bmp", "image_1.svg", "missing.png"])
+
+    assert set(results) == {"image_0.bmp", "image_1.svg"}
+    info = results["image_0.bmp"]
+    assert (info["format"], info["width"], info["height"]) == ("bmp", 1200, 600)
+    with Image.open(tmp_path / ".thumbs" / info["thumbnail"]) as thumbnail:
+        assert max(thumbnail.size) == 128
+    if processor.transcode_format:
+        assert info["transcoded"]["size"] < info["size"]
+        assert os.path.exists(info["transcoded"]["path"])
+    assert "thumbnail" not in results["image_1.svg"]
+    assert processor.stats()["failures"] == 1
+
+
+def test_stuck_image_does_not_fail_the_rest_of_the_session(tmp_path):
+    """Test that the images queued behind a timed-out one are processed by a fresh pool"""
+    names = ["image_0_stuck.png", "image_1.png", "image_2.png", "image_3.png"]
+    for name in names:
+        (tmp_path / name).write_bytes(b"not an image")
+    processor = ImageProcessor(workers=1, timeout=5, thumbnail_size=0, process=process_or_hang)
+    try:
+        results = processor.process_session(str(tmp_path), names)
+    finally:
+        processor.close()
+
+    assert {name: results[name].get("name") for name in names[1:]} == {name: name for name in names[1:]}
+    # The stuck image still gets what its header says
+    assert results["image_0_stuck.png"] == {"format": None, "width": None, "height": None, "size": 12}
+    assert processor.stats()["failures"] == 1
@@ -11,6 +11,8 @@ import zipfile
 import tempfile
 from datetime import datetime
 
+from live_server import wait_for_scrape
+
 # Configuration
 BASE_URL = "http://backend:8000"
 TEST_URL = "https://jeevawasa.com"
@@ -34,7 +36,7 @@ def test_scraping_and_images_download():
             print(f"   Response: {response.text}")
             assert False, "Test failed"
         
-        data = response.json()
+        data = wait_for_scrape(BASE_URL, response.json())
         print(f"✅ Scraping successful!")
         print(f"   Links: {data['links_count']}")
         print(f"   Images: {data['images_count']}")
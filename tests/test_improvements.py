@@ -9,6 +9,8 @@ import time
 import os
 from datetime import datetime
 
+from live_server import wait_for_scrape
+
 # Configuration
 BASE_URL = "http://backend:8000"
 TEST_URL = "https://jeevawasa.com"
@@ -48,7 +50,7 @@ def test_scraping():
         duration = time.time() - start_time
         
         if response.status_code == 200:
-            data = response.json()
+            data = wait_for_scrape(BASE_URL, response.json())
             print(f"✅ Scraping successful!")
             print(f"   Duration: {duration:.2f}s")
             print(f"   Links: {data['links_count']}")
@@ -0,0 +1,64 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+
+from backend.job_queue import JOB_DONE, JOB_FAILED, JOB_RUNNING, EVENT_BUFFER_SIZE, JobQueue, ScrapeJob
+
+
+def test_events_are_numbered_and_bounded():
+    job = ScrapeJob("s1", "https://a.com")
+    for index in range(EVENT_BUFFER_SIZE + 5):
+        job.emit("page", index=index)
+    assert job.last_event_id == EVENT_BUFFER_SIZE + 5
+    assert len(job.events) == EVENT_BUFFER_SIZE
+    assert [event_id for event_id, _, _ in job.events_after(EVENT_BUFFER_SIZE + 3)] == [
+        EVENT_BUFFER_SIZE + 4, EVENT_BUFFER_SIZE + 5
+    ]
+
+
+def test_wait_for_events_wakes_on_emit_from_a_thread():
+    async def scenario():
+        job = ScrapeJob("s1", "https://a.com")
+        assert await job.wait_for_events(0, 0.01) == []
+        waiter = asyncio.create_task(job.wait_for_events(0, 5))
+        await asyncio.sleep(0.01)
+        threading.Thread(target=job.emit, args=("image",), kwargs={"name": "image_0.png"}).start()
+        return await waiter
+
+    assert asyncio.run(scenario()) == [(1, "image", {"name": "image_0.png"})]
+
+
+def test_queue_emits_status_changes():
+    async def scenario():
+        async def handler(job):
+            job.emit("page", url=job.url)
+
+        queue = JobQueue(1)
+        queue.start(handler)
+        job = queue.submit(ScrapeJob("s1", "https://a.com"))
+        while job.status != JOB_DONE:
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return job
+
+    job = asyncio.run(scenario())
+    events = [(event, data.get("status")) for _, event, data in job.events_after(0)]
+    assert events == [("status", "queued"), ("status", "running"), ("page", None), ("status", "done")]
+
+
+def test_prune_drops_expired_and_excess_finished_jobs():
+    """Test that finished jobs are forgotten after the TTL or beyond the cap, unfinished ones never"""
+    queue = JobQueue(1, finished_ttl=60, max_finished=2)
+    now = datetime.now()
+    for index, age in enumerate([120, 30, 20, 10]):
+        job = ScrapeJob(f"s{index}", "https://a.com")
+        job.status = JOB_DONE if index % 2 else JOB_FAILED
+        job.finished_at = now - timedelta(seconds=age)
+        queue.jobs[job.session_id] = job
+    running = ScrapeJob("running", "https://a.com")
+    running.status = JOB_RUNNING
+    queue.jobs[running.session_id] = running
+
+    assert queue.prune() == 2
+    assert sorted(queue.jobs) == ["running", "s2", "s3"]
+    assert queue.prune() == 0
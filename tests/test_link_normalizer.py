@@ -0,0 +1,53 @@
+import pytest
+from backend.link_normalizer import LinkNormalizer, canonical_url, normalize_links
+
+
+@pytest.mark.parametrize("href, expected", [
+    ("/about", "https://example.com/about"),
+    ("page.html", "https://example.com/docs/page.html"),
+    ("../x", "https://example.com/x"),
+    ("./y#section", "https://example.com/docs/y"),
+    ("//cdn.example.com/lib", "https://cdn.example.com/lib"),
+    ("HTTPS://Example.COM:443/Path?b=2&a=1", "https://example.com/Path?a=1&b=2"),
+    ("http://example.com:80", "http://example.com/"),
+    ("http://example.com:8080/x?q=a%20b", "http://example.com:8080/x?q=a%20b"),
+    ("  /trimmed  ", "https://example.com/trimmed"),
+    ("javascript:void(0)", None),
+    ("mailto:me@example.com", None),
+    ("#top", None),
+    ("ftp://example.com/file", None),
+    ("", None),
+])
+def test_normalize(href, expected):
+    assert LinkNormalizer("https://example.com/docs/index.html").normalize(href) == expected
+
+
+def test_resolve_keeps_query_order():
+    """Test that resource URLs are resolved but their query is left untouched"""
+    normalizer = LinkNormalizer("https://example.com/shop/")
+    assert normalizer.resolve("img/p.jpg?w=200&h=100#x") == "https://example.com/shop/img/p.jpg?w=200&h=100"
+
+
+def test_canonical_url():
+    """Test that start URLs get the same form as links found on pages"""
+    assert canonical_url("https://Example.com") == "https://example.com/"
+    assert canonical_url("https://example.com:443/?b=1&a=2") == "https://example.com/?a=2&b=1"
+    assert canonical_url("ftp://example.com/") is None
+
+
+def test_normalize_links_dedups_canonical_urls():
+    """Test that equivalent hrefs collapse into the first link record"""
+    anchors = [
+        {"href": "/a?y=2&x=1", "text": "", "title": "Title A", "target": "_blank", "rel": "nofollow", "alt": ""},
+        {"href": "https://EXAMPLE.com/a?x=1&y=2#frag", "text": "dup", "title": "", "target": "", "rel": "", "alt": ""},
+        {"href": "b", "text": "B" * 300, "title": "", "target": "", "rel": "", "alt": ""},
+    ]
+    links = normalize_links(anchors, "https://example.com/")
+    assert links == [
+        {"url": "https://example.com/a?x=1&y=2", "text": "Title A", "title": "Title A", "target": "_blank", "rel": "nofollow"},
+        {"url": "https://example.com/b", "text": "B" * 200, "title": "", "target": "", "rel": ""},
+    ]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
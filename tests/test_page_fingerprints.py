@@ -0,0 +1,77 @@
+import hashlib
+import time
+
+import pytest
+
+from backend.page_fingerprints import PageFingerprints, diff_page, file_hash
+
+
+@pytest.fixture
+def fingerprints(tmp_path):
+    store = PageFingerprints(str(tmp_path / "pages.sqlite3"))
+    store.open()
+    yield store
+    store.close()
+
+
+def link(url):
+    return {'url': url, 'text': url[-1], 'title': '', 'target': '', 'rel': ''}
+
+
+def test_diff_page_against_previous_scrape():
+    previous = {'links': ['https://a.com/1', 'https://a.com/2'], 'images': ['https://a.com/a.png']}
+    added, removed, new_images = diff_page(
+        previous, [link('https://a.com/2'), link('https://a.com/3')], ['https://a.com/a.png', 'https://a.com/b.png']
+    )
+    assert [item['url'] for item in added] == ['https://a.com/3']
+    assert removed == ['https://a.com/1']
+    assert new_images == ['https://a.com/b.png']
+
+    # A page without a fingerprint is new: everything is added
+    added, removed, new_images = diff_page(None, [link('https://a.com/1')], ['https://a.com/a.png'])
+    assert (len(added), removed, new_images) == (1, [], ['https://a.com/a.png'])
+
+
+def test_data_uri_images_are_stored_as_digests(fingerprints):
+    """Test that inline images are kept by digest and still recognised on the next scrape"""
+    inline = "data:image/png;base64," + "A" * 100000
+    fingerprints.record("https://a.com/", "s1", "h1", [], ["https://a.com/a.png", inline])
+    stored = fingerprints.get("https://a.com/")['images']
+    assert stored[0] == "https://a.com/a.png"
+    assert stored[1] == "data:sha256," + hashlib.sha256(inline.encode()).hexdigest()
+
+    other = "data:image/png;base64,QkJC"
+    _, _, new_images = diff_page(fingerprints.get("https://a.com/"), [], [inline, other])
+    assert new_images == [other]
+
+
+def test_file_hash_reads_in_chunks(tmp_path):
+    body = "<title>Café</title>".encode('utf-8')
+    path = tmp_path / "page.html"
+    path.write_bytes(body)
+    assert file_hash(str(path), chunk_size=4) == hashlib.sha256(body).hexdigest()
+    path.write_bytes(body + b" ")
+    assert file_hash(str(path), chunk_size=4) != hashlib.sha256(body).hexdigest()
+
+
+def test_record_touch_and_prune(fingerprints):
+    assert fingerprints.get("https://a.com/") is None
+    fingerprints.record("https://a.com/", "s1", "h1", ["https://a.com/x"], [])
+    entry = fingerprints.get("https://a.com/")
+    assert (entry['content_hash'], entry['links'], entry['session_id']) == ("h1", ["https://a.com/x"], "s1")
+
+    fingerprints.touch("https://a.com/", "s2")
+    assert fingerprints.get("https://a.com/")['session_id'] == "s2"
+    assert fingerprints.stats() == {"enabled": True, "pages": 1, "skipped_pages": 1}
+
+    assert fingerprints.prune(time.time() - 60) == 0
+    assert fingerprints.prune(time.time() + 1) == 1
+    assert fingerprints.get("https://a.com/") is None
+
+
+def test_disabled_store_records_nothing(tmp_path):
+    store = PageFingerprints(str(tmp_path / "pages.sqlite3"), enabled=False)
+    store.open()
+    store.record("https://a.com/", "s1", "h", [], [])
+    assert store.get("https://a.com/") is None
+    assert not (tmp_path / "pages.sqlite3").exists()
@@ -0,0 +1,123 @@
+import codecs
+import gzip
+import zlib
+
+import pytest
+
+from backend.page_stream import (
+    SNIFF_BYTES, ContentEncodingError, DecompressionBombError, PageDecoder, PageTooLargeError, response_charset,
+    sniff_charset
+)
+
+
+def decode(decoder, body, chunk_size=1000):
+    pieces = []
+    for start in range(0, len(body), chunk_size):
+        pieces.extend(decoder.feed(body[start:start + chunk_size]))
+    pieces.append(decoder.close())
+    return b''.join(pieces)
+
+
+PAGE = ('<html><title>Café</title>' + '<a href="/x">ü</a>' * 500 + '</html>')
+
+
+def raw_deflate(data):
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+@pytest.mark.parametrize("encoding, compress", [
+    (None, lambda data: data),
+    ("gzip", gzip.compress),
+    ("deflate", zlib.compress),
+    ("deflate", raw_deflate),
+])
+def test_decodes_content_encodings_in_pieces(encoding, compress):
+    decoder = PageDecoder(encoding, "text/html", step=256)
+    pieces = list(decoder.feed(compress(PAGE.encode()))) + [decoder.close()]
+    assert max(len(piece) for piece in pieces) <= 256 * 2  # UTF-8 re-encoding may grow a piece
+    assert b''.join(pieces).decode('utf-8') == PAGE
+
+
+def test_charset_is_decoded_across_chunk_boundaries():
+    body = PAGE.encode('utf-16')
+    assert decode(PageDecoder(None, 'text/html; charset="UTF-16"'), body, chunk_size=3).decode('utf-8') == PAGE
+    latin = 'café'.encode('latin-1')
+    assert decode(PageDecoder(None, "text/html; charset=iso-8859-1"), latin) == 'café'.encode('utf-8')
+    # No declaration and not UTF-8: windows-1252, as browsers do
+    assert decode(PageDecoder(None, "text/html"), latin) == 'café'.encode('utf-8')
+
+
+def test_response_charset():
+    assert response_charset("text/html; charset=Windows-1252") == "cp1252"
+    assert response_charset("text/html; charset=ISO-8859-1") == "cp1252"
+    assert response_charset("text/html; charset=bogus") is None
+    assert response_charset(None) is None
+
+
+@pytest.mark.parametrize("head, declared, expected", [
+    (b'\xef\xbb\xbf<html>', 'cp1252', ('utf-8', 'bom')),
+    (b'\xff\xfe<\x00h\x00', None, ('utf-16', 'bom')),
+    (b'<html>', 'koi8_r', ('koi8_r', 'header')),
+    (b'<head><meta charset="Shift_JIS">', None, ('cp932', 'meta')),
+    (b"<META HTTP-EQUIV='Content-Type' CONTENT='text/html; charset=koi8-r'>", None, ('koi8-r', 'meta')),
+    (b'<meta charset="utf-16">', None, ('utf-8', 'meta')),
+    (b'<meta charset="x-unknown"><p>caf\xc3\xa9', None, ('utf-8', 'default')),
+    (b'<p>caf\xe9</p>', None, ('cp1252', 'default')),
+])
+def test_sniff_charset(head, declared, expected):
+    assert sniff_charset(head, declared) == expected
+
+
+def test_sniff_charset_only_reads_the_window():
+    late_meta = b' ' * SNIFF_BYTES + b'<meta charset="koi8-r">'
+    assert sniff_charset(late_meta) == ('utf-8', 'default')
+    # A character cut in half by the end of the window is still UTF-8, unless the body ends there
+    cut = b' ' * (SNIFF_BYTES - 1) + 'é'.encode('utf-8')
+    assert sniff_charset(cut) == ('utf-8', 'default')
+    assert sniff_charset(cut[:SNIFF_BYTES], final=False) == ('utf-8', 'default')
+    assert sniff_charset(cut[:SNIFF_BYTES]) == ('cp1252', 'default')
+
+
+def test_character_cut_at_the_sniff_window_by_a_chunk():
+    page = ' ' * (SNIFF_BYTES - 1) + 'é and more text'
+    body = page.encode('utf-8')
+    decoder = PageDecoder(None, "text/html")
+    pieces = list(decoder.feed(body[:SNIFF_BYTES])) + list(decoder.feed(body[SNIFF_BYTES:])) + [decoder.close()]
+    assert (decoder.charset, decoder.charset_source) == ('utf-8', 'default')
+    assert b''.join(pieces).decode('utf-8') == page
+
+
+def test_meta_charset_split_across_chunks():
+    body = '<html><head><meta charset="windows-1251"></head><body>Привет</body></html>'.encode('cp1251')
+    decoder = PageDecoder(None, "text/html")
+    assert decode(decoder, body, chunk_size=7).decode('utf-8').endswith('<body>Привет</body></html>')
+    assert (decoder.charset, decoder.charset_source) == ('cp1251', 'meta')
+
+
+def test_utf8_passes_through_without_bom():
+    body = codecs.BOM_UTF8 + PAGE.encode('utf-8')
+    decoder = PageDecoder(None, "text/html; charset=utf-8", step=256)
+    assert decode(decoder, body, chunk_size=2) == PAGE.encode('utf-8')
+    assert decoder._text is None
+
+
+def test_size_limit():
+    with pytest.raises(PageTooLargeError):
+        decode(PageDecoder(None, None, max_bytes=1000), b'x' * 1001)
+    assert decode(PageDecoder(None, None, max_bytes=1000), b'x' * 1000) == b'x' * 1000
+
+
+def test_compression_bomb_is_stopped_early():
+    bomb = gzip.compress(b' ' * (50 * 1024 * 1024))
+    decoder = PageDecoder("gzip", None, max_bytes=100 * 1024 * 1024, max_ratio=100)
+    with pytest.raises(DecompressionBombError):
+        decode(decoder, bomb, chunk_size=4096)
+    assert decoder.decoded < 2 * 1024 * 1024
+
+
+def test_unsupported_or_corrupt_encoding():
+    with pytest.raises(ContentEncodingError):
+        PageDecoder("br", None)
+    with pytest.raises(ContentEncodingError):
+        decode(PageDecoder("gzip", None), b'not gzip at all')
@@ -0,0 +1,54 @@
+import asyncio
+import time
+import pytest
+from email.utils import formatdate
+from backend.politeness import HostBucket, PolitenessScheduler, parse_retry_after
+
+
+def test_bucket_allows_burst_then_paces_at_rate():
+    """Test that a host gets `burst` immediate slots, then one per 1/rate seconds"""
+    bucket = HostBucket(rate=10.0, burst=3)
+    delays = [bucket.reserve(100.0) for _ in range(5)]
+    assert delays[:3] == [0.0, 0.0, 0.0]
+    assert delays[3] == pytest.approx(0.1)
+    assert delays[4] == pytest.approx(0.2)
+
+
+def test_hosts_are_independent():
+    """Test that one busy host does not delay another"""
+    scheduler = PolitenessScheduler(rate=1.0, burst=1)
+
+    async def scenario():
+        await scheduler.acquire("https://slow.example.com/a")
+        start = time.monotonic()
+        await scheduler.acquire("https://other.example.com/a")
+        return time.monotonic() - start
+
+    assert asyncio.run(scenario()) < 0.05
+
+
+def test_throttle_halves_rate_and_honours_retry_after():
+    """Test adaptation to 429 with Retry-After and recovery on success"""
+    scheduler = PolitenessScheduler(rate=8.0, burst=4)
+    url = "https://api.example.com/page"
+    scheduler.feedback(url, 429, "3")
+    bucket = scheduler.buckets["api.example.com"]
+    assert bucket.rate == 4.0
+    assert bucket.reserve(time.monotonic()) == pytest.approx(3.0, abs=0.05)
+    assert "api.example.com" in scheduler.stats()["throttled_hosts"]
+
+    for _ in range(20):
+        scheduler.feedback(url, 200)
+    assert bucket.rate == 8.0
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("120") == 120.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("not a date") is None
+    future = formatdate(time.time() + 30, usegmt=True)
+    assert 25 <= parse_retry_after(future) <= 30
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,39 @@
+import pytest
+
+from backend.responses import RangeNotSatisfiable, etag_matches, format_sse, parse_range
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("bytes=0-9", (0, 9)),
+    ("bytes=90-", (90, 99)),
+    ("bytes=95-200", (95, 99)),
+    ("bytes=-10", (90, 99)),
+    ("bytes=-500", (0, 99)),
+    ("bytes=0-1,5-6", None),
+    ("items=0-1", None),
+    ("bytes=abc", None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 100) == expected
+
+
+@pytest.mark.parametrize("header", ["bytes=100-", "bytes=5-2", "bytes=-0"])
+def test_parse_range_unsatisfiable(header):
+    with pytest.raises(RangeNotSatisfiable):
+        parse_range(header, 100)
+
+
+def test_etag_matches():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_format_sse():
+    assert format_sse("page", {"url": "https://a.com/", "links": 3}, 7) == (
+        b'id: 7\nevent: page\ndata: {"url":"https://a.com/","links":3}\n\n'
+    )
+    assert format_sse(None, ["x\ny"]) == b'data: ["x\\ny"]\n\n'
@@ -1,7 +1,9 @@
+import json
 import pytest
 import requests
+import time
 from fastapi.testclient import TestClient
-from backend.main import app
+from backend.main import app, parse_batch_urls, parse_page
 
 client = TestClient(app)
 
@@ -20,19 +22,112 @@ def test_root_endpoint():
     data = response.json()
     assert "message" in data
 
+def wait_for_job(test_client, session_id, timeout=30):
+    """Poll the session status endpoint until the job leaves the queue"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        data = test_client.get(f"/api/session/{session_id}/status").json()
+        if data.get("status") in ("done", "failed"):
+            return data
+        time.sleep(0.2)
+    return data
+
 def test_scrape_endpoint_invalid_url():
-    """Test scraping with invalid URL"""
-    response = client.post("/api/scrape", json={
-        "url": "invalid-url"
-    })
-    # Should return 500 for connection errors, not 400
-    assert response.status_code in [400, 500]
+    """Test scraping with invalid URL is queued and fails in the background"""
+    with TestClient(app) as live_client:
+        response = live_client.post("/api/scrape", json={
+            "url": "invalid-url"
+        })
+        assert response.status_code == 200
+        data = response.json()
+        assert data["status"] in ["queued", "running"]
+        assert data["status_url"] == f"/api/session/{data['session_id']}/status"
+        
+        # Connection errors now surface as a failed job instead of a 500
+        status = wait_for_job(live_client, data["session_id"])
+        assert status["status"] == "failed"
+        assert status["error"]
+
+def test_session_events_stream_ends_with_final_status():
+    """Test that the event stream replays the job's events and closes once it has finished"""
+    with TestClient(app) as live_client:
+        data = live_client.post("/api/scrape", json={"url": "invalid-url"}).json()
+        assert data["events_url"] == f"/api/session/{data['session_id']}/events"
+        
+        response = live_client.get(data["events_url"])
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            dict(line.split(": ", 1) for line in message.splitlines())
+            for message in response.text.split("\n\n") if message.startswith("id:")
+        ]
+        assert events[0]["event"] == "status"
+        assert [int(event["id"]) for event in events] == list(range(1, len(events) + 1))
+        final = json.loads(events[-1]["data"])
+        assert (events[-1]["event"], final["status"]) == ("status", "failed")
+        
+        # Resuming after the last event only waits for the end of the stream
+        resumed = live_client.get(data["events_url"], headers={"Last-Event-ID": events[-1]["id"]})
+        assert "id:" not in resumed.text
+
+def test_session_events_unknown_session():
+    response = client.get("/api/session/does-not-exist/events")
+    assert response.status_code == 404
 
 def test_scrape_endpoint_missing_url():
     """Test scraping without URL"""
     response = client.post("/api/scrape", json={})
     assert response.status_code == 422  # Validation error
 
+def test_scrape_endpoint_invalid_format():
+    """Test scraping with an unsupported export format"""
+    response = client.post("/api/scrape", json={"url": "https://example.com", "format": "xml"})
+    assert response.status_code == 422
+
+def test_batch_endpoint_requires_urls():
+    """Test that an empty batch is rejected before a session is created"""
+    response = client.post("/api/scrape/batch", data={"urls": "\n# nothing here\n"})
+    assert response.status_code == 422
+
+def test_batch_endpoint_accepts_url_file():
+    """Test that a batch upload becomes one job with a per-page report"""
+    with TestClient(app) as live_client:
+        response = live_client.post(
+            "/api/scrape/batch",
+            data={"urls": "invalid-url-one"},
+            files={"file": ("urls.txt", b"invalid-url-two\n\ninvalid-url-one\n", "text/plain")}
+        )
+        assert response.status_code == 200
+        data = response.json()
+        assert data["urls_count"] == 2
+        
+        status = wait_for_job(live_client, data["session_id"])
+        assert status["status"] == "failed"
+        report = live_client.get(data["report_file"])
+        assert sorted(json.loads(line)["url"] for line in report.text.splitlines()) == [
+            "https://invalid-url-one/", "https://invalid-url-two/"
+        ]
+
+def test_parse_batch_urls():
+    lines = ["https://a.com/", "  b.com ", "", "# comment", "https://a.com/"]
+    assert parse_batch_urls(lines) == ["https://a.com/", "https://b.com/"]
+    # Spellings of one URL are fetched once
+    lines = ["https://Example.com", "https://example.com/", "https://example.com:443/?b=1&a=2", "https://example.com/?a=2&b=1"]
+    assert parse_batch_urls(lines) == ["https://example.com/", "https://example.com/?a=2&b=1"]
+
+def test_parse_page_extracts_links_and_images():
+    """Test that page parsing returns plain link and image data"""
+    html = """
+    <html><head><title>Example</title></head><body>
+    <a href="/about">About</a>
+    <a href="/about">About again</a>
+    <a href="mailto:someone@example.com">Mail</a>
+    <img src="/logo.png"><img src="data:image/png;base64,AAAA">
+    </body></html>
+    """
+    page = parse_page(html, "https://example.com/")
+    assert page["title"] == "Example"
+    assert [link["url"] for link in page["links"]] == ["https://example.com/about"]
+    assert page["images"] == [(0, "https://example.com/logo.png"), (1, "data:image/png;base64,AAAA")]
 
 
 if __name__ == "__main__":
@@ -0,0 +1,53 @@
+import pytest
+
+from backend.session_index import SessionIndex
+
+
+@pytest.fixture
+def index(tmp_path):
+    session_index = SessionIndex(str(tmp_path / "sessions.sqlite3"), ttl=100)
+    session_index.open()
+    yield session_index
+    session_index.close()
+
+
+def test_upsert_keeps_creation_time(index):
+    index.upsert("a", url="https://a.com", status="queued", created_at=10)
+    index.upsert("a", status="done", created_at=50, file_count=3, size=300, own_size=20)
+    row = index.get("a")
+    assert row["created_at"] == 10
+    assert row["expires_at"] == 110
+    assert (row["status"], row["file_count"], row["size"], row["own_size"]) == ("done", 3, 300, 20)
+    with pytest.raises(ValueError):
+        index.upsert("a", bogus=1)
+
+
+def test_cleanup_queue_latest_and_stats(index):
+    index.upsert("old", status="done", created_at=10, file_count=2, size=200, own_size=50)
+    index.upsert("mid", status="failed", created_at=20, file_count=1, size=10, own_size=10)
+    index.upsert("new", status="running", created_at=30)
+
+    assert [row["session_id"] for row in index.created_before(25)] == ["old", "mid"]
+    assert [row["session_id"] for row in index.created_before(25, limit=1)] == ["old"]
+    assert index.latest()["session_id"] == "new"
+    assert index.stats() == {
+        "sessions": 3, "files": 3, "size": 210, "own_size": 60,
+        "statuses": {"done": 1, "failed": 1, "running": 1}
+    }
+
+    index.remove("old")
+    assert index.session_ids() == {"mid", "new"}
+
+
+def test_reopened_index_is_persistent(tmp_path):
+    path = str(tmp_path / "sessions.sqlite3")
+    index = SessionIndex(path)
+    index.open()
+    index.upsert("a", status="done", created_at=5)
+    index.close()
+    assert index.get("a") is None
+
+    reopened = SessionIndex(path)
+    reopened.open()
+    assert reopened.get("a")["status"] == "done"
+    reopened.close()
@@ -0,0 +1,108 @@
+import json
+import os
+import threading
+
+from backend.session_manifest import MANIFEST_NAME, ManifestStore, read_manifest, write_manifest
+
+
+def test_live_manifest_tracks_files_and_counts(tmp_path):
+    session_dir = str(tmp_path)
+    store = ManifestStore(flush_interval=60)
+    store.open(session_dir, session_id="s1", status="running")
+    store.record_file(session_dir, "links_s1.csv", 10, "links")
+    store.record_file(session_dir, "image_0.svg", 100, "image", "aa")
+    store.update(session_dir, images={"image_0.svg": {"width": 1}})
+
+    # Served from memory; the throttled flush has not written the files yet
+    live = store.get(session_dir)
+    assert live["counts"] == {"links": 1, "image": 1}
+    assert live["total_size"] == 110
+    assert read_manifest(session_dir)["files"] == {}
+
+    store.remove_file(session_dir, "image_0.svg")
+    store.record_file(session_dir, "image_0.png", 40, "image", "bb")
+    store.close(session_dir, status="done")
+
+    manifest = read_manifest(session_dir)
+    assert manifest["status"] == "done"
+    assert manifest["files"]["image_0.png"] == {"size": 40, "kind": "image", "sha256": "bb"}
+    assert manifest["counts"] == {"links": 1, "image": 1}
+    assert manifest["total_size"] == 50
+    assert manifest["images"] == {}
+    assert sorted(os.listdir(session_dir)) == [MANIFEST_NAME]
+
+
+def test_finished_manifest_is_cached_until_the_file_changes(tmp_path):
+    session_dir = str(tmp_path)
+    store = ManifestStore()
+    store.open(session_dir, status="running")
+    store.close(session_dir, status="done")
+    assert store.get(session_dir)["status"] == "done"
+
+    manifest = read_manifest(session_dir)
+    manifest["status"] = "edited"
+    write_manifest(session_dir, manifest)
+    os.utime(tmp_path / MANIFEST_NAME, ns=(1, 1))
+    assert store.get(session_dir)["status"] == "edited"
+
+    # Recording into a finished session rewrites the file
+    store.record_file(session_dir, "links_s1.jsonl", 5, "links")
+    assert read_manifest(session_dir)["counts"] == {"links": 1}
+    assert store.get(session_dir)["files"]["links_s1.jsonl"]["size"] == 5
+
+
+def test_sessions_without_current_manifest(tmp_path):
+    store = ManifestStore()
+    assert store.get(str(tmp_path)) is None
+    store.record_file(str(tmp_path), "image_0.png", 1, "image")
+    assert store.get(str(tmp_path)) is None
+
+    # Version 1 manifests only held image details
+    (tmp_path / MANIFEST_NAME).write_text(json.dumps({"version": 1, "images": {}}))
+    assert store.get(str(tmp_path)) is None
+
+
+def test_on_write_sees_every_written_manifest(tmp_path):
+    written = []
+    store = ManifestStore(flush_interval=60, on_write=lambda session_dir, manifest: written.append(manifest["status"]))
+    store.open(str(tmp_path), status="running")
+    store.record_file(str(tmp_path), "links_s1.csv", 1, "links")
+    store.close(str(tmp_path), status="done")
+    assert written == ["running", "done"]
+
+
+def test_writes_happen_outside_the_store_lock(tmp_path):
+    """Test that a slow manifest write does not block recording into another session"""
+    slow_dir, other_dir = str(tmp_path / "slow"), str(tmp_path / "other")
+    os.makedirs(slow_dir)
+    os.makedirs(other_dir)
+    writing, release = threading.Event(), threading.Event()
+
+    def on_write(session_dir, manifest):
+        if session_dir == slow_dir and manifest["counts"]:
+            writing.set()
+            release.wait(10)
+
+    store = ManifestStore(flush_interval=0, on_write=on_write)
+    store.open(slow_dir, status="running")
+    store.open(other_dir, status="running")
+    writer = threading.Thread(target=store.record_file, args=(slow_dir, "image_0.png", 1, "image"))
+    writer.start()
+    assert writing.wait(5)
+
+    done = threading.Event()
+    threading.Thread(target=lambda: (store.record_file(other_dir, "image_0.png", 2, "image"), done.set())).start()
+    assert done.wait(2)
+    assert read_manifest(other_dir)["counts"] == {"image": 1}
+    release.set()
+    writer.join()
+    assert read_manifest(slow_dir)["counts"] == {"image": 1}
+
+
+def test_older_snapshot_is_not_written_over_a_newer_one(tmp_path):
+    store = ManifestStore(flush_interval=0)
+    store.open(str(tmp_path), status="running")
+    stale = store._pending(store.get(str(tmp_path)))
+    store.record_file(str(tmp_path), "links_s1.csv", 1, "links")
+    store._write(str(tmp_path), stale)
+    assert read_manifest(str(tmp_path))["counts"] == {"links": 1}
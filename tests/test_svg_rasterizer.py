@@ -0,0 +1,63 @@
+import time
+
+import pytest
+
+from backend.svg_rasterizer import SVGRasterizer, SVGTimeoutError
+
+
+def slow_render(svg_data):
+    time.sleep(60)
+    return svg_data
+
+
+def render_or_hang(svg_data):
+    if svg_data == b"hang":
+        time.sleep(60)
+    return b"png:" + svg_data
+
+
+def test_renders_in_worker_processes_and_caches_by_content():
+    rasterizer = SVGRasterizer(workers=2, timeout=30, render=bytes.upper)
+    try:
+        results = rasterizer.rasterize_many([b"<svg>a</svg>", b"<svg>b</svg>", b"<svg>a</svg>"])
+        assert results == [b"<SVG>A</SVG>", b"<SVG>B</SVG>", b"<SVG>A</SVG>"]
+        assert rasterizer.rasterize(b"<svg>a</svg>") == b"<SVG>A</SVG>"
+        assert rasterizer.stats()["cache_hits"] == 1
+    finally:
+        rasterizer.close()
+
+
+def test_failed_render_is_returned_not_raised():
+    rasterizer = SVGRasterizer(workers=0, render=bytes.decode)
+    results = rasterizer.rasterize_many([b"ok", b"\xff"])
+    assert results[0] == "ok"
+    assert isinstance(results[1], UnicodeDecodeError)
+    assert rasterizer.stats()["failures"] == 1
+
+
+def test_stuck_worker_is_killed_after_timeout():
+    """Test that a render exceeding the timeout fails alone and the pool keeps working"""
+    rasterizer = SVGRasterizer(workers=1, timeout=1, render=slow_render)
+    try:
+        start = time.monotonic()
+        with pytest.raises(SVGTimeoutError):
+            rasterizer.rasterize(b"<svg/>")
+        assert time.monotonic() - start < 30
+        assert rasterizer.stats()["timeouts"] == 1
+
+        rasterizer.render = bytes.upper
+        assert rasterizer.rasterize(b"<svg>next</svg>") == b"<SVG>NEXT</SVG>"
+    finally:
+        rasterizer.close()
+
+
+def test_documents_queued_behind_a_stuck_one_are_rendered():
+    """Test that a timeout only fails the stuck document, not the ones cancelled with its pool"""
+    rasterizer = SVGRasterizer(workers=1, timeout=3, render=render_or_hang)
+    try:
+        results = rasterizer.rasterize_many([b"hang", b"a", b"b", b"c"])
+        assert isinstance(results[0], SVGTimeoutError)
+        assert results[1:] == [b"png:a", b"png:b", b"png:c"]
+        assert (rasterizer.stats()["timeouts"], rasterizer.stats()["failures"]) == (1, 1)
+    finally:
+        rasterizer.close()